@@ -25,7 +25,8 @@ config = {
     'version': version,
     'cmdclass': cmdclass,
     'license': 'MIT',
-    'packages': ['taxcalc', 'taxcalc.tbi', 'taxcalc.cli'],
+    'packages': ['taxcalc', 'taxcalc.tbi', 'taxcalc.cli',
+                 'taxcalc.benchmarks'],
     'include_package_data': True,
     'name': 'taxcalc',
     'install_requires': ['numpy', 'pandas', 'bokeh', 'numba', 'toolz'],
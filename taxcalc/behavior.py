@@ -219,6 +219,10 @@ class Behavior(ParametersBase):
           with zero MTRs, we restrict this to the top 40% of tax units by AGI.
           Using this method, a semi-elasticity of -3.45 corresponds to a tax
           rate elasticity of -0.792.
+        Note: the marginal tax rates used by the substitution, income, and
+          capital-gains responses cannot be calculated with compact Records,
+          so a ValueError is raised when any of those responses is nonzero
+          and calc1 or calc2 contains compact Records.
         """
         # pylint: disable=too-many-statements,too-many-locals,too-many-branches
 
@@ -245,16 +249,33 @@ class Behavior(ParametersBase):
         assert calc1.array_len == calc2.array_len
         assert calc1.current_year == calc2.current_year
         mtr_cap = 0.99
+        zero_sub_and_inc = (calc2.behavior('BE_sub') == 0.0 and
+                            calc2.behavior('BE_inc') == 0.0)
+        # calculate all the needed marginal tax rates at the same time:
+        # marginal combined tax rates on taxpayer wages+salary
+        # (e00200p is taxpayer's wages+salary) and marginal income tax
+        # rates on long-term capital gains (p23250 is filing units'
+        # long-term capital gains)
+        mtr_of = list()
+        tax_type = list()
+        if not zero_sub_and_inc:
+            mtr_of.append('e00200p')
+            tax_type.append('combined')
+        if calc2.behavior('BE_cg') != 0.0:
+            mtr_of.append('p23250')
+            tax_type.append('iitax')
+        if mtr_of and (calc1.records_compact or calc2.records_compact):
+            msg = ('Behavior.response cannot calculate the marginal tax '
+                   'rates needed by nonzero BE_sub, BE_inc, or BE_cg '
+                   'elasticities using compact Records')
+            raise ValueError(msg)
+        if mtr_of:
+            mtr12 = dict(zip(mtr_of, Behavior._mtr12(calc1, calc2,
+                                                     mtr_of=mtr_of,
+                                                     tax_type=tax_type)))
         # calculate sum of substitution and income effects
-        if calc2.behavior('BE_sub') == 0.0 and calc2.behavior('BE_inc') == 0.0:
-            zero_sub_and_inc = True
-        else:
-            zero_sub_and_inc = False
-            # calculate marginal combined tax rates on taxpayer wages+salary
-            # (e00200p is taxpayer's wages+salary)
-            wage_mtr1, wage_mtr2 = Behavior._mtr12(calc1, calc2,
-                                                   mtr_of='e00200p',
-                                                   tax_type='combined')
+        if not zero_sub_and_inc:
+            wage_mtr1, wage_mtr2 = mtr12['e00200p']
             # calculate magnitude of substitution effect
             if calc2.behavior('BE_sub') == 0.0:
                 sub = np.zeros(calc1.array_len)
@@ -303,11 +324,7 @@ class Behavior(ParametersBase):
         if calc2.behavior('BE_cg') == 0.0:
             ltcg_chg = np.zeros(calc1.array_len)
         else:
-            # calculate marginal tax rates on long-term capital gains
-            #  p23250 is filing units' long-term capital gains
-            ltcg_mtr1, ltcg_mtr2 = Behavior._mtr12(calc1, calc2,
-                                                   mtr_of='p23250',
-                                                   tax_type='iitax')
+            ltcg_mtr1, ltcg_mtr2 = mtr12['p23250']
             rch = ltcg_mtr2 - ltcg_mtr1
             exp_term = np.exp(calc2.behavior('BE_cg') * rch)
             new_ltcg = calc1.array('p23250') * exp_term
@@ -370,12 +387,24 @@ class Behavior(ParametersBase):
         """
         Computes marginal tax rates for Calculator objects calc1 and calc2
         for specified mtr_of income type and specified tax_type.
+        When mtr_of and tax_type are lists of the same length, computes
+        marginal tax rates for all the income types at the same time and
+        returns a list containing a tuple of rates for each income type.
         """
-        _, iitax1, combined1 = calc1.mtr(mtr_of, wrt_full_compensation=True)
-        _, iitax2, combined2 = calc2.mtr(mtr_of, wrt_full_compensation=True)
-        if tax_type == 'combined':
-            return (combined1, combined2)
-        elif tax_type == 'iitax':
-            return (iitax1, iitax2)
+        if isinstance(mtr_of, list):
+            types = tax_type
+            variables = mtr_of
         else:
-            raise ValueError('tax_type must be "combined" or "iitax"')
+            types = [tax_type]
+            variables = [mtr_of]
+        for ttype in types:
+            if ttype not in ('combined', 'iitax'):
+                raise ValueError('tax_type must be "combined" or "iitax"')
+        mtrs1 = calc1.mtrs(variables, wrt_full_compensation=True)
+        mtrs2 = calc2.mtrs(variables, wrt_full_compensation=True)
+        idx = {'iitax': 1, 'combined': 2}
+        mtr12 = [(mtrs1[var][idx[ttype]], mtrs2[var][idx[ttype]])
+                 for var, ttype in zip(variables, types)]
+        if isinstance(mtr_of, list):
+            return mtr12
+        return mtr12[0]
@@ -0,0 +1,9 @@
+"""
+Specify what is available to import from taxcalc.benchmarks.benchmarks.
+"""
+from taxcalc.benchmarks.benchmarks import (synthetic_records_data,
+                                           synthetic_records,
+                                           bundled_reforms,
+                                           run_benchmarks,
+                                           compare_benchmarks,
+                                           cli_benchmark_main)
@@ -0,0 +1,7 @@
+"""
+Run the Tax-Calculator benchmark suite using python -m taxcalc.benchmarks
+"""
+import sys
+from taxcalc.benchmarks.benchmarks import cli_benchmark_main
+
+sys.exit(cli_benchmark_main())
@@ -0,0 +1,409 @@
+"""
+Tax-Calculator benchmark suite that times the main calculation entry points
+on synthetic filing units generated from the records_variables.json file
+and on the reforms bundled in the taxcalc/reforms directory.
+
+The results are written to a JSON file and can be compared with a stored
+baseline file in order to identify performance regressions.  Read the
+README.md file in this directory for usage details.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle benchmarks.py
+# pylint --disable=locally-disabled benchmarks.py
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+from taxcalc.policy import Policy
+from taxcalc.records import Records
+from taxcalc.behavior import Behavior
+from taxcalc.growfactors import GrowFactors
+from taxcalc.calculate import Calculator
+from taxcalc.utils import create_distribution_table
+
+
+BENCHMARK_SIZES = [10000, 100000]
+BENCHMARK_YEAR = 2018
+BENCHMARK_SEED = 123456789
+BENCHMARK_REPEAT = 3
+REGRESSION_TOLERANCE = 0.10
+RESULTS_FILENAME = 'benchmark_results.json'
+
+REFORMS_PATH = os.path.join(Records.CUR_PATH, 'reforms')
+RESPONSE_REFORM = 'TCJA_Reconciliation'
+RESPONSE_ELASTICITIES = {'_BE_sub': [0.25],
+                         '_BE_inc': [-0.1],
+                         '_BE_cg': [-0.79]}
+
+# (probability of being nonzero, median of nonzero values) for the float
+# input variables; variables not listed here use DEFAULT_PROFILE
+DEFAULT_PROFILE = (0.05, 2000.)
+VARIABLE_PROFILE = {
+    'e00200p': (0.75, 40000.),
+    'e00200s': (0.60, 30000.),
+    'pencon_p': (0.20, 3000.),
+    'pencon_s': (0.15, 3000.),
+    'e00300': (0.30, 500.),
+    'e00600': (0.20, 2000.),
+    'e00900p': (0.15, 10000.),
+    'e00900s': (0.05, 8000.),
+    'e01500': (0.15, 15000.),
+    'e02000': (0.10, 10000.),
+    'e02100p': (0.02, 5000.),
+    'e02400': (0.20, 15000.),
+    'e17500': (0.10, 3000.),
+    'e18400': (0.40, 4000.),
+    'e18500': (0.30, 3000.),
+    'e19200': (0.25, 8000.),
+    'e19800': (0.30, 2000.),
+    'p22250': (0.05, 1000.),
+    'p23250': (0.10, 8000.),
+    's006': (1.00, 100.)
+}
+# float input variables that are negative for some filing units
+SIGNED_VARS = set(['e00900p', 'e00900s', 'e02000', 'e02100p', 'e02100s',
+                   'e26270', 'p22250', 'p23250'])
+# spouse variables that are zero for filing units that are not married
+# filing jointly
+SPOUSE_VARS = set(['e00200s', 'pencon_s', 'e00900s', 'e02100s', 'k1bx14s'])
+
+
+def synthetic_records_data(num_units, seed=BENCHMARK_SEED,
+                           start_year=Records.CPSCSV_YEAR):
+    """
+    Return (data, weights) tuple of Pandas DataFrames containing num_units
+    synthetic filing units with values for every input variable listed in
+    the read section of the records_variables.json file and sample weights
+    for start_year through the last year of the default grow factors.
+    The generated values satisfy the Records class validity checks and
+    depend only on the specified num_units, seed, and start_year values.
+    """
+    # pylint: disable=too-many-locals
+    if num_units < 1:
+        raise ValueError('num_units < 1')
+    rng = np.random.RandomState(seed)
+    var_info = Records.read_var_info()
+    data = dict()
+    # generate integer variables that describe filing-unit structure
+    mars = rng.choice([1, 2, 3, 4, 5], size=num_units,
+                      p=[0.45, 0.40, 0.03, 0.11, 0.01])
+    joint = mars == 2
+    nu18 = rng.choice([0, 1, 2, 3], size=num_units,
+                      p=[0.60, 0.15, 0.15, 0.10])
+    nu13 = rng.binomial(nu18, 0.7)
+    n1820 = (rng.uniform(size=num_units) < 0.10).astype(np.int64)
+    elderly = (rng.uniform(size=num_units) < 0.02).astype(np.int64)
+    data['RECID'] = np.arange(1, num_units + 1)
+    data['FLPDYR'] = np.full(num_units, start_year)
+    data['MARS'] = mars
+    data['XTOT'] = 1 + joint + nu18 + n1820 + elderly
+    data['EIC'] = np.minimum(nu18, 3)
+    data['n24'] = nu18
+    data['nu18'] = nu18
+    data['nu13'] = nu13
+    data['nu05'] = rng.binomial(nu13, 0.4)
+    data['f2441'] = rng.binomial(nu13, 0.3)
+    data['n1820'] = n1820
+    data['n21'] = nu18 + n1820
+    data['elderly_dependents'] = elderly
+    data['age_head'] = rng.randint(18, 86, size=num_units)
+    data['age_spouse'] = np.where(joint,
+                                  rng.randint(18, 86, size=num_units), 0)
+    data['DSI'] = (rng.uniform(size=num_units) < 0.02).astype(np.int64)
+    data['blind_head'] = (rng.uniform(size=num_units) < 0.005).astype(
+        np.int64)
+    data['blind_spouse'] = np.where(
+        joint, rng.uniform(size=num_units) < 0.005, 0).astype(np.int64)
+    data['filer'] = np.ones(num_units, dtype=np.int64)
+    # generate every other input variable from its records_variables.json
+    # type using a sparse log-normal distribution for float variables
+    for varname in sorted(var_info['read']):
+        if varname in data:
+            continue
+        if var_info['read'][varname]['type'] == 'int':
+            data[varname] = np.zeros(num_units, dtype=np.int64)
+            continue
+        prob, median = VARIABLE_PROFILE.get(varname, DEFAULT_PROFILE)
+        nonzero = rng.uniform(size=num_units) < prob
+        value = rng.lognormal(np.log(median), 1.0, size=num_units)
+        if varname in SIGNED_VARS:
+            value = np.where(rng.uniform(size=num_units) < 0.2,
+                             -value, value)
+        if varname in SPOUSE_VARS:
+            nonzero = np.logical_and(nonzero, joint)
+        data[varname] = np.round(np.where(nonzero, value, 0.), 2)
+    # enforce the relationships checked in the Records class constructor
+    for var in ['e00200', 'e00900', 'e02100']:
+        data[var] = data[var + 'p'] + data[var + 's']
+    data['e00650'] = np.round(
+        data['e00600'] * rng.uniform(size=num_units), 2)
+    data['e01700'] = np.round(
+        data['e01500'] * rng.uniform(size=num_units), 2)
+    data['s006'] = np.round(rng.uniform(50., 150., size=num_units), 2)
+    # generate sample weights that grow by one percent per year
+    weights = dict()
+    for year in range(start_year, GrowFactors().last_year + 1):
+        growth = 1.01 ** (year - start_year)
+        weights['WT{}'.format(year)] = np.round(
+            data['s006'] * 100. * growth).astype(np.int64)
+    return (pd.DataFrame(data, columns=sorted(data)),
+            pd.DataFrame(weights, columns=sorted(weights)))
+
+
+def synthetic_records(num_units, seed=BENCHMARK_SEED,
+                      start_year=Records.CPSCSV_YEAR):
+    """
+    Return Records object containing num_units synthetic filing units
+    generated by the synthetic_records_data function and using the
+    default grow factors to extrapolate the data after start_year.
+    """
+    data, weights = synthetic_records_data(num_units, seed, start_year)
+    return Records(data=data,
+                   gfactors=GrowFactors(),
+                   weights=weights,
+                   adjust_ratios=None,
+                   start_year=start_year)
+
+
+def bundled_reforms():
+    """
+    Return sorted list of names of the reform files in the taxcalc/reforms
+    directory, with each name lacking the .json extension.
+    """
+    if not os.path.isdir(REFORMS_PATH):
+        return list()
+    return sorted(os.path.splitext(fname)[0]
+                  for fname in os.listdir(REFORMS_PATH)
+                  if fname.endswith('.json'))
+
+
+def _reform_policy(reform_name):
+    """
+    Return Policy object that implements the named bundled reform.
+    """
+    reform_path = os.path.join(REFORMS_PATH, reform_name + '.json')
+    if not os.path.isfile(reform_path):
+        msg = 'reform {} is not in the {} directory'
+        raise ValueError(msg.format(reform_name, REFORMS_PATH))
+    params = Calculator.read_json_param_objects(reform_path, None)
+    policy = Policy()
+    policy.implement_reform(params['policy'])
+    return policy
+
+
+def _measure(func, repeat):
+    """
+    Call func once to warm up the just-in-time compiled code, then call
+    it repeat times and finally call it once more while tracing memory
+    allocations.  Return (wall_time, peak_memory) tuple containing the
+    minimum wall time in seconds and the peak number of bytes allocated
+    during the traced call.
+    """
+    func()
+    wall_time = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        wall_time = min(wall_time, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return wall_time, peak_memory
+
+
+def run_benchmarks(sizes=None, reforms=None, year=BENCHMARK_YEAR,
+                   repeat=BENCHMARK_REPEAT, seed=BENCHMARK_SEED,
+                   response_reform=RESPONSE_REFORM):
+    """
+    Time the calc_all, mtr, Behavior.response, and create_distribution_table
+    entry points under current-law policy, and the calc_all method under
+    each of the named bundled reforms, for synthetic samples containing
+    each of the specified sizes number of filing units in the specified
+    year.  When sizes is None, BENCHMARK_SIZES is used; when reforms is None,
+    all the bundled reforms are used.  The Behavior.response benchmark
+    uses the response_reform bundled reform and RESPONSE_ELASTICITIES.
+
+    Returns dictionary containing a description of the environment and a
+    'results' list containing for each benchmark a dictionary with name,
+    num_units, wall_time (in seconds), peak_memory (in bytes allocated
+    during the call), and records_per_sec items.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    if sizes is None:
+        sizes = BENCHMARK_SIZES
+    if reforms is None:
+        reforms = bundled_reforms()
+    if repeat < 1:
+        raise ValueError('repeat < 1')
+    if not sizes or min(sizes) < 1:
+        raise ValueError('sizes must contain only positive integers')
+    reform_policies = [(name, _reform_policy(name)) for name in reforms]
+    behavior = Behavior()
+    behavior.update_behavior({year: RESPONSE_ELASTICITIES})
+    results = list()
+
+    def record(name, num_units, func):
+        """
+        Measure func and append its results to the results list.
+        """
+        wall_time, peak_memory = _measure(func, repeat)
+        results.append({'name': name,
+                        'num_units': num_units,
+                        'wall_time': wall_time,
+                        'peak_memory': peak_memory,
+                        'records_per_sec': num_units / wall_time})
+
+    for num_units in sizes:
+        recs = synthetic_records(num_units, seed)
+        calc1 = Calculator(policy=Policy(), records=recs,
+                           verbose=False, copy_on_write=True)
+        calc1.advance_to_year(year)
+        record('calc_all', num_units, calc1.calc_all)
+        record('mtr', num_units,
+               lambda: calc1.mtr('e00200p', calc_all_already_called=True))
+        record('create_distribution_table', num_units,
+               lambda: create_distribution_table(
+                   calc1.distribution_table_dataframe(),
+                   groupby='weighted_deciles',
+                   income_measure='expanded_income'))
+        calc2 = Calculator(policy=_reform_policy(response_reform),
+                           records=recs, behavior=behavior,
+                           verbose=False, copy_on_write=True)
+        calc2.advance_to_year(year)
+        record('Behavior.response', num_units,
+               lambda: Behavior.response(calc1, calc2))
+        del calc2
+        for name, policy in reform_policies:
+            calc = Calculator(policy=policy, records=recs,
+                              verbose=False, copy_on_write=True)
+            calc.advance_to_year(year)
+            record('calc_all:{}'.format(name), num_units, calc.calc_all)
+            del calc
+        del calc1
+        del recs
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'year': year,
+            'repeat': repeat,
+            'seed': seed,
+            'results': results}
+
+
+def compare_benchmarks(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compare results with baseline, where both are dictionaries returned by
+    the run_benchmarks function (or read from files written by it).
+
+    Returns Pandas DataFrame containing a row for each benchmark that has
+    the same name and num_units in both results and baseline, with the
+    time_ratio and memory_ratio columns containing results over baseline
+    ratios and the regression column being True when either ratio exceeds
+    one plus the specified tolerance.
+    """
+    if tolerance < 0.:
+        raise ValueError('tolerance < 0')
+    base = {(res['name'], res['num_units']): res
+            for res in baseline['results']}
+    rows = list()
+    for res in results['results']:
+        key = (res['name'], res['num_units'])
+        if key not in base:
+            continue
+        bres = base[key]
+        rows.append({'name': res['name'],
+                     'num_units': res['num_units'],
+                     'base_wall_time': bres['wall_time'],
+                     'wall_time': res['wall_time'],
+                     'time_ratio': res['wall_time'] / bres['wall_time'],
+                     'base_peak_memory': bres['peak_memory'],
+                     'peak_memory': res['peak_memory'],
+                     'memory_ratio': (float(res['peak_memory']) /
+                                      max(bres['peak_memory'], 1))})
+    columns = ['name', 'num_units', 'base_wall_time', 'wall_time',
+               'time_ratio', 'base_peak_memory', 'peak_memory',
+               'memory_ratio']
+    table = pd.DataFrame(rows, columns=columns)
+    table['regression'] = np.logical_or(table['time_ratio'] > 1. + tolerance,
+                                        table['memory_ratio'] > 1. + tolerance)
+    return table
+
+
+def cli_benchmark_main():
+    """
+    Contains command-line interface to the Tax-Calculator benchmark suite.
+    Returns 1 if a comparison with a baseline file finds a regression;
+    otherwise returns 0.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m taxcalc.benchmarks',
+        description=('Times Tax-Calculator entry points on synthetic '
+                     'filing units and writes the results to a JSON file, '
+                     'optionally comparing them with a baseline file.'))
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=BENCHMARK_SIZES,
+                        help=('number of synthetic filing units in each '
+                              'benchmark sample; default is {}'.format(
+                                  ' '.join(str(s) for s in BENCHMARK_SIZES))))
+    parser.add_argument('--reforms', nargs='*', default=None,
+                        help=('names of bundled reforms to benchmark; '
+                              'default is all; none if no names'))
+    parser.add_argument('--year', type=int, default=BENCHMARK_YEAR,
+                        help='calendar year of calculations')
+    parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT,
+                        help='number of timed calls of each entry point')
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED,
+                        help='seed used to generate synthetic data')
+    parser.add_argument('--output', default=RESULTS_FILENAME,
+                        help='name of JSON results file')
+    parser.add_argument('--baseline', default=None,
+                        help='name of JSON baseline file to compare with')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write results to BASELINE without comparing')
+    parser.add_argument('--tolerance', type=float,
+                        default=REGRESSION_TOLERANCE,
+                        help='relative slowdown or growth flagged')
+    args = parser.parse_args()
+    if args.save_baseline and args.baseline is None:
+        sys.stderr.write('ERROR: --save-baseline requires --baseline\n')
+        return 1
+    results = run_benchmarks(sizes=args.sizes, reforms=args.reforms,
+                             year=args.year, repeat=args.repeat,
+                             seed=args.seed)
+    with open(args.output, 'w') as rfile:
+        json.dump(results, rfile, indent=2)
+    for res in results['results']:
+        sys.stdout.write('{:>40} {:>8} {:9.3f}s {:9.1f}MB {:12.0f}/s\n'.format(
+            res['name'], res['num_units'], res['wall_time'],
+            res['peak_memory'] / 1e6, res['records_per_sec']))
+    if args.baseline is None:
+        return 0
+    if args.save_baseline:
+        with open(args.baseline, 'w') as bfile:
+            json.dump(results, bfile, indent=2)
+        return 0
+    with open(args.baseline) as bfile:
+        baseline = json.load(bfile)
+    table = compare_benchmarks(results, baseline, args.tolerance)
+    sys.stdout.write(table.to_string(index=False,
+                                     float_format='{:.3f}'.format) + '\n')
+    if table['regression'].any():
+        sys.stdout.write('REGRESSION in {} benchmark(s)\n'.format(
+            table['regression'].sum()))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(cli_benchmark_main())
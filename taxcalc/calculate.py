@@ -11,6 +11,8 @@ import os
 import json
 import re
 import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 from taxcalc.functions import (TaxInc, SchXYZTax, GainsTax, AGIsurtax,
@@ -34,14 +36,228 @@ from taxcalc.growdiff import GrowDiff
 from taxcalc.growfactors import GrowFactors
 from taxcalc.utils import (DIST_VARIABLES, create_distribution_table,
                            DIFF_VARIABLES, create_difference_table,
+                           distribution_table_sums, difference_table_sums,
+                           finish_distribution_table, finish_difference_table,
+                           TableRows,
                            create_diagnostic_table,
                            ce_aftertax_expanded_income,
                            mtr_graph_data, atr_graph_data, xtr_graph_plot,
                            dec_graph_data, dec_graph_plot,
                            pch_graph_data, pch_graph_plot)
+from taxcalc.decorators import fuse_iterate_jit
 # import pdb
 
 
+# Functions called by Calculator._taxinc_to_amt method
+TAXINC_TO_AMT_STEPS = [TaxInc, SchXYZTax, GainsTax, AGIsurtax,
+                       NetInvIncTax, AMT]
+
+# Functions called by Calculator._calc_itemded_to_iitax method after the
+# last call of the Calculator._taxinc_to_amt method
+CREDITS_TO_IITAX_STEPS = [F2441, EITC, ChildDepTaxCredit, PersonalTaxCredit,
+                          AmOppCreditParts, SchR, EducationTaxCredit,
+                          CharityCredit, NonrefundableCredits, AdditionalCTC,
+                          C1040, CTC_new, IITAX]
+
+# Records variables changed by Calculator._calc_itemded_to_iitax method
+ITEMDED_TO_IITAX_VARS = sorted(set(
+    varname
+    for func in ([ItemDed, StdDed] + TAXINC_TO_AMT_STEPS +
+                 CREDITS_TO_IITAX_STEPS)
+    for varname in func.out_args))
+
+# Functions called by the Calculator.calc_all method (when fused is False)
+# in calling order, where a string is the name of a Calculator method
+CALC_ALL_STEPS = ([BenefitPrograms, EI_PayrollTax, DependentCare, Adj,
+                   ALD_InvInc_ec_base, CapGains, SSBenefits, UBI, AGI,
+                   ItemDedCap, AdditionalMedicareTax, ItemDed, StdDed,
+                   '_taxes_with_optimal_deduction'] +
+                  CREDITS_TO_IITAX_STEPS +
+                  [BenefitSurtax, BenefitLimitation, FairShareTax,
+                   LumpSumTax, ExpandIncome, AfterTaxIncome])
+
+# Functions in CALC_ALL_STEPS that take a Calculator object as argument
+CALC_ALL_CALCULATOR_STEPS = [BenefitPrograms, BenefitSurtax,
+                             BenefitLimitation]
+
+
+def _calc_all_dependencies():
+    """
+    Return list containing for each of the CALC_ALL_STEPS a tuple of the
+    step name, the set of Records variables and policy parameters the step
+    reads, and the set of Records variables the step writes.  The sets are
+    taken from the iterate_jit argument lists when available and otherwise
+    are specified here.  Each step is assumed to read every variable it
+    writes, which is true of many iterate_jit functions.
+    """
+    benefits = ['housing', 'ssi', 'snap', 'tanf', 'vet', 'wic', 'mcare',
+                'mcaid', 'other']
+    benefit_vars = (['{}_ben'.format(ben) for ben in benefits] +
+                    ['e02400', 'e02300'])
+    deduction_vars = ['standard', 'c04470', 'c21060', 'c21040']
+    tax_vars = ['iitax', 'combined', 'surtax']
+    taxinc_to_amt_inputs = set(deduction_vars)
+    taxinc_to_amt_outputs = set(deduction_vars)
+    for func in TAXINC_TO_AMT_STEPS:
+        taxinc_to_amt_inputs.update(func.in_args)
+        taxinc_to_amt_outputs.update(func.out_args)
+    itemded_to_iitax_inputs = taxinc_to_amt_inputs.copy()
+    for func in [ItemDed, StdDed] + CREDITS_TO_IITAX_STEPS:
+        itemded_to_iitax_inputs.update(func.in_args)
+    specified = {
+        'BenefitPrograms': (
+            set(benefit_vars +
+                ['BEN_{}_repeal'.format(ben)
+                 for ben in benefits + ['oasdi', 'ui']] +
+                ['BEN_{}_value'.format(ben)
+                 for ben in benefits if ben != 'ssi']),
+            set(benefit_vars + ['benefit_cost_total', 'benefit_value_total'])
+        ),
+        '_taxes_with_optimal_deduction': (
+            taxinc_to_amt_inputs, taxinc_to_amt_outputs
+        ),
+        'BenefitSurtax': (
+            itemded_to_iitax_inputs |
+            set(tax_vars + ['c00100', 'MARS', 'ID_BenefitSurtax_crt',
+                            'ID_BenefitSurtax_Switch', 'ID_BenefitSurtax_em',
+                            'ID_BenefitSurtax_trt']),
+            set(tax_vars)
+        ),
+        'BenefitLimitation': (
+            itemded_to_iitax_inputs |
+            set(tax_vars + ['c17000', 'e18400_capped', 'e18500_capped',
+                            'c20500', 'c20800', 'c19200', 'c19700',
+                            'ID_BenefitCap_rt', 'ID_BenefitCap_Switch']),
+            set(tax_vars)
+        )
+    }
+    dependencies = list()
+    for step in CALC_ALL_STEPS:
+        name = step if isinstance(step, str) else step.__name__
+        if name in specified:
+            inputs, outputs = specified[name]
+        else:
+            inputs, outputs = set(step.in_args), set(step.out_args)
+        dependencies.append((name, inputs | outputs, outputs))
+    return dependencies
+
+
+CALC_ALL_DEPENDENCIES = _calc_all_dependencies()
+
+# Single-loop versions of the first and second parts of the
+# Calculator._calc_one_year method, with the second part choosing between
+# standard and itemized deductions one record at a time (there are two
+# parts because one function using all the variables would need too
+# many arguments)
+FUSED_CALC_ONE_YEAR_PARTS = [
+    fuse_iterate_jit(
+        [EI_PayrollTax, DependentCare, Adj, ALD_InvInc_ec_base, CapGains,
+         SSBenefits, UBI, AGI, ItemDedCap, ItemDed, AdditionalMedicareTax,
+         StdDed],
+        nopython=True, nogil=True),
+    fuse_iterate_jit(
+        # calculate taxes with standard deduction
+        [('std = standard[i]\n'
+          'item = c04470[i]\n'
+          'item_no_limit = c21060[i]\n'
+          'item_phaseout = c21040[i]\n'
+          'c04470[i] = 0.\n'
+          'c21060[i] = 0.\n'
+          'c21040[i] = 0.')] +
+        TAXINC_TO_AMT_STEPS +
+        # calculate taxes without standard deduction
+        [('std_taxes = c05800[i]\n'
+          'standard[i] = 0.\n'
+          'c21060[i] = item_no_limit\n'
+          'c21040[i] = item_phaseout\n'
+          'c04470[i] = item')] +
+        TAXINC_TO_AMT_STEPS +
+        # calculate taxes with optimal itemized deduction
+        [('item_taxes = c05800[i]\n'
+          'if item_taxes < std_taxes:\n'
+          '    standard[i] = 0.\n'
+          '    c04470[i] = item\n'
+          '    c21060[i] = item_no_limit\n'
+          '    c21040[i] = item_phaseout\n'
+          'else:\n'
+          '    standard[i] = std\n'
+          '    c04470[i] = 0.\n'
+          '    c21060[i] = 0.\n'
+          '    c21040[i] = 0.')] +
+        TAXINC_TO_AMT_STEPS +
+        [F2441, EITC, ChildDepTaxCredit, PersonalTaxCredit,
+         AmOppCreditParts, SchR, EducationTaxCredit, CharityCredit,
+         NonrefundableCredits, AdditionalCTC, C1040, CTC_new, IITAX],
+        nopython=True, nogil=True)
+]
+
+
+class _StageProfile(object):
+    """
+    Accumulates the wall time, call count, and bytes touched by each stage
+    of a Calculator.calc_all call made with profile=True.  Copies of a
+    profiled Calculator object share (rather than copy) its _StageProfile
+    object: shallow copies share it like any other attribute and deep
+    copies share it because __deepcopy__ returns the object itself.  So
+    the work done by stages nested within another stage (for example, in
+    the shallow _itemded_scratch_copy of the Calculator that ComputeBenefit
+    uses in the BenefitSurtax and BenefitLimitation stages) is attributed
+    to the enclosing stage.
+    """
+
+    def __init__(self):
+        self.stats = dict()
+        self.order = list()
+        self.touched = None
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def touch(self, value):
+        """
+        Record value as touched by the active stage if value is an array.
+        """
+        if self.touched is not None and isinstance(value, np.ndarray):
+            self.touched[id(value)] = value.nbytes
+
+    def touch_args(self, func, args):
+        """
+        Record as touched the arrays named in the argument lists that
+        iterate_jit and fuse_iterate_jit attach to func.
+        """
+        argnames = (getattr(func, 'out_args', []) +
+                    getattr(func, 'in_args', []) +
+                    getattr(func, 'rec_args', []) +
+                    getattr(func, 'par_args', []))
+        for argname in argnames:
+            for obj in args:
+                if hasattr(obj, argname):
+                    self.touch(getattr(obj, argname))
+                    break
+
+    def record(self, name, wall_time):
+        """
+        Add results of the just finished stage to the stats for name.
+        """
+        if name not in self.stats:
+            self.stats[name] = [0, 0., 0]
+            self.order.append(name)
+        stats = self.stats[name]
+        stats[0] += 1
+        stats[1] += wall_time
+        stats[2] += sum(self.touched.values())
+        self.touched = None
+
+    def table(self):
+        """
+        Return Pandas DataFrame containing the stats for each stage.
+        """
+        table = pd.DataFrame([self.stats[name] for name in self.order],
+                             index=pd.Index(self.order, name='stage'),
+                             columns=['calls', 'wall_time', 'bytes_touched'])
+        return table
+
+
 class Calculator(object):
     """
     Constructor for the Calculator class.
@@ -76,6 +292,14 @@ class Calculator(object):
         which implies no behavioral responses to policy reform;
         when argument is an object it is copied for internal use
 
+    copy_on_write: boolean
+        specifies whether the records argument is deep copied for internal
+        use (when false) or copied using Records.shared_copy() so that
+        variable arrays are shared with the records argument until they
+        are changed (when true), which uses much less memory when several
+        Calculator objects are constructed using the same Records object;
+        default value is false.
+
     Raises
     ------
     ValueError:
@@ -100,16 +324,22 @@ class Calculator(object):
     # pylint: disable=too-many-public-methods
 
     def __init__(self, policy=None, records=None, verbose=True,
-                 sync_years=True, consumption=None, behavior=None):
+                 sync_years=True, consumption=None, behavior=None,
+                 copy_on_write=False):
         # pylint: disable=too-many-arguments,too-many-branches
         if isinstance(policy, Policy):
             self.__policy = copy.deepcopy(policy)
         else:
             raise ValueError('must specify policy as a Policy object')
         if isinstance(records, Records):
-            self.__records = copy.deepcopy(records)
+            if copy_on_write:
+                self.__records = records.shared_copy()
+            else:
+                self.__records = copy.deepcopy(records)
         else:
             raise ValueError('must specify records as a Records object')
+        # calc_all stages are profiled only while profile is not None
+        self.__profile = None
         if self.__policy.current_year < self.__records.data_year:
             self.__policy.set_year(self.__records.data_year)
         if consumption is None:
@@ -173,20 +403,149 @@ class Calculator(object):
             self.increment_year()
         assert self.current_year == year
 
-    def calc_all(self, zero_out_calc_vars=False):
+    def calc_all(self, zero_out_calc_vars=False, fused=False, n_jobs=1,
+                 profile=False, changed=None):
         """
         Call all tax-calculation functions for the current_year.
+
+        When fused is True, the many functions called by _calc_one_year
+        are replaced by a single function that does all their work in one
+        loop over the records, which produces the same results using less
+        memory bandwidth (but the first such call takes time to compile).
+
+        When n_jobs is greater than one, the records are split into n_jobs
+        contiguous chunks that are calculated at the same time in separate
+        threads, which produces the same results as a single calculation.
+
+        When profile is True, return a Pandas DataFrame indexed by stage
+        name (for example, EI_PayrollTax, ItemDed, the three _taxinc_to_amt
+        passes, and BenefitSurtax) that contains the number of calls, the
+        total wall time in seconds, and the total bytes touched by each
+        stage, where bytes touched is the size of the distinct arrays each
+        stage call reads or writes; when profile is False (the default),
+        return None without any timing overhead.  The work done by stages
+        nested within another stage is included in the enclosing stage.
+        Profiling is not available when n_jobs is greater than one.
+
+        When changed is not None, it is a collection of names of Records
+        variables and policy parameters whose values have changed since
+        the last calc_all call for the current_year, and only the functions
+        returned by Calculator.affected_steps(changed) are called, which
+        produces the same results as calling all the functions.  The
+        changed argument cannot be used with zero_out_calc_vars, fused,
+        or n_jobs argument values that differ from their defaults.
         """
         # conducts static analysis of Calculator object for current_year
         assert self.__records.current_year == self.__policy.current_year
-        BenefitPrograms(self)
-        self._calc_one_year(zero_out_calc_vars)
-        BenefitSurtax(self)
-        BenefitLimitation(self)
-        FairShareTax(self.__policy, self.__records)
-        LumpSumTax(self.__policy, self.__records)
-        ExpandIncome(self.__policy, self.__records)
-        AfterTaxIncome(self.__policy, self.__records)
+        if changed is not None:
+            if zero_out_calc_vars or fused or n_jobs > 1:
+                msg = ('changed requires default zero_out_calc_vars, '
+                       'fused, and n_jobs values')
+                raise ValueError(msg)
+            steps = Calculator.affected_steps(changed)
+        # calculated variables are changed in place below
+        self.__records.unshare(Records.CHANGING_CALCULATED_VARS)
+        if n_jobs > 1:
+            if profile:
+                raise ValueError('profile=True requires n_jobs=1')
+            self._calc_all_in_chunks(zero_out_calc_vars, fused, n_jobs)
+            return None
+        if profile:
+            self.__profile = _StageProfile()
+        try:
+            if changed is not None:
+                self._calc_steps(steps)
+            else:
+                self._stage(BenefitPrograms, (self,))
+                self._calc_one_year(zero_out_calc_vars, fused)
+                self._stage(BenefitSurtax, (self,))
+                self._stage(BenefitLimitation, (self,))
+                self._stage(FairShareTax)
+                self._stage(LumpSumTax)
+                self._stage(ExpandIncome)
+                self._stage(AfterTaxIncome)
+        finally:
+            profile_results = self.__profile
+            self.__profile = None
+        if profile_results is None:
+            return None
+        return profile_results.table()
+
+    @staticmethod
+    def dependency_graph():
+        """
+        Return dictionary that describes the dependencies among the
+        functions called by the calc_all method, with each key being the
+        name of a function (in calling order) and each value being a
+        dictionary containing 'inputs' (the sorted names of the Records
+        variables and policy parameters read by the function), 'outputs'
+        (the sorted names of the Records variables written by the function),
+        and 'successors' (the names of the later functions that read any
+        of the outputs), which together define a directed acyclic graph.
+        """
+        graph = dict()
+        for idx, (name, inputs, outputs) in enumerate(CALC_ALL_DEPENDENCIES):
+            successors = [later[0] for later in CALC_ALL_DEPENDENCIES[idx + 1:]
+                          if later[1] & outputs]
+            graph[name] = {'inputs': sorted(inputs),
+                           'outputs': sorted(outputs),
+                           'successors': successors}
+        return graph
+
+    @staticmethod
+    def affected_steps(changed):
+        """
+        Return list of the names (in calling order) of the functions called
+        by the calc_all method that must be called again to update the
+        results of a calc_all call after the values of the changed Records
+        variables and policy parameters (with or without the leading
+        underscore used in reforms) have been changed.  Besides the
+        functions that read a changed value, directly or through other
+        functions, the list includes the earlier functions that write a
+        variable that an included function also writes, because such a
+        variable does not hold the value read by the included function
+        after a calc_all call.  The surtax variable is an exception to this
+        rule because it is a subtotal that is not used to compute any other
+        variable and that is added to (rather than reset) by each step that
+        writes it.
+
+        Raises ValueError if a changed name is neither a Records variable
+        nor a policy parameter.
+        """
+        if Records.USABLE_READ_VARS is None:
+            Records.read_var_info()
+        known = Records.USABLE_READ_VARS | Records.CALCULATED_VARS
+        for _, inputs, _ in CALC_ALL_DEPENDENCIES:
+            known.update(inputs)
+        names = set(name[1:] if name.startswith('_') else name
+                    for name in changed)
+        unknown = names - known
+        if unknown:
+            params = set(pname[1:] for pname in Policy.default_data())
+            unknown -= params
+        if unknown:
+            msg = 'changed names {} are not variables or parameters'
+            raise ValueError(msg.format(sorted(unknown)))
+        writers = dict()
+        for idx, (_, _, outputs) in enumerate(CALC_ALL_DEPENDENCIES):
+            for varname in outputs:
+                writers.setdefault(varname, list()).append(idx)
+        steps = set()
+        while True:
+            modified = set(names)
+            new_steps = set()
+            for idx, (_, inputs, outputs) in enumerate(CALC_ALL_DEPENDENCIES):
+                if idx in steps or inputs & modified:
+                    new_steps.add(idx)
+                    modified |= outputs
+            for idx in list(new_steps):
+                for varname in CALC_ALL_DEPENDENCIES[idx][2] - {'surtax'}:
+                    earlier = [widx for widx in writers[varname] if widx < idx]
+                    if earlier:
+                        new_steps.add(max(earlier))
+            if new_steps == steps:
+                return [CALC_ALL_DEPENDENCIES[idx][0] for idx in sorted(steps)]
+            steps = new_steps
 
     def weighted_total(self, variable_name):
         """
@@ -201,6 +560,17 @@ class Calculator(object):
         """
         return self.array('s006').sum()
 
+    def table_rows(self):
+        """
+        Return TableRows object containing the table rows of the filing units
+        defined by the current expanded_income and s006 values of self.
+        Passing the returned object to the table and graph methods of self
+        (and to the table functions in the utils module) means the rows of
+        each groupby type are computed only once for all of those tables.
+        The returned object does not change when self is recalculated.
+        """
+        return TableRows(self.array('expanded_income'), self.array('s006'))
+
     def dataframe(self, variable_list):
         """
         Return pandas DataFrame containing the listed variables from embedded
@@ -229,6 +599,64 @@ class Calculator(object):
             pdf['c09600'] > 0., 0.)
         return pdf
 
+    def run_budget_window(self, first_year, last_year, calc=None):
+        """
+        Generator that calculates self and the optional calc for each year
+        from first_year through last_year, advancing the Calculator objects
+        one year at a time so that their records are read and extrapolated
+        only once for the whole budget window.  This method changes the
+        Calculator object(s) by advancing them to last_year.
+
+        Parameters
+        ----------
+        first_year : integer
+            first year of budget window, which must be no earlier than
+            the current year of self
+
+        last_year : integer
+            last year of budget window, which must be no earlier than
+            first_year
+
+        calc : Calculator object or None
+            typically represents the reform while self represents the
+            baseline; calc must have the same current year as self
+
+        Yields
+        ------
+        (year, results1, results2) tuple for each year in the budget window,
+        where results1 is the distribution_table_dataframe() of self and
+        results2 is the distribution_table_dataframe() of calc (including
+        any behavioral responses specified for calc), or None if calc is None
+
+        Typical usage
+        -------------
+        for year, dv1, dv2 in calc1.run_budget_window(2018, 2027, calc2):
+            ...tabulate the year's results...
+        """
+        if first_year < self.current_year:
+            msg = 'first_year={} < current_year={}'
+            raise ValueError(msg.format(first_year, self.current_year))
+        if last_year < first_year:
+            msg = 'last_year={} < first_year={}'
+            raise ValueError(msg.format(last_year, first_year))
+        if calc is not None and calc.current_year != self.current_year:
+            msg = 'calc current_year={} != self current_year={}'
+            raise ValueError(msg.format(calc.current_year, self.current_year))
+        for year in range(first_year, last_year + 1):
+            self.advance_to_year(year)
+            self.calc_all()
+            results2 = None
+            if calc is not None:
+                calc.advance_to_year(year)
+                if calc.behavior_has_response():
+                    calc_behv = Behavior.response(self, calc)
+                    results2 = calc_behv.distribution_table_dataframe()
+                    del calc_behv
+                else:
+                    calc.calc_all()
+                    results2 = calc.distribution_table_dataframe()
+            yield (year, self.distribution_table_dataframe(), results2)
+
     def array(self, variable_name, variable_value=None):
         """
         If variable_value is None, return numpy ndarray containing the
@@ -238,8 +666,12 @@ class Calculator(object):
          ignored).
         """
         if variable_value is None:
+            if self.__profile is not None:
+                self.__profile.touch(getattr(self.__records, variable_name))
             return getattr(self.__records, variable_name)
         assert isinstance(variable_value, np.ndarray)
+        if self.__profile is not None:
+            self.__profile.touch(variable_value)
         setattr(self.__records, variable_name, variable_value)
         return None
 
@@ -258,14 +690,13 @@ class Calculator(object):
         Add variable_add to named variable in embedded Records object.
         """
         assert isinstance(variable_add, np.ndarray)
-        setattr(self.__records, variable_name,
-                self.array(variable_name) + variable_add)
+        self.array(variable_name, self.array(variable_name) + variable_add)
 
     def zeroarray(self, variable_name):
         """
         Set named variable in embedded Records object to zeros.
         """
-        setattr(self.__records, variable_name, np.zeros(self.array_len))
+        self.array(variable_name, np.zeros(self.array_len))
 
     def store_records(self):
         """
@@ -305,6 +736,13 @@ class Calculator(object):
         """
         return self.__records.array_length
 
+    @property
+    def records_compact(self):
+        """
+        True if embedded Records object stores its variables compactly.
+        """
+        return self.__records.compact
+
     def policy_param(self, param_name, param_value=None):
         """
         If param_value is None, return named parameter in
@@ -425,7 +863,7 @@ class Calculator(object):
         del diag
         return pd.concat(tlist, axis=1)
 
-    def distribution_tables(self, calc, groupby):
+    def distribution_tables(self, calc, groupby, table_rows=None):
         """
         Get results from self and calc, sort them by expanded_income into
         table rows defined by groupby, compute grouped statistics, and
@@ -445,6 +883,11 @@ class Calculator(object):
             options for input: 'weighted_deciles', 'standard_income_bins'
             determines how the columns in resulting Pandas DataFrame are sorted
 
+        table_rows : TableRows object or None
+            object returned by self.table_rows(), which is used to avoid
+            computing the table rows again; if None (which is the default),
+            the table rows are computed by this method
+
         Return and typical usage
         ------------------------
         dist1, dist2 = calc1.distribution_tables(calc2, 'weighted_deciles')
@@ -465,45 +908,28 @@ class Calculator(object):
               positive (denoted by a 0-10p row label) values of the
               specified income_measure.
         """
-        # nested function used only by this method
-        def have_same_income_measure(calc1, calc2):
-            """
-            Return true if calc1 and calc2 contain the same expanded_income;
-            otherwise, return false.  (Note that "same" means nobody's
-            expanded_income differs by more than one cent.)
-            """
-            im1 = calc1.array('expanded_income')
-            im2 = calc2.array('expanded_income')
-            return np.allclose(im1, im2, rtol=0.0, atol=0.01)
-        # main logic of method
         assert calc is None or isinstance(calc, Calculator)
         assert (groupby == 'weighted_deciles' or
                 groupby == 'standard_income_bins')
         if calc is not None:
             assert np.allclose(self.array('s006'),
                                calc.array('s006'))  # check rows in same order
+        if table_rows is None:
+            table_rows = self.table_rows()
         var_dataframe = self.distribution_table_dataframe()
         imeasure = 'expanded_income'
-        dt1 = create_distribution_table(var_dataframe, groupby, imeasure)
+        dt1 = create_distribution_table(var_dataframe, groupby, imeasure,
+                                        table_rows=table_rows)
         del var_dataframe
         if calc is None:
             dt2 = None
         else:
-            assert calc.current_year == self.current_year
-            assert calc.array_len == self.array_len
-            assert np.allclose(self.consump_benval_params(),
-                               calc.consump_benval_params())
-            var_dataframe = calc.distribution_table_dataframe()
-            if have_same_income_measure(self, calc):
-                imeasure = 'expanded_income'
-            else:
-                imeasure = 'expanded_income_baseline'
-                var_dataframe[imeasure] = self.array('expanded_income')
-            dt2 = create_distribution_table(var_dataframe, groupby, imeasure)
-            del var_dataframe
+            dt2 = self._reform_distribution_table(calc, groupby,
+                                                  table_rows=table_rows)
         return (dt1, dt2)
 
-    def difference_table(self, calc, groupby, tax_to_diff):
+    def difference_table(self, calc, groupby, tax_to_diff,
+                         table_rows=None):
         """
         Get results from self and calc, sort them by expanded_income into
         table rows defined by groupby, compute grouped statistics, and
@@ -526,6 +952,11 @@ class Calculator(object):
             options for input: 'iitax', 'payrolltax', 'combined'
             specifies which tax to difference
 
+        table_rows : TableRows object or None
+            object returned by self.table_rows(), which is used to avoid
+            computing the table rows again; if None (which is the default),
+            the table rows are computed by this method
+
         Returns and typical usage
         -------------------------
         diff = calc1.difference_table(calc2, 'weighted_deciles', 'iitax')
@@ -553,11 +984,295 @@ class Calculator(object):
         calc_var_dataframe = calc.dataframe(DIFF_VARIABLES)
         diff = create_difference_table(self_var_dataframe,
                                        calc_var_dataframe,
-                                       groupby, tax_to_diff)
+                                       groupby, tax_to_diff,
+                                       table_rows=table_rows)
         del self_var_dataframe
         del calc_var_dataframe
         return diff
 
+    def score_reforms(self, reforms, groupby='weighted_deciles',
+                      tax_to_diff='combined', n_jobs=1):
+        """
+        Calculate each of several reforms for the current year using the
+        records of self, which represents the baseline, and return a list
+        containing a (dist, diff) pair of tables for each reform.
+        This method calls self.calc_all() once and otherwise leaves self
+        unchanged.  The reform Calculator objects share the (already
+        extrapolated) records of self until their calculations change
+        the values of record variables, so the records are not read or
+        extrapolated again and the baseline is calculated only once.
+
+        Parameters
+        ----------
+        reforms : list of dictionaries
+            each dictionary is like those returned by the
+            read_json_param_objects method; the policy, consumption, and
+            behavior dictionaries are applied to copies of the baseline
+            Policy, Consumption, and Behavior objects; the growdiff and
+            growmodel dictionaries must be empty because the records are
+            extrapolated only once using the baseline grow factors
+
+        groupby : String object
+            options for input: 'weighted_deciles', 'standard_income_bins'
+            determines how the rows of the returned tables are sorted
+
+        tax_to_diff : String object
+            options for input: 'iitax', 'payrolltax', 'combined'
+            specifies which tax to difference
+
+        n_jobs : integer
+            number of reforms calculated at the same time in separate
+            threads (the calculation functions release the Python global
+            interpreter lock); default value is one
+
+        Returns
+        -------
+        list containing, in the order of the reforms list, a (dist, diff)
+        tuple for each reform, where dist is the same as the second table
+        returned by self.distribution_tables(calc, groupby) and diff is the
+        same as the table returned by
+        self.difference_table(calc, groupby, tax_to_diff) when calc is the
+        reform Calculator object (including any behavioral responses).
+        """
+        assert (groupby == 'weighted_deciles' or
+                groupby == 'standard_income_bins')
+        if n_jobs < 1:
+            msg = 'n_jobs={} is less than one'
+            raise ValueError(msg.format(n_jobs))
+        # construct reform parameter objects before doing any calculations
+        reform_params = list()
+        for idx, param_dict in enumerate(reforms):
+            for key in ['growdiff_baseline', 'growdiff_response', 'growmodel']:
+                if param_dict.get(key):
+                    msg = 'reform {} has {} that changes the records'
+                    raise ValueError(msg.format(idx, key))
+            pol = copy.deepcopy(self.__policy)
+            con = copy.deepcopy(self.__consumption)
+            beh = copy.deepcopy(self.__behavior)
+            for obj in [pol, con, beh]:
+                obj.set_year(obj.start_year)
+            pol.implement_reform(param_dict.get('policy', dict()))
+            con.update_consumption(param_dict.get('consumption', dict()))
+            beh.update_behavior(param_dict.get('behavior', dict()))
+            for obj in [pol, con, beh]:
+                obj.set_year(self.current_year)
+            reform_params.append((pol, con, beh))
+        # calculate baseline once
+        self.calc_all()
+        base_diff_dataframe = self.dataframe(DIFF_VARIABLES)
+        table_rows = self.table_rows()
+        table_rows.codes(groupby)  # compute rows before starting any threads
+
+        def score(params):
+            """
+            Return (dist, diff) tables for reform with specified params.
+            """
+            pol, con, beh = params
+            calc = Calculator(policy=pol, records=self.__records,
+                              verbose=False, sync_years=False,
+                              consumption=con, behavior=beh,
+                              copy_on_write=True)
+            if calc.behavior_has_response():
+                # Behavior.response recalculates its baseline argument, so
+                # give it a private baseline that shares the records of self
+                base = Calculator(policy=self.__policy,
+                                  records=self.__records,
+                                  verbose=False, sync_years=False,
+                                  consumption=self.__consumption,
+                                  behavior=self.__behavior,
+                                  copy_on_write=True)
+                calc = Behavior.response(base, calc)
+                del base
+            else:
+                calc.calc_all()
+            dist = self._reform_distribution_table(calc, groupby,
+                                                   table_rows=table_rows)
+            diff = create_difference_table(base_diff_dataframe,
+                                           calc.dataframe(DIFF_VARIABLES),
+                                           groupby, tax_to_diff,
+                                           table_rows=table_rows)
+            del calc
+            return (dist, diff)
+
+        if n_jobs == 1:
+            return [score(params) for params in reform_params]
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            return list(pool.map(score, reform_params))
+
+    def parameter_sweep(self, param, values):
+        """
+        Return Pandas DataFrame containing, for each value of the specified
+        policy parameter in the values grid, the weighted totals of iitax,
+        payrolltax, and combined tax for the current_year when the
+        current-year value of param in the policy of self is replaced by
+        that value.  The policy and results of self are not changed.
+
+        All grid points are calculated by a single Calculator object that
+        shares the records of self until its calculations change them.
+        After a full calc_all call for the first grid point, only the
+        functions returned by Calculator.affected_steps([param]) are called
+        for each of the other grid points.
+
+        Parameters
+        ----------
+        param : string
+            name of policy parameter with leading underscore (for example,
+            '_SS_Earnings_c' or '_II_rt7')
+
+        values : list
+            each element is a current-year parameter value specified as in
+            a reform dictionary without the enclosing list (for example,
+            200000 for '_SS_Earnings_c' or [1600, 1300, 1300, 1600, 1600]
+            for '_STD_Aged')
+
+        Returns
+        -------
+        Pandas DataFrame with iitax, payrolltax, and combined columns and
+        with row i containing the totals for values[i]
+        """
+        if param not in Policy.default_data():
+            msg = 'param {} is not a policy parameter'
+            raise ValueError(msg.format(param))
+        year = self.current_year
+        calc = Calculator(policy=self.__policy, records=self.__records,
+                          verbose=False, sync_years=False,
+                          consumption=self.__consumption,
+                          behavior=self.__behavior,
+                          copy_on_write=True)
+        totals = {'iitax': list(), 'payrolltax': list(), 'combined': list()}
+        for idx, value in enumerate(values):
+            calc.__policy.implement_reform({year: {param: [value]}})
+            if idx == 0:
+                calc.calc_all()
+            else:
+                calc.calc_all(changed=[param])
+            for name in totals:
+                totals[name].append(calc.weighted_total(name))
+        del calc
+        return pd.DataFrame(totals,
+                            columns=['iitax', 'payrolltax', 'combined'])
+
+    @staticmethod
+    def streamed_tables(records_chunks, year, policy, reform_policy=None,
+                        consumption=None, groupby='standard_income_bins',
+                        tax_to_diff='combined',
+                        dump_filename=None, dump_varset=None):
+        """
+        Calculate tax liabilities for the specified year one chunk of
+        records at a time and return the distribution and difference
+        tables for all the records, which are the same as those returned
+        by the distribution_tables and difference_table methods of a
+        Calculator object containing all the records (except that the rows
+        of the reform distribution table are always defined using baseline
+        expanded_income).  Only the additive table-row sums are kept from
+        one chunk to the next, so the memory used does not depend on the
+        number of records.  The ALL row of each distribution table contains
+        the weighted aggregates.
+
+        Parameters
+        ----------
+        records_chunks : iterable of Records objects
+            for example, the generator returned by Records.read_chunks
+
+        year : integer
+            calendar year for which taxes are calculated
+
+        policy : Policy object
+            baseline policy
+
+        reform_policy : Policy object or None
+            reform policy; None implies only baseline tables are returned
+
+        consumption : Consumption object or None
+            used by the baseline and reform calculations
+
+        groupby : String object
+            options for input: 'standard_income_bins', 'soi_agi_bins'
+            (weighted_deciles cannot be computed one chunk at a time)
+
+        tax_to_diff : String object
+            options for input: 'iitax', 'payrolltax', 'combined'
+            specifies which tax to difference
+
+        dump_filename : string or None
+            name of CSV file to which the reform (or baseline when there
+            is no reform) values of the variables in dump_varset are
+            written one chunk at a time; None implies no dump file
+
+        dump_varset : set or None
+            variables in dump output; None implies all variables
+
+        Returns
+        -------
+        tuple of three Pandas DataFrame objects: baseline distribution
+        table, reform distribution table, and difference table, where the
+        last two are None when reform_policy is None
+        """
+        # pylint: disable=too-many-arguments,too-many-locals
+        if groupby not in ('standard_income_bins', 'soi_agi_bins'):
+            msg = 'groupby={} cannot be computed one chunk at a time'
+            raise ValueError(msg.format(groupby))
+        if dump_varset is None:
+            if Records.USABLE_READ_VARS is None:
+                Records.read_var_info()
+            dump_varset = Records.USABLE_READ_VARS | Records.CALCULATED_VARS
+        dump_columns = sorted(dump_varset)
+        sums = [None, None, None]
+        for chunk_num, recs in enumerate(records_chunks):
+            calc1 = Calculator(policy=policy, records=recs, verbose=False,
+                               consumption=consumption, copy_on_write=True)
+            calc1.advance_to_year(year)
+            calc1.calc_all()
+            chunk_sums = [
+                distribution_table_sums(
+                    calc1.distribution_table_dataframe(), groupby,
+                    'expanded_income'
+                ),
+                None,
+                None
+            ]
+            calc = calc1
+            calc2 = None
+            if reform_policy is not None:
+                calc2 = Calculator(policy=reform_policy, records=recs,
+                                   verbose=False, consumption=consumption,
+                                   copy_on_write=True)
+                calc2.advance_to_year(year)
+                calc2.calc_all()
+                dt2 = calc2.distribution_table_dataframe()
+                dt2['expanded_income_baseline'] = calc1.array(
+                    'expanded_income')
+                chunk_sums[1] = distribution_table_sums(
+                    dt2, groupby, 'expanded_income_baseline'
+                )
+                chunk_sums[2] = difference_table_sums(
+                    calc1.dataframe(DIFF_VARIABLES),
+                    calc2.dataframe(DIFF_VARIABLES),
+                    groupby, tax_to_diff
+                )
+                calc = calc2
+            for idx, csums in enumerate(chunk_sums):
+                if sums[idx] is None:
+                    sums[idx] = csums
+                elif csums is not None:
+                    sums[idx] = sums[idx] + csums
+            if dump_filename is not None:
+                dump = calc.dataframe(dump_columns)
+                dump.to_csv(dump_filename, columns=dump_columns,
+                            mode='w' if chunk_num == 0 else 'a',
+                            header=(chunk_num == 0),
+                            index=False, float_format='%.2f')
+                del dump
+            del calc, calc1, calc2
+        if sums[0] is None:
+            raise ValueError('records_chunks contains no Records objects')
+        dist1 = finish_distribution_table(sums[0], groupby)
+        if reform_policy is None:
+            return (dist1, None, None)
+        dist2 = finish_distribution_table(sums[1], groupby)
+        diff = finish_difference_table(sums[2], groupby)
+        return (dist1, dist2, diff)
+
     MTR_VALID_VARIABLES = ['e00200p', 'e00200s',
                            'e00900p', 'e00300',
                            'e00400', 'e00600',
@@ -568,6 +1283,11 @@ class Calculator(object):
                            'e19200', 'e26270',
                            'e19800', 'e20100']
 
+    # variables that include an MTR_VALID_VARIABLES variable in their sum
+    MTR_SUM_VARIABLES = {'e00200p': 'e00200', 'e00200s': 'e00200',
+                         'e00900p': 'e00900', 'e00650': 'e00600',
+                         'e26270': 'e02000'}
+
     def mtr(self, variable_str='e00200p',
             negative_finite_diff=False,
             zero_out_calculated_vars=False,
@@ -661,12 +1381,25 @@ class Calculator(object):
         if variable_str not in Calculator.MTR_VALID_VARIABLES:
             msg = 'mtr variable_str="{}" is not valid'
             raise ValueError(msg.format(variable_str))
+        # one-cent differences are lost in float32 rounding of large values
+        if self.__records.compact:
+            raise ValueError('mtr cannot be calculated with compact Records')
         # specify value for finite_diff parameter
         finite_diff = 0.01  # a one-cent difference
         if negative_finite_diff:
             finite_diff *= -1.0
-        # remember records object in order to restore it after mtr computations
-        self.store_records()
+        # remember records variables in order to restore them after mtr
+        # computations, and copy only those variables that are changed in
+        # place by calc_all or by a consumption response (all the other
+        # variables that are changed are replaced by new arrays)
+        stored_vars = {varname: getattr(self.__records, varname)
+                       for varname in (Records.USABLE_READ_VARS |
+                                       Records.CALCULATED_VARS)}
+        copied_vars = Records.CALCULATED_VARS
+        if self.__consumption.has_response():
+            copied_vars = copied_vars | Consumption.RESPONSE_VARS
+        for varname in copied_vars:
+            self.array(varname, self.array(varname).copy())
         # extract variable array(s) from embedded records object
         variable = self.array(variable_str)
         if variable_str == 'e00200p':
@@ -693,12 +1426,22 @@ class Calculator(object):
             self.array('e02000', schEincome_var + finite_diff)
         if self.__consumption.has_response():
             self.__consumption.response(self.__records, finite_diff)
-        self.calc_all(zero_out_calc_vars=zero_out_calculated_vars)
+        if calc_all_already_called and not zero_out_calculated_vars:
+            # recompute only the functions affected by the marginal increase
+            changed = [variable_str, Calculator.MTR_SUM_VARIABLES.get(
+                variable_str, variable_str)]
+            if self.__consumption.has_response():
+                changed.extend(Consumption.RESPONSE_VARS)
+            self.calc_all(changed=changed)
+        else:
+            self.calc_all(zero_out_calc_vars=zero_out_calculated_vars)
         payrolltax_chng = self.array('payrolltax')
         incometax_chng = self.array('iitax')
         combined_taxes_chng = incometax_chng + payrolltax_chng
-        # calculate base level of taxes after restoring records object
-        self.restore_records()
+        # calculate base level of taxes after restoring records variables
+        for varname, var in stored_vars.items():
+            setattr(self.__records, varname, var)
+        del stored_vars
         if not calc_all_already_called or zero_out_calculated_vars:
             self.calc_all(zero_out_calc_vars=zero_out_calculated_vars)
         payrolltax_base = self.array('payrolltax')
@@ -751,6 +1494,115 @@ class Calculator(object):
         # return the three marginal tax rate arrays
         return (mtr_payrolltax, mtr_incometax, mtr_combined)
 
+    def mtrs(self, variables,
+             negative_finite_diff=False,
+             zero_out_calculated_vars=False,
+             calc_all_already_called=False,
+             wrt_full_compensation=True):
+        """
+        Calculates the marginal payroll, individual income, and combined
+        tax rates for every tax filing unit with respect to each of the
+        specified variables, leaving the Calculator object in exactly the
+        same state as it would be in after a calc_all() call.
+
+        The results are the same as those from calling the mtr method once
+        for each variable, but the increased-income tax levels for all the
+        variables are calculated in a single calc_all() call on a stacked
+        copy of the records (in which each variable is increased in its
+        own part of the stacked records), and the base tax levels are
+        calculated just once for all the variables.
+
+        Parameters
+        ----------
+        variables: list of strings
+            each string is a valid variable_str value for the mtr method.
+
+        negative_finite_diff, zero_out_calculated_vars,
+        calc_all_already_called, wrt_full_compensation: boolean
+            see documentation of Calculator.mtr()
+
+        Returns
+        -------
+        A dictionary with the variables as keys and values that are the
+        tuples of three numpy arrays returned by the mtr method.
+        """
+        # pylint: disable=too-many-arguments,too-many-locals
+        assert not zero_out_calculated_vars or not calc_all_already_called
+        for variable_str in variables:
+            if variable_str not in Calculator.MTR_VALID_VARIABLES:
+                msg = 'mtrs variable_str="{}" is not valid'
+                raise ValueError(msg.format(variable_str))
+        # one-cent differences are lost in float32 rounding of large values
+        if self.__records.compact:
+            raise ValueError('mtrs cannot be calculated with compact Records')
+        if len(variables) == 1:
+            return {variables[0]: self.mtr(
+                variables[0],
+                negative_finite_diff=negative_finite_diff,
+                zero_out_calculated_vars=zero_out_calculated_vars,
+                calc_all_already_called=calc_all_already_called,
+                wrt_full_compensation=wrt_full_compensation)}
+        # specify value for finite_diff parameter
+        finite_diff = 0.01  # a one-cent difference
+        if negative_finite_diff:
+            finite_diff *= -1.0
+        # calculate level of taxes after a marginal increase in each variable
+        # using a Calculator object with stacked records
+        num = self.array_len
+        stacked = copy.copy(self)
+        stacked.__records = self.__records.stacked(len(variables))
+        for idx, variable_str in enumerate(variables):
+            block = slice(idx * num, (idx + 1) * num)
+            stacked.array(variable_str)[block] += finite_diff
+            if variable_str in Calculator.MTR_SUM_VARIABLES:
+                sum_str = Calculator.MTR_SUM_VARIABLES[variable_str]
+                stacked.array(sum_str)[block] += finite_diff
+        if self.__consumption.has_response():
+            self.__consumption.response(stacked.__records, finite_diff)
+        stacked.calc_all(zero_out_calc_vars=zero_out_calculated_vars)
+        payrolltax_chng = stacked.array('payrolltax')
+        incometax_chng = stacked.array('iitax')
+        del stacked
+        # calculate base level of taxes
+        if not calc_all_already_called or zero_out_calculated_vars:
+            self.calc_all(zero_out_calc_vars=zero_out_calculated_vars)
+        payrolltax_base = self.array('payrolltax')
+        incometax_base = self.array('iitax')
+        combined_taxes_base = incometax_base + payrolltax_base
+        # compute marginal tax rates for each variable
+        mtrs = dict()
+        for idx, variable_str in enumerate(variables):
+            block = slice(idx * num, (idx + 1) * num)
+            payrolltax_diff = payrolltax_chng[block] - payrolltax_base
+            incometax_diff = incometax_chng[block] - incometax_base
+            combined_diff = ((incometax_chng[block] + payrolltax_chng[block]) -
+                             combined_taxes_base)
+            # specify optional adjustment for employer OASDI+HI payroll taxes
+            mtr_on_earnings = (variable_str == 'e00200p' or
+                               variable_str == 'e00200s')
+            if wrt_full_compensation and mtr_on_earnings:
+                adj = np.where(self.array(variable_str) <
+                               self.policy_param('SS_Earnings_c'),
+                               0.5 * (self.policy_param('FICA_ss_trt') +
+                                      self.policy_param('FICA_mc_trt')),
+                               0.5 * self.policy_param('FICA_mc_trt'))
+            else:
+                adj = 0.0
+            mtr_payrolltax = payrolltax_diff / (finite_diff * (1.0 + adj))
+            mtr_incometax = incometax_diff / (finite_diff * (1.0 + adj))
+            mtr_combined = combined_diff / (finite_diff * (1.0 + adj))
+            # set e00200s MTR to NaN for units without a spouse
+            if variable_str == 'e00200s':
+                mars = self.array('MARS')
+                mtr_payrolltax = np.where(mars == 2, mtr_payrolltax, np.nan)
+                mtr_incometax = np.where(mars == 2, mtr_incometax, np.nan)
+                mtr_combined = np.where(mars == 2, mtr_combined, np.nan)
+            mtrs[variable_str] = (mtr_payrolltax, mtr_incometax, mtr_combined)
+        del payrolltax_chng
+        del incometax_chng
+        del combined_taxes_base
+        return mtrs
+
     def mtr_graph(self, calc,
                   mars='ALL',
                   mtr_measure='combined',
@@ -1056,7 +1908,8 @@ class Calculator(object):
 
     def decile_graph(self, calc,
                      include_zero_incomes=True,
-                     include_negative_incomes=True):
+                     include_negative_incomes=True,
+                     table_rows=None):
         """
         Create graph that shows percentage change in aftertax expanded
         income (from going from policy in self to policy in calc) for
@@ -1089,6 +1942,10 @@ class Calculator(object):
             if False, the bottom decile does not contain filing units with
             negative expanded_income.
 
+        table_rows : TableRows object or None
+            object returned by self.table_rows(), which is passed to the
+            distribution_tables method
+
         Returns
         -------
         graph that is a bokeh.plotting figure object
@@ -1097,7 +1954,8 @@ class Calculator(object):
         assert isinstance(calc, Calculator)
         assert calc.current_year == self.current_year
         assert calc.array_len == self.array_len
-        dt1, dt2 = self.distribution_tables(calc, 'weighted_deciles')
+        dt1, dt2 = self.distribution_tables(calc, 'weighted_deciles',
+                                            table_rows=table_rows)
         # construct data for graph
         data = dec_graph_data(
             dt1, dt2, year=self.current_year,
@@ -1415,32 +2273,133 @@ class Calculator(object):
         """
         Call TaxInc through AMT functions.
         """
-        TaxInc(self.__policy, self.__records)
-        SchXYZTax(self.__policy, self.__records)
-        GainsTax(self.__policy, self.__records)
-        AGIsurtax(self.__policy, self.__records)
-        NetInvIncTax(self.__policy, self.__records)
-        AMT(self.__policy, self.__records)
-
-    def _calc_one_year(self, zero_out_calc_vars=False):
+        for func in TAXINC_TO_AMT_STEPS:
+            self._stage(func)
+
+    def _stage(self, func, args=None, name=None):
+        """
+        Call func with the specified args tuple, which defaults to the
+        embedded Policy and Records objects.  When calc_all is profiling and no
+        other stage is active, record the wall time and bytes touched by
+        the call as a stage with the specified name, which defaults to the
+        name of func.
+        """
+        if args is None:
+            args = (self.__policy, self.__records)
+        profile = self.__profile
+        if profile is None:
+            func(*args)
+            return
+        if profile.touched is not None:
+            # nested stage is part of the active stage
+            profile.touch_args(func, args)
+            func(*args)
+            return
+        profile.touched = dict()
+        profile.touch_args(func, args)
+        start = time.perf_counter()
+        func(*args)
+        wall_time = time.perf_counter() - start
+        profile.record(name or func.__name__, wall_time)
+
+    def _reform_distribution_table(self, calc, groupby, table_rows=None):
+        """
+        Return distribution table for calc, which typically represents the
+        reform while self represents the baseline, with rows defined by
+        groupby using the self expanded_income unless calc has the same
+        expanded_income (where "same" means nobody's expanded_income
+        differs by more than one cent).  The optional table_rows, which
+        is returned by self.table_rows(), is used only when the rows are
+        defined by the self expanded_income.
+        """
+        assert calc.current_year == self.current_year
+        assert calc.array_len == self.array_len
+        assert np.allclose(self.consump_benval_params(),
+                           calc.consump_benval_params())
+        var_dataframe = calc.distribution_table_dataframe()
+        if np.allclose(self.array('expanded_income'),
+                       calc.array('expanded_income'), rtol=0.0, atol=0.01):
+            imeasure = 'expanded_income'
+            table_rows = None
+        else:
+            imeasure = 'expanded_income_baseline'
+            var_dataframe[imeasure] = self.array('expanded_income')
+        return create_distribution_table(var_dataframe, groupby, imeasure,
+                                         table_rows=table_rows)
+
+    def _calc_all_in_chunks(self, zero_out_calc_vars, fused, n_jobs):
+        """
+        Call calc_all method for each of n_jobs contiguous chunks of the
+        records using a pool of threads, and then put chunk results into
+        the embedded Records object.
+        """
+        num_chunks = min(n_jobs, self.array_len)
+        bounds = [(self.array_len * idx) // num_chunks
+                  for idx in range(num_chunks + 1)]
+        chunks = list()
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            chunk = copy.copy(self)
+            chunk.__records = self.__records.chunk(start, stop)
+            chunks.append(chunk)
+        with ThreadPoolExecutor(max_workers=num_chunks) as pool:
+            futures = [pool.submit(chunk.calc_all, zero_out_calc_vars, fused)
+                       for chunk in chunks]
+            for future in futures:
+                future.result()
+        # chunk variables replaced by new arrays are no longer views of the
+        # embedded Records variables, so their values must be copied back
+        for varname in Records.USABLE_READ_VARS | Records.CALCULATED_VARS:
+            var = self.array(varname)
+            chunk_vars = [chunk.array(varname) for chunk in chunks]
+            if not all(np.may_share_memory(cvar, var) for cvar in chunk_vars):
+                self.array(varname, np.concatenate(chunk_vars))
+        del chunks
+
+    def _calc_one_year(self, zero_out_calc_vars=False, fused=False):
         """
         Call all the functions except those in the calc_all() method.
+        If fused is True, do all the work in one loop over the records.
         """
         if zero_out_calc_vars:
             self.__records.zero_out_changing_calculated_vars()
+        if fused:
+            for idx, fused_func in enumerate(FUSED_CALC_ONE_YEAR_PARTS):
+                self._stage(fused_func,
+                            name='FUSED_CALC_ONE_YEAR_PARTS[{}]'.format(idx))
+            return
         # pdb.set_trace()
-        EI_PayrollTax(self.__policy, self.__records)
-        DependentCare(self.__policy, self.__records)
-        Adj(self.__policy, self.__records)
-        ALD_InvInc_ec_base(self.__policy, self.__records)
-        CapGains(self.__policy, self.__records)
-        SSBenefits(self.__policy, self.__records)
-        UBI(self.__policy, self.__records)
-        AGI(self.__policy, self.__records)
-        ItemDedCap(self.__policy, self.__records)
-        ItemDed(self.__policy, self.__records)
-        AdditionalMedicareTax(self.__policy, self.__records)
-        StdDed(self.__policy, self.__records)
+        self._stage(EI_PayrollTax)
+        self._stage(DependentCare)
+        self._stage(Adj)
+        self._stage(ALD_InvInc_ec_base)
+        self._stage(CapGains)
+        self._stage(SSBenefits)
+        self._stage(UBI)
+        self._stage(AGI)
+        self._stage(ItemDedCap)
+        # AdditionalMedicareTax does not depend on itemized deductions, so
+        # it is called before the functions that do depend on them
+        self._stage(AdditionalMedicareTax)
+        self._calc_itemded_to_iitax()
+
+    def _calc_itemded_to_iitax(self):
+        """
+        Call the _calc_one_year functions from ItemDed through IITAX,
+        which are the only functions whose results depend on the itemized
+        deduction haircut policy parameters.
+        """
+        self._stage(ItemDed)
+        self._stage(StdDed)
+        self._taxes_with_optimal_deduction()
+        for func in CREDITS_TO_IITAX_STEPS:
+            self._stage(func)
+
+    def _taxes_with_optimal_deduction(self):
+        """
+        Call the _taxinc_to_amt method with the standard deduction, with
+        itemized deductions, and with the deduction that results in lower
+        taxes for each filing unit.
+        """
         # Store calculated standard deduction, calculate
         # taxes with standard deduction, store AMT + Regular Tax
         std = self.array('standard').copy()
@@ -1450,7 +2409,8 @@ class Calculator(object):
         self.zeroarray('c04470')
         self.zeroarray('c21060')
         self.zeroarray('c21040')
-        self._taxinc_to_amt()
+        self._stage(self._taxinc_to_amt, (),
+                    name='_taxinc_to_amt:standard')
         std_taxes = self.array('c05800').copy()
         # Set standard deduction to zero, calculate taxes w/o
         # standard deduction, and store AMT + Regular Tax
@@ -1458,7 +2418,8 @@ class Calculator(object):
         self.array('c21060', item_no_limit)
         self.array('c21040', item_phaseout)
         self.array('c04470', item)
-        self._taxinc_to_amt()
+        self._stage(self._taxinc_to_amt, (),
+                    name='_taxinc_to_amt:itemized')
         item_taxes = self.array('c05800').copy()
         # Replace standard deduction with zero where the taxpayer
         # would be better off itemizing
@@ -1471,20 +2432,38 @@ class Calculator(object):
         self.array('c21040', np.where(item_taxes < std_taxes,
                                       item_phaseout, 0.))
         # Calculate taxes with optimal itemized deduction
-        self._taxinc_to_amt()
-        F2441(self.__policy, self.__records)
-        EITC(self.__policy, self.__records)
-        ChildDepTaxCredit(self.__policy, self.__records)
-        PersonalTaxCredit(self.__policy, self.__records)
-        AmOppCreditParts(self.__policy, self.__records)
-        SchR(self.__policy, self.__records)
-        EducationTaxCredit(self.__policy, self.__records)
-        CharityCredit(self.__policy, self.__records)
-        NonrefundableCredits(self.__policy, self.__records)
-        AdditionalCTC(self.__policy, self.__records)
-        C1040(self.__policy, self.__records)
-        CTC_new(self.__policy, self.__records)
-        IITAX(self.__policy, self.__records)
+        self._stage(self._taxinc_to_amt, (),
+                    name='_taxinc_to_amt:optimal')
+
+    def _calc_steps(self, names):
+        """
+        Call in order the CALC_ALL_STEPS functions with the specified names.
+        """
+        for step, (name, _, _) in zip(CALC_ALL_STEPS, CALC_ALL_DEPENDENCIES):
+            if name not in names:
+                continue
+            if isinstance(step, str):
+                getattr(self, step)()
+            elif step in CALC_ALL_CALCULATOR_STEPS:
+                self._stage(step, (self,))
+            else:
+                self._stage(step)
+
+    def _itemded_scratch_copy(self):
+        """
+        Return a shallow copy of this Calculator object that has its own
+        shallow copies of the embedded Policy and Records objects, in which
+        only the ITEMDED_TO_IITAX_VARS variables are copied, so that the
+        _calc_itemded_to_iitax method can be called on the returned object
+        after changing its policy parameters without changing this object.
+        """
+        scratch = copy.copy(self)
+        scratch.__policy = copy.copy(self.__policy)
+        scratch.__records = copy.copy(self.__records)
+        for varname in ITEMDED_TO_IITAX_VARS:
+            setattr(scratch.__records, varname,
+                    getattr(self.__records, varname).copy())
+        return scratch
 
     @staticmethod
     def _read_json_policy_reform_text(text_string,
@@ -7,6 +7,7 @@ the functions.py module.
 # pylint --disable=locally-disabled decorators.py
 
 import io
+import re
 import ast
 import inspect
 import toolz
@@ -190,8 +191,12 @@ def make_apply_function(func, out_args, in_args, parameters,
     eval(func_code,  # pylint: disable=eval-used
          {"jitted_f": jitted_f}, fakeglobals)
     if do_jit:
-        return jit(**kwargs)(fakeglobals['ap_func'])
-    return fakeglobals['ap_func']
+        ap_func = jit(**kwargs)(fakeglobals['ap_func'])
+    else:
+        ap_func = fakeglobals['ap_func']
+    # keep the record-at-a-time function so that it can be fused with others
+    ap_func.jitted_f = jitted_f
+    return ap_func
 
 
 def apply_jit(dtype_sig_out, dtype_sig_in, parameters=None, **kwargs):
@@ -252,6 +257,8 @@ def iterate_jit(parameters=None, **kwargs):
         # Get the numba.jit arguments
         jit_args = inspect.getfullargspec(jit).args + ['nopython']
         kwargs_for_jit = toolz.keyfilter(jit_args.__contains__, kwargs)
+        # release the GIL so that records can be processed in parallel threads
+        kwargs_for_jit['nogil'] = True
 
         # Any name that is a parameter
         # Boolean flag is given special treatment.
@@ -291,27 +298,181 @@ def iterate_jit(parameters=None, **kwargs):
             wrapper function nested in make_wrapper function nested
             in iterate_jit decorator.
             """
-            in_arrays = []
             pm_or_pf = []
+            layout = []
             for farg in all_out_args + in_args:
-                if hasattr(args[0], farg):
-                    in_arrays.append(getattr(args[0], farg))
+                # look for parameters in pm first and for variables in pf
+                # first, which avoids failed (and slow) parameter lookups
+                if farg in all_parameters:
+                    in_pm = hasattr(args[0], farg)
+                    in_pf = not in_pm and hasattr(args[1], farg)
+                else:
+                    in_pf = hasattr(args[1], farg)
+                    in_pm = not in_pf and hasattr(args[0], farg)
+                if in_pm:
                     pm_or_pf.append("pm")
-                elif hasattr(args[1], farg):
-                    in_arrays.append(getattr(args[1], farg))
+                    layout.append((farg, "pm"))
+                elif in_pf:
                     pm_or_pf.append("pf")
-            # Create the high level function
-            high_level_func = create_toplevel_function_string(all_out_args,
-                                                              list(in_args),
-                                                              pm_or_pf)
-            func_code = compile(high_level_func, "<string>", "exec")
-            fakeglobals = {}
-            eval(func_code,  # pylint: disable=eval-used
-                 {"applied_f": applied_jitted_f}, fakeglobals)
-            high_level_fn = fakeglobals['hl_func']
+                    layout.append((farg, "pf"))
+            # Get the high level function for this layout of the arguments
+            # across the pm and pf objects, creating it only the first time
+            # the layout is seen
+            layout = tuple(layout)
+            high_level_fn = wrapper.hl_func_cache.get(layout)
+            if high_level_fn is None:
+                high_level_func = create_toplevel_function_string(
+                    all_out_args, list(in_args), pm_or_pf
+                )
+                func_code = compile(high_level_func, "<string>", "exec")
+                fakeglobals = {}
+                eval(func_code,  # pylint: disable=eval-used
+                     {"applied_f": applied_jitted_f}, fakeglobals)
+                high_level_fn = fakeglobals['hl_func']
+                wrapper.hl_func_cache[layout] = high_level_fn
+            else:
+                wrapper.saved_compiles += 1
             ans = high_level_fn(*args, **kwargs)
             return ans
 
+        # cache of compiled high level functions keyed by argument layout
+        # and count of the compiles avoided by using that cache
+        wrapper.hl_func_cache = dict()
+        wrapper.saved_compiles = 0
+        # name of the calc-style function (used in calc_all profile tables)
+        wrapper.__name__ = func.__name__
+        # information used by fuse_iterate_jit to compose calc-style functions
+        wrapper.jitted_f = applied_jitted_f.jitted_f
+        wrapper.out_args = list(all_out_args)
+        wrapper.in_args = list(in_args)
+        wrapper.parameters = list(all_parameters)
         return wrapper
 
     return make_wrapper
+
+
+def create_fused_function_string(steps, rec_args, par_args):
+    """
+    Create a string for a function of the form::
+
+        def fused_func(x_0, x_1, ..., p_0, ...):
+            for i in range(len(x_0)):
+                x_1[i], ... = f_0(x_0[i], p_0, ...)
+                <code line>
+                x_2[i], ... = f_1(x_1[i], ...)
+                ...
+            return 0
+
+    where each record is processed by all the steps before moving on
+    to the next record.
+
+    Parameters
+    ----------
+    steps: list whose items are either iterate_jit-decorated functions or
+           strings containing lines of code that are put into the loop body
+           unchanged (these lines can use the record arrays by name indexed
+           by i, and can create their own local variables)
+
+    rec_args: list of names of record arrays, which are indexed by i
+
+    par_args: list of names of parameters, which are not indexed
+
+    Returns
+    -------
+    a String representing the function
+    """
+    fstr = io.StringIO()
+    fstr.write("def fused_func({}):\n".format(",".join(rec_args + par_args)))
+    fstr.write("    for i in range(len({})):\n".format(rec_args[0]))
+    for idx, step in enumerate(steps):
+        if isinstance(step, str):
+            for line in step.splitlines():
+                fstr.write("        " + line + "\n")
+            continue
+        out_index = [arg + "[i]" for arg in step.out_args]
+        in_index = [arg if arg in par_args else arg + "[i]"
+                    for arg in step.in_args]
+        fstr.write("        " + ",".join(out_index) + " = ")
+        fstr.write("f_{}(".format(idx) + ",".join(in_index) + ")\n")
+    fstr.write("    return 0\n")
+    return fstr.getvalue()
+
+
+def fuse_iterate_jit(steps, **kwargs):
+    """
+    Public function that composes a sequence of iterate_jit-decorated
+    functions into a single function that does all of their work in
+    one loop over the records, so that the values for each record are
+    read from memory just once rather than once by each function.
+
+    Parameters
+    ----------
+    steps: list whose items are either iterate_jit-decorated functions or
+           strings containing lines of code (see create_fused_function_string)
+
+    kwargs: numba.jit arguments used when jitting the fused function
+
+    Returns
+    -------
+    function with (pm, pf) arguments, like an iterate_jit-decorated function,
+    that changes pf arrays in place and returns nothing
+
+    Notes
+    -----
+    Each record array and parameter used by the steps is an argument of
+    the fused function, so the steps can use no more than 255 different
+    names (the Python 3.6 limit on the number of function arguments).
+    """
+    rec_args = []
+    par_args = []
+    for step in steps:
+        if isinstance(step, str):
+            # record arrays used in a line of code are indexed by i
+            for arg in re.findall(r"(\w+)\[i\]", step):
+                if arg not in rec_args:
+                    rec_args.append(arg)
+            continue
+        for arg in step.out_args + step.in_args:
+            if arg in rec_args or arg in par_args:
+                continue
+            if arg in step.parameters:
+                par_args.append(arg)
+            else:
+                rec_args.append(arg)
+    if len(rec_args) + len(par_args) > 255:
+        msg = 'fused function has {} arguments, which is more than 255'
+        raise ValueError(msg.format(len(rec_args) + len(par_args)))
+    if 'i' in rec_args or 'i' in par_args:
+        raise ValueError('fused function argument name "i" is reserved')
+    fused_func = create_fused_function_string(steps, rec_args, par_args)
+    func_code = compile(fused_func, "<string>", "exec")
+    fakeglobals = {}
+    eval(func_code,  # pylint: disable=eval-used
+         {"f_{}".format(idx): step.jitted_f
+          for idx, step in enumerate(steps) if not isinstance(step, str)},
+         fakeglobals)
+    if DO_JIT:
+        jitted_fused_f = jit(**kwargs)(fakeglobals['fused_func'])
+    else:
+        jitted_fused_f = fakeglobals['fused_func']
+
+    def wrapper(pm, pf):
+        """
+        wrapper function nested in fuse_iterate_jit function.
+        """
+        values = []
+        for farg in rec_args:
+            if hasattr(pf, farg):
+                values.append(getattr(pf, farg))
+            else:
+                values.append(getattr(pm, farg))
+        for farg in par_args:
+            if hasattr(pm, farg):
+                values.append(getattr(pm, farg))
+            else:
+                values.append(getattr(pf, farg))
+        jitted_fused_f(*values)
+
+    wrapper.rec_args = rec_args
+    wrapper.par_args = par_args
+    return wrapper
@@ -17,7 +17,6 @@ indexing).
 # pylint: disable=too-many-locals
 
 import math
-import copy
 import numpy as np
 from taxcalc.decorators import iterate_jit, jit
 
@@ -1699,8 +1698,10 @@ def ComputeBenefit(calc, ID_switch):
     Calculates the value of the benefits accrued from itemizing.
     """
     # compute income tax liability with no itemized deductions allowed for
-    # the types of itemized deductions covered under the BenefitSurtax
-    no_ID_calc = copy.deepcopy(calc)
+    # the types of itemized deductions covered under the BenefitSurtax,
+    # recomputing only the results that depend on itemized deductions
+    # pylint: disable=protected-access
+    no_ID_calc = calc._itemded_scratch_copy()
     if ID_switch[0]:
         no_ID_calc.policy_param('ID_Medical_hc', 1.)
     if ID_switch[1]:
@@ -1715,7 +1716,7 @@ def ComputeBenefit(calc, ID_switch):
         no_ID_calc.policy_param('ID_InterestPaid_hc', 1.)
     if ID_switch[6]:
         no_ID_calc.policy_param('ID_Charity_hc', 1.)
-    no_ID_calc._calc_one_year()  # pylint: disable=protected-access
+    no_ID_calc._calc_itemded_to_iitax()
     diff_iitax = no_ID_calc.array('iitax') - calc.array('iitax')
     benefit = np.where(diff_iitax > 0., diff_iitax, 0.)
     return benefit
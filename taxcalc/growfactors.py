@@ -49,17 +49,14 @@ class GrowFactors(object):
                        'ABENSSI', 'ABENSNAP', 'ABENWIC',
                        'ABENHOUSING', 'ABENTANF', 'ABENVET'])
 
+    # grow factors read from each file indexed by (path, mtime, size) key
+    _CSV_FILE_CACHE = dict()
+
     def __init__(self, growfactors_filename=FILE_PATH):
         # read grow factors from specified growfactors_filename
         gfdf = pd.DataFrame()
         if isinstance(growfactors_filename, str):
-            if os.path.isfile(growfactors_filename):
-                gfdf = pd.read_csv(growfactors_filename,
-                                   index_col='YEAR')
-            else:
-                # cannot call read_egg_ function in unit tests
-                gfdf = read_egg_csv(GrowFactors.FILENAME,
-                                    index_col='YEAR')  # pragma: no cover
+            gfdf = GrowFactors._read_csv_file(growfactors_filename)
         else:
             raise ValueError('growfactors_filename is not a string')
         assert isinstance(gfdf, pd.DataFrame)
@@ -81,6 +78,31 @@ class GrowFactors(object):
         # specify factors as being unused (that is, not yet accessed)
         self.used = False
 
+    @staticmethod
+    def _read_csv_file(growfactors_filename):
+        """
+        Return DataFrame containing the grow factors in the specified file,
+        which is read only once per process unless the file changes.
+        """
+        if os.path.isfile(growfactors_filename):
+            fstat = os.stat(growfactors_filename)
+            key = (os.path.abspath(growfactors_filename),
+                   fstat.st_mtime, fstat.st_size)
+        else:
+            key = GrowFactors.FILENAME
+        gfdf = GrowFactors._CSV_FILE_CACHE.get(key)
+        if gfdf is None:
+            if os.path.isfile(growfactors_filename):
+                gfdf = pd.read_csv(growfactors_filename,
+                                   index_col='YEAR')
+            else:
+                # cannot call read_egg_ function in unit tests
+                gfdf = read_egg_csv(GrowFactors.FILENAME,
+                                    index_col='YEAR')  # pragma: no cover
+            GrowFactors._CSV_FILE_CACHE[key] = gfdf
+        # return a copy because the update method changes gfdf in place
+        return gfdf.copy()
+
     @property
     def first_year(self):
         """
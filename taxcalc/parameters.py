@@ -22,6 +22,9 @@ class ParametersBase(object):
 
     DEFAULTS_FILENAME = None
 
+    # JSON text of each DEFAULTS_FILENAME file indexed by file path
+    _JSON_FILE_CACHE = dict()
+
     @classmethod
     def default_data(cls, metadata=False, start_year=None):
         """
@@ -92,6 +95,8 @@ class ParametersBase(object):
         Called by initialize method and from some subclass methods.
         """
         if hasattr(self, '_vals'):
+            names = list()
+            specs = list()
             for name, data in self._vals.items():
                 intg_val = data.get('integer_value')
                 bool_val = data.get('boolean_value')
@@ -104,11 +109,12 @@ class ParametersBase(object):
                             values = values[:known_years]
                     else:
                         index_rates = None
-                    setattr(self, name,
-                            self._expand_array(values, intg_val, bool_val,
-                                               inflate=cpi_inflated,
-                                               inflation_rates=index_rates,
-                                               num_years=self._num_years))
+                    names.append(name)
+                    specs.append((values, intg_val, bool_val,
+                                  cpi_inflated, index_rates))
+            arrays = self._expand_arrays(specs, self._num_years)
+            for name, arr in zip(names, arrays):
+                setattr(self, name, arr)
         self.set_year(self._start_year)
 
     @property
@@ -164,17 +170,42 @@ class ParametersBase(object):
             behavior.set_year(behavior.current_year + 1)
 
         where, in this example, behavior is a Behavior object.
+
+        The parameter values for the current year are not copied by this
+        method; instead each one is looked up in its parameter array when
+        it is first used (see the __getattr__ method), so changing the year
+        takes time proportional to the number of parameters used in the
+        previous year rather than to the number of parameters.  This method
+        discards those looked-up values along with any current-year values
+        set directly (for example, by the Calculator.policy_param method).
         """
         if year < self.start_year or year > self.end_year:
             msg = 'year {} passed to set_year() must be in [{},{}] range.'
             raise ValueError(msg.format(year, self.start_year, self.end_year))
         self._current_year = year
-        year_zero_indexed = year - self._start_year
         if hasattr(self, '_vals'):
-            for name in self._vals:
-                if isinstance(name, str):
-                    arr = getattr(self, name)
-                    setattr(self, name[1:], arr[year_zero_indexed])
+            names = self.__dict__.get('_current_year_names')
+            if names is None:
+                names = frozenset(name[1:] for name in self._vals)
+                self._current_year_names = names
+            for name in names.intersection(self.__dict__):
+                delattr(self, name)
+
+    def __getattr__(self, name):
+        """
+        Return current-year value of the named parameter, which is the
+        current-year row of the parameter array whose name is the
+        specified name with a leading underscore.  Called only when the
+        named attribute is not found in the usual places, so the value is
+        remembered as an attribute until the next set_year call.
+        """
+        pdict = self.__dict__
+        if name in pdict.get('_current_year_names', ()):
+            year_zero_indexed = pdict['_current_year'] - pdict['_start_year']
+            value = pdict['_' + name][year_zero_indexed]
+            pdict[name] = value
+            return value
+        raise AttributeError(name)
 
     # ----- begin private methods of ParametersBase class -----
 
@@ -327,21 +358,30 @@ class ParametersBase(object):
         -------
         params: dictionary
             containing complete contents of DEFAULTS_FILENAME file.
+
+        Notes
+        -----
+        The file is read only once per process and its text is cached.
+        Each call parses the cached text, so the returned dictionary shares
+        no objects with the dictionaries returned by other calls and can be
+        changed in any way.
         """
         if cls.DEFAULTS_FILENAME is None:
             msg = 'DEFAULTS_FILENAME must be overridden by inheriting class'
             raise NotImplementedError(msg)
         path = os.path.join(os.path.abspath(os.path.dirname(__file__)),
                             cls.DEFAULTS_FILENAME)
-        if os.path.exists(path):
-            with open(path) as pfile:
-                params_dict = json.load(pfile,
-                                        object_pairs_hook=collect.OrderedDict)
-        else:
-            # cannot call read_egg_ function in unit tests
-            params_dict = read_egg_json(
-                cls.DEFAULTS_FILENAME)  # pragma: no cover
-        return params_dict
+        json_text = ParametersBase._JSON_FILE_CACHE.get(path)
+        if json_text is None:
+            if os.path.exists(path):
+                with open(path) as pfile:
+                    json_text = pfile.read()
+            else:
+                # cannot call read_egg_ function in unit tests
+                json_text = json.dumps(read_egg_json(
+                    cls.DEFAULTS_FILENAME))  # pragma: no cover
+            ParametersBase._JSON_FILE_CACHE[path] = json_text
+        return json.loads(json_text, object_pairs_hook=collect.OrderedDict)
 
     def _update(self, year_mods):
         """
@@ -436,10 +476,24 @@ class ParametersBase(object):
             msg = 'mods in year_mods is not a dictionary'
             raise ValueError(msg)
         # implement reform provisions included in the single YEAR:MODS pair
+        self._update_values(year, year_mods[year])
+        # implement updated parameters for year
+        self.set_year(year)
+
+    def _update_values(self, year, mods):
+        """
+        Private method that changes the parameter arrays as specified in the
+        MODS dictionary for the specified YEAR without checking the year_mods
+        structure and without calling set_year, which allows the years of a
+        multi-year reform to be implemented with a single set_year call.
+        See the _update method for the MODS dictionary structure.
+        """
         num_years_to_expand = (self.start_year + self.num_years) - year
-        all_names = set(year_mods[year].keys())  # no duplicate keys in a dict
+        all_names = set(mods.keys())  # no duplicate keys in a dict
         used_names = set()  # set of used parameter names in MODS dict
-        for name, values in year_mods[year].items():
+        updated = list()  # list of parameter arrays to be updated
+        specs = list()  # list of _expand_arrays specifications
+        for name, values in mods.items():
             # determine indexing status of parameter with name for year
             if name.endswith('_cpi'):
                 continue  # handle elsewhere in this method
@@ -447,29 +501,25 @@ class ParametersBase(object):
             intg_val = self._vals[name].get('integer_value')
             bool_val = self._vals[name].get('boolean_value')
             name_plus_cpi = name + '_cpi'
-            if name_plus_cpi in year_mods[year].keys():
+            if name_plus_cpi in mods:
                 used_names.add(name_plus_cpi)
-                indexed = year_mods[year].get(name_plus_cpi)
+                indexed = mods.get(name_plus_cpi)
                 self._vals[name]['cpi_inflated'] = indexed  # remember status
             else:
                 indexed = vals_indexed
             # set post-reform values of parameter with name
             used_names.add(name)
-            cval = getattr(self, name, None)
             index_rates = self._indexing_rates_for_update(name, year,
                                                           num_years_to_expand)
-            nval = self._expand_array(values, intg_val, bool_val,
-                                      inflate=indexed,
-                                      inflation_rates=index_rates,
-                                      num_years=num_years_to_expand)
-            cval[(year - self.start_year):] = nval
+            updated.append(getattr(self, name, None))
+            specs.append((values, intg_val, bool_val, indexed, index_rates))
         # handle unused parameter names, all of which end in _cpi, but some
         # parameter names ending in _cpi were handled above
         unused_names = all_names - used_names
         for name in unused_names:
             used_names.add(name)
             pname = name[:-4]  # root parameter name
-            pindexed = year_mods[year][name]
+            pindexed = mods[name]
             self._vals[pname]['cpi_inflated'] = pindexed  # remember status
             cval = getattr(self, pname, None)
             pvalues = [cval[year - self.start_year]]
@@ -477,15 +527,14 @@ class ParametersBase(object):
                                                           num_years_to_expand)
             intg_val = self._vals[pname].get('integer_value')
             bool_val = self._vals[pname].get('boolean_value')
-            nval = self._expand_array(pvalues, intg_val, bool_val,
-                                      inflate=pindexed,
-                                      inflation_rates=index_rates,
-                                      num_years=num_years_to_expand)
-            cval[(year - self.start_year):] = nval
+            updated.append(cval)
+            specs.append((pvalues, intg_val, bool_val, pindexed, index_rates))
         # confirm that all names have been used
         assert len(used_names) == len(all_names)
-        # implement updated parameters for year
-        self.set_year(year)
+        # expand all the post-reform values together
+        nvals = self._expand_arrays(specs, num_years_to_expand)
+        for cval, nval in zip(updated, nvals):
+            cval[(year - self.start_year):] = nval
 
     @staticmethod
     def _expand_array(x, x_int, x_bool, inflate, inflation_rates, num_years):
@@ -556,16 +605,11 @@ class ParametersBase(object):
             ans = np.zeros(num_years, dtype=x.dtype)
             ans[:len(x)] = x
             if inflate:
-                extra = []
-                cur = x[-1]
-                for i in range(0, num_years - len(x)):
-                    cur *= (1. + inflation_rates[i + len(x) - 1])
-                    cur = round(cur, 2) if cur < 9e99 else 9e99
-                    extra.append(cur)
+                rates = inflation_rates[(len(x) - 1):(num_years - 1)]
+                rows = ParametersBase._inflated_rows(x[-1:], rates)
+                ans[len(x):] = rows[:, 0]
             else:
-                extra = [float(x[-1]) for i in
-                         range(1, num_years - len(x) + 1)]
-            ans[len(x):] = extra
+                ans[len(x):] = x[-1]
             return ans
 
     @staticmethod
@@ -584,17 +628,69 @@ class ParametersBase(object):
         else:
             ans = np.zeros((num_years, x.shape[1]), dtype=x.dtype)
             ans[:len(x), :] = x
-            for i in range(x.shape[0], ans.shape[0]):
-                for j in range(ans.shape[1]):
-                    if inflate:
-                        cur = (ans[i - 1, j] *
-                               (1. + inflation_rates[i - 1]))
-                        cur = round(cur, 2) if cur < 9e99 else 9e99
-                        ans[i, j] = cur
-                    else:
-                        ans[i, j] = ans[i - 1, j]
+            if inflate:
+                rates = inflation_rates[(len(x) - 1):(num_years - 1)]
+                ans[len(x):, :] = ParametersBase._inflated_rows(x[-1], rates)
+            else:
+                ans[len(x):, :] = x[-1]
             return ans
 
+    @staticmethod
+    def _inflated_rows(last, inflation_rates):
+        """
+        Private method called only within this abstract base class.
+        Return 2D array containing one row for each of the inflation_rates,
+        where each row is the previous row (or the 1D last array for the
+        first row) inflated by the rate and rounded to the nearest cent
+        (or capped at 9e99).  The rows are computed one after the other
+        because each row is rounded before it is inflated again, but all
+        the values in a row are computed at once.
+        """
+        rows = np.zeros((len(inflation_rates), len(last)))
+        cur = np.array(last, dtype=np.float64)
+        for idx, rate in enumerate(inflation_rates):
+            cur *= (1. + rate)
+            cur = np.where(cur < 9e99, np.round(cur, 2), 9e99)
+            rows[idx] = cur
+        return rows
+
+    @staticmethod
+    def _expand_arrays(specs, num_years):
+        """
+        Private method called only within this abstract base class.
+        Return list of expanded numpy arrays, one for each of the specs,
+        where each spec is a (x, x_int, x_bool, inflate, inflation_rates)
+        tuple of _expand_array arguments.  Equivalent to calling
+        _expand_array for each spec, but the last given values of all the
+        arrays that are inflated from the same year using the same
+        inflation_rates are inflated together by one _inflated_rows call.
+        """
+        arrays = list()
+        groups = dict()
+        for x, x_int, x_bool, inflate, inflation_rates in specs:
+            arr = ParametersBase._expand_array(x, x_int, x_bool,
+                                               inflate=False,
+                                               inflation_rates=None,
+                                               num_years=num_years)
+            num_given = len(x)
+            if inflate and num_given < num_years:
+                key = (num_given, tuple(inflation_rates))
+                groups.setdefault(key, list()).append(len(arrays))
+            arrays.append(arr)
+        for (num_given, rates), indexes in groups.items():
+            last = np.concatenate([np.ravel(arrays[idx][num_given - 1])
+                                   for idx in indexes])
+            rows = ParametersBase._inflated_rows(
+                last, rates[(num_given - 1):(num_years - 1)]
+            )
+            col = 0
+            for idx in indexes:
+                extra = arrays[idx][num_given:]
+                ncols = extra[:1].size
+                extra[...] = rows[:, col:(col + ncols)].reshape(extra.shape)
+                col += ncols
+        return arrays
+
     def _indexing_rates_for_update(self, param_name,
                                    calyear, num_years_to_expand):
         """
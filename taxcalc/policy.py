@@ -5,6 +5,7 @@ Tax-Calculator federal tax policy Policy class.
 # pycodestyle policy.py
 # pylint --disable=locally-disabled policy.py
 
+import collections as collect
 import numpy as np
 from taxcalc.parameters import ParametersBase
 from taxcalc.growfactors import GrowFactors
@@ -48,6 +49,12 @@ class Policy(ParametersBase):
     LAST_BUDGET_YEAR = 2027  # increases by one every calendar year
     DEFAULT_NUM_YEARS = LAST_BUDGET_YEAR - JSON_START_YEAR + 1
 
+    # read-only copies of the expanded current-law parameter arrays for each
+    # combination of DEFAULTS_FILENAME, years and indexing rates (which are
+    # all that the arrays depend on), in least-recently-used order
+    _CLP_ARRAYS_CACHE = collect.OrderedDict()
+    CLP_ARRAYS_CACHE_SIZE = 8
+
     def __init__(self,
                  gfactors=None,
                  start_year=JSON_START_YEAR,
@@ -81,6 +88,40 @@ class Policy(ParametersBase):
         self.parameter_errors = ''
         self._ignore_errors = False
 
+    def initialize(self, start_year, num_years):
+        """
+        Called from Policy constructor.
+        Copy the cached current-law parameter arrays for the years and the
+        indexing rates of this Policy object when they are available, and
+        otherwise, expand the arrays and cache copies of them.  Copying the
+        small cached arrays is much faster than expanding them, and each
+        Policy object needs its own arrays because reforms change them in
+        place.
+        """
+        key = (self.DEFAULTS_FILENAME, start_year, num_years,
+               tuple(self._inflation_rates), tuple(self._wage_growth_rates))
+        arrays = Policy._CLP_ARRAYS_CACHE.get(key)
+        if arrays is None:
+            super(Policy, self).initialize(start_year, num_years)
+            arrays = dict()
+            for name in self._vals:
+                arr = getattr(self, name, None)
+                if isinstance(arr, np.ndarray):
+                    arrays[name] = arr.copy()
+                    arrays[name].flags.writeable = False
+            Policy._CLP_ARRAYS_CACHE[key] = arrays
+            if len(Policy._CLP_ARRAYS_CACHE) > Policy.CLP_ARRAYS_CACHE_SIZE:
+                Policy._CLP_ARRAYS_CACHE.popitem(last=False)
+        else:
+            Policy._CLP_ARRAYS_CACHE.move_to_end(key)
+            self._current_year = start_year
+            self._start_year = start_year
+            self._num_years = num_years
+            self._end_year = start_year + num_years - 1
+            for name, arr in arrays.items():
+                setattr(self, name, arr.copy())
+            self.set_year(start_year)
+
     def inflation_rates(self):
         """
         Returns list of price inflation rates starting with JSON_START_YEAR.
@@ -208,13 +249,12 @@ class Policy(ParametersBase):
         if Policy._cpi_offset_in_reform(reform):
             known_years = self._apply_reform_cpi_offset(reform)
             self.set_default_vals(known_years=known_years)
-        # implement the reform year by year
+        # implement the reform year by year, setting current-year values once
         precall_current_year = self.current_year
         reform_parameters = set()
         for year in reform_years:
-            self.set_year(year)
             reform_parameters.update(reform[year].keys())
-            self._update({year: reform[year]})
+            self._update_values(year, reform[year])
         self.set_year(precall_current_year)
         # validate reform parameter values
         self._validate_parameter_values(reform_parameters)
@@ -386,15 +426,13 @@ class Policy(ParametersBase):
         (first cpi_offset year - start year + 1).
         """
         # extrapolate cpi_offset reform
-        self.set_year(self.start_year)
         first_cpi_offset_year = 0
         for year in sorted(reform.keys()):
-            self.set_year(year)
             if '_cpi_offset' in reform[year]:
                 if first_cpi_offset_year == 0:
                     first_cpi_offset_year = year
                 oreform = {'_cpi_offset': reform[year]['_cpi_offset']}
-                self._update({year: oreform})
+                self._update_values(year, oreform)
         self.set_year(self.start_year)
         assert first_cpi_offset_year > 0
         # adjust inflation rates
@@ -520,7 +558,15 @@ class Policy(ParametersBase):
                     scalar = False  # parameter value is a list
                 else:
                     scalar = True  # parameter value is a scalar
-                for idx in np.ndindex(pvalue.shape):
+                # visit only the (row-major ordered) out-of-range values
+                if vop == 'min':
+                    out_of_range_values = pvalue < vvalue
+                elif vop == 'max':
+                    out_of_range_values = pvalue > vvalue
+                else:
+                    continue
+                for idx in np.argwhere(out_of_range_values):
+                    idx = tuple(idx)
                     out_of_range = False
                     if vop == 'min' and pvalue[idx] < vvalue[idx]:
                         out_of_range = True
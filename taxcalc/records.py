@@ -6,7 +6,11 @@ Tax-Calculator tax-filing-unit Records class.
 # pylint --disable=locally-disabled records.py
 
 import os
+import bz2
+import gzip
+import lzma
 import json
+import copy
 import numpy as np
 import pandas as pd
 from taxcalc.growfactors import GrowFactors
@@ -20,7 +24,9 @@ class Records(object):
     Parameters
     ----------
     data: string or Pandas DataFrame
-        string describes CSV file in which records data reside;
+        string describes CSV file in which records data reside or
+        describes directory containing a binary cache of records data
+        written by the Records.write_cache() method;
         DataFrame already contains records data;
         default value is the string 'puf.csv'
         For details on how to use your own data with the Tax-Calculator,
@@ -59,6 +65,24 @@ class Records(object):
         look at the test_Calculator_using_nonstd_input()
         function in the taxcalc/tests/test_calculate.py file.
 
+    compact: boolean
+        specifies whether or not variables are stored using less memory:
+        float variables as np.float32 (except for the sample weights and
+        the tax-liability variables in the COMPACT_FLOAT64_VARS set, which
+        remain np.float64) and the small integer variables in the
+        COMPACT_INTEGER_DTYPES dictionary using the dtypes in it;
+        default value is false.
+        Results calculated with compact variables differ from those
+        calculated with np.float64 variables by float32 rounding errors,
+        which are small relative to the tax amounts (see the
+        test_compact_records function in the tests/test_calculate.py
+        file for the tolerances that are checked), but which make compact
+        Records objects unsuitable for calculating marginal tax rates, so
+        the Calculator mtr and mtrs methods raise a ValueError when using
+        compact Records, as does the Behavior.response method when the
+        behavioral responses depend on marginal tax rates (that is, when
+        any of the BE_sub, BE_inc, or BE_cg elasticities is nonzero).
+
     Raises
     ------
     ValueError:
@@ -105,6 +129,7 @@ class Records(object):
     CPS_WEIGHTS_FILENAME = 'cps_weights.csv.gz'
     CPS_RATIOS_FILENAME = None
     VAR_INFO_FILENAME = 'records_variables.json'
+    CACHE_INDEX_FILENAME = 'index.npy'
 
     def __init__(self,
                  data='puf.csv',
@@ -112,9 +137,16 @@ class Records(object):
                  gfactors=GrowFactors(),
                  weights=PUF_WEIGHTS_FILENAME,
                  adjust_ratios=PUF_RATIOS_FILENAME,
-                 start_year=PUFCSV_YEAR):
+                 start_year=PUFCSV_YEAR,
+                 compact=False):
         # pylint: disable=too-many-arguments,too-many-locals
         self.__data_year = start_year
+        self.__compact = compact
+        # no variable arrays are shared with another Records object
+        self.__shared_arrays = dict()
+        # grown variables are not yet rows of a 2-D array (see _blowup)
+        self.__growth_block = None
+        self.__growth_rows = None
         # read specified data
         self._read_data(data, exact_calculations)
         # check that three sets of split-earnings variables have valid values
@@ -143,6 +175,13 @@ class Records(object):
             msg = 'expression "e01500 >= e01700" is not true for every record'
             raise ValueError(msg)
         del nontaxable_pensions
+        # store read variables using compact dtypes after checking them
+        if compact:
+            for varname in Records.USABLE_READ_VARS:
+                var = getattr(self, varname)
+                dtype = self._var_dtype(varname)
+                if var.dtype != dtype:
+                    setattr(self, varname, var.astype(dtype))
         # handle grow factors
         is_correct_type = isinstance(gfactors, GrowFactors)
         if gfactors is not None and not is_correct_type:
@@ -180,7 +219,8 @@ class Records(object):
     @staticmethod
     def cps_constructor(data=None,
                         exact_calculations=False,
-                        gfactors=GrowFactors()):
+                        gfactors=GrowFactors(),
+                        compact=False):
         """
         Static method returns a Records object instantiated with CPS
         input data.  This works in a analogous way to Records(), which
@@ -198,7 +238,131 @@ class Records(object):
                        gfactors=gfactors,
                        weights=Records.CPS_WEIGHTS_FILENAME,
                        adjust_ratios=Records.CPS_RATIOS_FILENAME,
-                       start_year=Records.CPSCSV_YEAR)
+                       start_year=Records.CPSCSV_YEAR,
+                       compact=compact)
+
+    @staticmethod
+    def write_cache(data, cache_dir):
+        """
+        Static method writes to the cache_dir directory a binary columnar
+        cache of the records data, which are specified by data as a CSV
+        file name or as a Pandas DataFrame.  Each data variable that is in
+        the USABLE_READ_VARS set is written to its own .npy file using the
+        same dtype as the Records constructor does (np.int32 for variables
+        in the INTEGER_READ_VARS set and np.float64 for all others).
+        Specifying cache_dir as the data argument of the Records
+        constructor memory-maps the cached variables instead of parsing
+        and converting the CSV file, so that several processes reading
+        the same cache share the same pages of memory.
+        """
+        if Records.INTEGER_VARS is None:
+            Records.read_var_info()
+        if isinstance(data, str):
+            taxdf = pd.read_csv(data)
+        elif isinstance(data, pd.DataFrame):
+            taxdf = data
+        else:
+            msg = 'data is neither a string nor a Pandas DataFrame'
+            raise ValueError(msg)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        np.save(os.path.join(cache_dir, Records.CACHE_INDEX_FILENAME),
+                np.asarray(taxdf.index.values, dtype=np.int64))
+        for varname in Records.USABLE_READ_VARS:
+            var_path = os.path.join(cache_dir, varname + '.npy')
+            if varname in taxdf.columns:
+                if varname in Records.INTEGER_READ_VARS:
+                    dtype = np.int32
+                else:
+                    dtype = np.float64
+                np.save(var_path, taxdf[varname].astype(dtype).values)
+            elif os.path.isfile(var_path):
+                os.remove(var_path)  # from an earlier cache of other data
+
+    @staticmethod
+    def read_chunks(data, chunk_size,
+                    exact_calculations=False,
+                    gfactors=GrowFactors(),
+                    weights=PUF_WEIGHTS_FILENAME,
+                    adjust_ratios=PUF_RATIOS_FILENAME,
+                    start_year=PUFCSV_YEAR,
+                    compact=False):
+        """
+        Static generator method that yields, in data order, a Records
+        object for each chunk of at most chunk_size consecutive records
+        in data, which is a CSV file name or a Pandas DataFrame.  The
+        other arguments have the same meaning as in the Records class
+        constructor.  Only one chunk of a CSV file is read at a time, so
+        the memory used does not depend on the number of records in the
+        file.  Each chunk gets its rows of the sample weights, which are
+        scaled up (when data contain fewer records than the weights) by
+        the same year-specific factors that the constructor uses for all
+        the records in data.
+        """
+        # pylint: disable=too-many-arguments
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            msg = 'chunk_size={} is not a positive integer'
+            raise ValueError(msg.format(chunk_size))
+        if isinstance(data, pd.DataFrame):
+            def read_data():
+                """
+                Return iterator over data chunks.
+                """
+                for start in range(0, len(data.index), chunk_size):
+                    yield data.iloc[start:start + chunk_size]
+        elif isinstance(data, str) and os.path.isfile(data):
+            def read_data():
+                """
+                Return iterator over data chunks.
+                """
+                return pd.read_csv(data, chunksize=chunk_size)
+        else:
+            msg = 'data is neither a CSV file name nor a Pandas DataFrame'
+            raise ValueError(msg)
+        WT = Records._weights_dataframe(weights)
+        factor = None
+        if WT.size > 0:
+            if isinstance(data, pd.DataFrame):
+                index = data.index
+            else:
+                index = pd.RangeIndex(Records._csv_record_count(data))
+            if len(index) != len(WT.index):
+                factor = WT.sum() / WT.iloc[index].sum()
+        for chunk in read_data():
+            if WT.size > 0:
+                chunk_weights = WT.iloc[chunk.index]
+            else:
+                chunk_weights = None
+            recs = Records(data=chunk,
+                           exact_calculations=exact_calculations,
+                           gfactors=gfactors,
+                           weights=chunk_weights,
+                           adjust_ratios=adjust_ratios,
+                           start_year=start_year,
+                           compact=compact)
+            if factor is not None:
+                recs.WT *= factor
+                wt_colname = 'WT{}'.format(start_year)
+                if wt_colname in recs.WT.columns:
+                    recs.s006 = recs.WT[wt_colname] * 0.01
+            yield recs
+
+    @staticmethod
+    def _csv_record_count(path):
+        """
+        Return number of records in the CSV file with the specified path,
+        which is the number of nonblank lines after the header line, by
+        scanning the lines of the file without parsing them.
+        """
+        openers = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+        extension = os.path.splitext(path)[1]
+        if extension == '.zip':
+            # count zip-compressed records with Pandas, which can read them
+            return sum(len(chunk.index) for chunk in
+                       pd.read_csv(path, usecols=[0], chunksize=100000))
+        with openers.get(extension, open)(path, 'rb') as csvfile:
+            num_lines = sum(1 for line in csvfile if line.strip())
+        return max(num_lines - 1, 0)
 
     @property
     def data_year(self):
@@ -214,6 +378,13 @@ class Records(object):
         """
         return self.__current_year
 
+    @property
+    def compact(self):
+        """
+        True if variables are stored using compact dtypes.
+        """
+        return self.__compact
+
     @property
     def array_length(self):
         """
@@ -221,6 +392,65 @@ class Records(object):
         """
         return self.__dim
 
+    def chunk(self, start, stop):
+        """
+        Return a shallow copy of this Records object in which each
+        variable is a view of the [start:stop] slice of the variable
+        in this Records object, so that changing chunk variable values
+        in place also changes the values in this Records object.
+        """
+        chunk = copy.copy(self)
+        for varname in Records.USABLE_READ_VARS | Records.CALCULATED_VARS:
+            setattr(chunk, varname, getattr(self, varname)[start:stop])
+        chunk.__dim = chunk.MARS.size
+        return chunk
+
+    def stacked(self, num_copies):
+        """
+        Return a shallow copy of this Records object in which each
+        variable contains num_copies copies of the variable in this
+        Records object placed one after another.
+        """
+        stacked = copy.copy(self)
+        for varname in Records.USABLE_READ_VARS | Records.CALCULATED_VARS:
+            setattr(stacked, varname,
+                    np.tile(getattr(self, varname), num_copies))
+        stacked.__dim = self.array_length * num_copies
+        stacked.__shared_arrays = dict()
+        return stacked
+
+    def shared_copy(self):
+        """
+        Return a copy of this Records object in which each variable array
+        is shared with this Records object until one of the two objects
+        changes the values of that variable in place, at which time the
+        changing object first gets its own copy of the variable array.
+        This copy-on-write behavior uses much less memory than a deep copy
+        when several Calculator objects are constructed from the same
+        Records object.  Note that code outside this class that changes
+        variable values in place must first call the unshare method.
+        """
+        shared = copy.copy(self)
+        for varname in Records.USABLE_READ_VARS | Records.CALCULATED_VARS:
+            self.__shared_arrays[varname] = getattr(self, varname)
+        shared.__shared_arrays = dict(self.__shared_arrays)
+        shared.gfactors = copy.deepcopy(self.gfactors)
+        shared.IGNORED_VARS = set(self.IGNORED_VARS)
+        return shared
+
+    def unshare(self, varnames):
+        """
+        Replace each named variable array that is shared with another
+        Records object by a copy owned by this Records object, so that
+        the variable values can be changed in place without changing the
+        values in the other Records object.
+        """
+        for varname in varnames:
+            var = getattr(self, varname)
+            if self.__shared_arrays.get(varname) is var:
+                setattr(self, varname, var.copy())
+                del self.__shared_arrays[varname]
+
     def increment_year(self):
         """
         Add one to current year.
@@ -247,6 +477,7 @@ class Records(object):
         are skipped.
         """
         self.__current_year = new_current_year
+        self.unshare(['FLPDYR'])
         self.FLPDYR.fill(new_current_year)
 
     @staticmethod
@@ -282,6 +513,23 @@ class Records(object):
                                    FIXED_CALCULATED_VARS)
         Records.CHANGING_CALCULATED_VARS = FLOAT_CALCULATED_VARS
         Records.INTEGER_VARS = Records.INTEGER_READ_VARS | INT_CALCULATED_VARS
+        Records.GROWTH_FACTOR = dict((k, v['growth_factor'])
+                                     for k, v in vardict['read'].items()
+                                     if 'growth_factor' in v)
+        Records.NEGATIVE_GROWTH_FACTOR = dict(
+            (k, v['negative_growth_factor'])
+            for k, v in vardict['read'].items()
+            if 'negative_growth_factor' in v
+        )
+        Records.GROWTH_FACTOR_NAMES = (
+            set(Records.GROWTH_FACTOR.values()) |
+            set(Records.NEGATIVE_GROWTH_FACTOR.values())
+        )
+        Records.GROWN_VARS = (
+            sorted(set(Records.GROWTH_FACTOR) -
+                   set(Records.NEGATIVE_GROWTH_FACTOR)) +
+            sorted(Records.NEGATIVE_GROWTH_FACTOR)
+        )
         return vardict
 
     # specify various sets of variable names
@@ -291,6 +539,30 @@ class Records(object):
     CALCULATED_VARS = None
     CHANGING_CALCULATED_VARS = None
     INTEGER_VARS = None
+    GROWTH_FACTOR = None
+    NEGATIVE_GROWTH_FACTOR = None
+    GROWTH_FACTOR_NAMES = None
+    GROWN_VARS = None
+
+    # specify variables stored as np.float64 in compact Records objects
+    COMPACT_FLOAT64_VARS = set([
+        's006', 'taxbc', 'c05200', 'c05800', 'c07100', 'c09200', 'c09600',
+        'othertaxes', 'niit', 'refund', 'iitax', 'surtax', 'fstax',
+        'ptax_was', 'ptax_amc', 'ptax_oasdi', 'setax', 'payrolltax',
+        'lumpsum_tax', 'combined', 'expanded_income', 'aftertax_income'
+    ])
+
+    # specify dtypes of small integer variables in compact Records objects
+    COMPACT_INTEGER_DTYPES = {
+        'DSI': np.int8, 'EIC': np.int8, 'MARS': np.int8, 'MIDR': np.int8,
+        'XTOT': np.int8, 'age_head': np.int8, 'age_spouse': np.int8,
+        'agi_bin': np.int8, 'blind_head': np.int8, 'blind_spouse': np.int8,
+        'elderly_dependents': np.int8, 'f2441': np.int8, 'f6251': np.int8,
+        'filer': np.int8, 'n1820': np.int8, 'n21': np.int8, 'n24': np.int8,
+        'nu05': np.int8, 'nu13': np.int8, 'nu18': np.int8,
+        'exact': np.int8, 'num': np.int8, 'sep': np.int8,
+        'FLPDYR': np.int16
+    }
 
     # ----- begin private methods of Records class -----
 
@@ -298,109 +570,61 @@ class Records(object):
         """
         Apply to variables the grow factors for specified calendar year.
         """
-        # pylint: disable=too-many-locals,too-many-statements
-        AWAGE = self.gfactors.factor_value('AWAGE', year)
-        AINTS = self.gfactors.factor_value('AINTS', year)
-        ADIVS = self.gfactors.factor_value('ADIVS', year)
-        ATXPY = self.gfactors.factor_value('ATXPY', year)
-        ASCHCI = self.gfactors.factor_value('ASCHCI', year)
-        ASCHCL = self.gfactors.factor_value('ASCHCL', year)
-        ACGNS = self.gfactors.factor_value('ACGNS', year)
-        ASCHEI = self.gfactors.factor_value('ASCHEI', year)
-        ASCHEL = self.gfactors.factor_value('ASCHEL', year)
-        ASCHF = self.gfactors.factor_value('ASCHF', year)
-        AUCOMP = self.gfactors.factor_value('AUCOMP', year)
-        ASOCSEC = self.gfactors.factor_value('ASOCSEC', year)
-        ACPIM = self.gfactors.factor_value('ACPIM', year)
-        ABOOK = self.gfactors.factor_value('ABOOK', year)
-        AIPD = self.gfactors.factor_value('AIPD', year)
-        self.e00200 *= AWAGE
-        self.e00200p *= AWAGE
-        self.e00200s *= AWAGE
-        self.pencon_p *= AWAGE
-        self.pencon_s *= AWAGE
-        self.e00300 *= AINTS
-        self.e00400 *= AINTS
-        self.e00600 *= ADIVS
-        self.e00650 *= ADIVS
-        self.e00700 *= ATXPY
-        self.e00800 *= ATXPY
-        self.e00900s[:] = np.where(self.e00900s >= 0,
-                                   self.e00900s * ASCHCI,
-                                   self.e00900s * ASCHCL)
-        self.e00900p[:] = np.where(self.e00900p >= 0,
-                                   self.e00900p * ASCHCI,
-                                   self.e00900p * ASCHCL)
+        block = self._growth_block()
+        value = {name: self.gfactors.factor_value(name, year)
+                 for name in Records.GROWTH_FACTOR_NAMES}
+        factor = np.array([value[Records.GROWTH_FACTOR[varname]]
+                           for varname in Records.GROWN_VARS])
+        # variables grown by the same factor whatever their sign are the
+        # first rows of block and are all grown by one broadcast multiply
+        num = len(Records.GROWN_VARS) - len(Records.NEGATIVE_GROWTH_FACTOR)
+        block[:num] *= factor[:num, np.newaxis]
+        # remaining rows use another factor to grow their negative values
+        nfactor = np.array([value[Records.NEGATIVE_GROWTH_FACTOR[varname]]
+                            for varname in Records.GROWN_VARS[num:]])
+        split = block[num:]
+        split[:] = np.where(split >= 0,
+                            split * factor[num:, np.newaxis],
+                            split * nfactor[:, np.newaxis])
+        # e00900 is not grown because it is the sum of e00900p and e00900s
+        self.unshare(['e00900'])
         self.e00900[:] = self.e00900p + self.e00900s
-        self.e01100 *= ACGNS
-        self.e01200 *= ACGNS
-        self.e01400 *= ATXPY
-        self.e01500 *= ATXPY
-        self.e01700 *= ATXPY
-        self.e02000[:] = np.where(self.e02000 >= 0,
-                                  self.e02000 * ASCHEI,
-                                  self.e02000 * ASCHEL)
-        self.e02100 *= ASCHF
-        self.e02100p *= ASCHF
-        self.e02100s *= ASCHF
-        self.e02300 *= AUCOMP
-        self.e02400 *= ASOCSEC
-        self.e03150 *= ATXPY
-        self.e03210 *= ATXPY
-        self.e03220 *= ATXPY
-        self.e03230 *= ATXPY
-        self.e03270 *= ACPIM
-        self.e03240 *= ATXPY
-        self.e03290 *= ACPIM
-        self.e03300 *= ATXPY
-        self.e03400 *= ATXPY
-        self.e03500 *= ATXPY
-        self.e07240 *= ATXPY
-        self.e07260 *= ATXPY
-        self.e07300 *= ABOOK
-        self.e07400 *= ABOOK
-        self.p08000 *= ATXPY
-        self.e09700 *= ATXPY
-        self.e09800 *= ATXPY
-        self.e09900 *= ATXPY
-        self.e11200 *= ATXPY
-        # ITEMIZED DEDUCTIONS
-        self.e17500 *= ACPIM
-        self.e18400 *= ATXPY
-        self.e18500 *= ATXPY
-        self.e19200 *= AIPD
-        self.e19800 *= ATXPY
-        self.e20100 *= ATXPY
-        self.e20400 *= ATXPY
-        self.g20500 *= ATXPY
-        # CAPITAL GAINS
-        self.p22250 *= ACGNS
-        self.p23250 *= ACGNS
-        self.e24515 *= ACGNS
-        self.e24518 *= ACGNS
-        # SCHEDULE E
-        self.e26270 *= ASCHEI
-        self.e27200 *= ASCHEI
-        self.k1bx14p *= ASCHEI
-        self.k1bx14s *= ASCHEI
-        # MISCELLANOUS SCHEDULES
-        self.e07600 *= ATXPY
-        self.e32800 *= ATXPY
-        self.e58990 *= ATXPY
-        self.e62900 *= ATXPY
-        self.e87530 *= ATXPY
-        self.e87521 *= ATXPY
-        self.cmbtp *= ATXPY
-        # BENEFITS
-        self.other_ben *= self.gfactors.factor_value('ABENOTHER', year)
-        self.mcare_ben *= self.gfactors.factor_value('ABENMCARE', year)
-        self.mcaid_ben *= self.gfactors.factor_value('ABENMCAID', year)
-        self.ssi_ben *= self.gfactors.factor_value('ABENSSI', year)
-        self.snap_ben *= self.gfactors.factor_value('ABENSNAP', year)
-        self.wic_ben *= self.gfactors.factor_value('ABENWIC', year)
-        self.housing_ben *= self.gfactors.factor_value('ABENHOUSING', year)
-        self.tanf_ben *= self.gfactors.factor_value('ABENTANF', year)
-        self.vet_ben *= self.gfactors.factor_value('ABENVET', year)
+
+    def _growth_block(self):
+        """
+        Return 2-D array whose rows are the Records.GROWN_VARS variables
+        in this Records object.  The array is created when the variables
+        are not rows of an array owned by this Records object, which is
+        the case before the first call to _blowup, after a variable has
+        been replaced by another array, after a shared_copy, or after a
+        deep copy.
+        """
+        block = self.__growth_block
+        if block is not None:
+            is_block_row = all(
+                getattr(self, varname) is row and row.base is block
+                for varname, row in zip(Records.GROWN_VARS,
+                                        self.__growth_rows)
+            )
+            if is_block_row and not any(
+                    self.__shared_arrays.get(varname) is row
+                    for varname, row in zip(Records.GROWN_VARS,
+                                            self.__growth_rows)):
+                return block
+        block = np.empty((len(Records.GROWN_VARS), self.array_length),
+                         dtype=np.result_type(*[getattr(self, varname)
+                                                for varname in
+                                                Records.GROWN_VARS]))
+        for idx, varname in enumerate(Records.GROWN_VARS):
+            var = getattr(self, varname)
+            block[idx] = var
+            if self.__shared_arrays.get(varname) is var:
+                del self.__shared_arrays[varname]
+        self.__growth_block = block
+        self.__growth_rows = list(block)
+        for varname, row in zip(Records.GROWN_VARS, self.__growth_rows):
+            setattr(self, varname, row)
+        return block
 
     def _adjust(self, year):
         """
@@ -409,8 +633,21 @@ class Records(object):
         """
         if self.ADJ.size > 0:
             # Interest income
+            self.unshare(['e00300'])
             self.e00300 *= self.ADJ['INT{}'.format(year)][self.agi_bin].values
 
+    def _var_dtype(self, varname):
+        """
+        Return dtype used to store named variable in this Records object.
+        """
+        if varname in Records.INTEGER_VARS:
+            if self.__compact:
+                return Records.COMPACT_INTEGER_DTYPES.get(varname, np.int32)
+            return np.int32
+        if self.__compact and varname not in Records.COMPACT_FLOAT64_VARS:
+            return np.float32
+        return np.float64
+
     def _read_data(self, data, exact_calcs):
         """
         Read Records data from file or use specified DataFrame as data.
@@ -423,7 +660,10 @@ class Records(object):
         if isinstance(data, pd.DataFrame):
             taxdf = data
         elif isinstance(data, str):
-            if os.path.isfile(data):
+            if os.path.isdir(data):
+                READ_VARS = self._read_cache(data)
+                taxdf = None
+            elif os.path.isfile(data):
                 taxdf = pd.read_csv(data)
             else:
                 # cannot call read_egg_ function in unit tests
@@ -431,38 +671,36 @@ class Records(object):
         else:
             msg = 'data is neither a string nor a Pandas DataFrame'
             raise ValueError(msg)
-        self.__dim = len(taxdf.index)
-        self.__index = taxdf.index
-        # create class variables using taxdf column names
-        READ_VARS = set()
-        self.IGNORED_VARS = set()
-        for varname in list(taxdf.columns.values):
-            if varname in Records.USABLE_READ_VARS:
-                READ_VARS.add(varname)
-                if varname in Records.INTEGER_READ_VARS:
-                    setattr(self, varname,
-                            taxdf[varname].astype(np.int32).values)
+        if taxdf is not None:
+            self.__dim = len(taxdf.index)
+            self.__index = taxdf.index
+            # create class variables using taxdf column names
+            READ_VARS = set()
+            self.IGNORED_VARS = set()
+            for varname in list(taxdf.columns.values):
+                if varname in Records.USABLE_READ_VARS:
+                    READ_VARS.add(varname)
+                    if varname in Records.INTEGER_READ_VARS:
+                        setattr(self, varname,
+                                taxdf[varname].astype(np.int32).values)
+                    else:
+                        setattr(self, varname,
+                                taxdf[varname].astype(np.float64).values)
                 else:
-                    setattr(self, varname,
-                            taxdf[varname].astype(np.float64).values)
-            else:
-                self.IGNORED_VARS.add(varname)
-        # check that MUST_READ_VARS are all present in taxdf
+                    self.IGNORED_VARS.add(varname)
+            # delete intermediate taxdf object
+            del taxdf
+        # check that MUST_READ_VARS are all present in data
         if not Records.MUST_READ_VARS.issubset(READ_VARS):
             msg = 'Records data missing one or more MUST_READ_VARS'
             raise ValueError(msg)
-        # delete intermediate taxdf object
-        del taxdf
         # create other class variables that are set to all zeros
         UNREAD_VARS = Records.USABLE_READ_VARS - READ_VARS
         ZEROED_VARS = Records.CALCULATED_VARS | UNREAD_VARS
         for varname in ZEROED_VARS:
-            if varname in Records.INTEGER_VARS:
-                setattr(self, varname,
-                        np.zeros(self.array_length, dtype=np.int32))
-            else:
-                setattr(self, varname,
-                        np.zeros(self.array_length, dtype=np.float64))
+            setattr(self, varname,
+                    np.zeros(self.array_length,
+                             dtype=self._var_dtype(varname)))
         # check for valid MARS values
         if not np.all(np.logical_and(np.greater_equal(self.MARS, 1),
                                      np.less_equal(self.MARS, 5))):
@@ -481,10 +719,38 @@ class Records(object):
         del UNREAD_VARS
         del ZEROED_VARS
 
+    def _read_cache(self, cache_dir):
+        """
+        Memory-map variables in cache_dir written by Records.write_cache.
+        The copy-on-write mapping leaves the cache files unchanged when
+        variable values are changed.  Returns set of variables read.
+        """
+        index = np.load(os.path.join(cache_dir, Records.CACHE_INDEX_FILENAME))
+        self.__dim = index.size
+        self.__index = pd.Index(index)
+        READ_VARS = set()
+        self.IGNORED_VARS = set()
+        for varname in Records.USABLE_READ_VARS:
+            var_path = os.path.join(cache_dir, varname + '.npy')
+            if not os.path.isfile(var_path):
+                continue
+            var = np.load(var_path, mmap_mode='c').view(np.ndarray)
+            if varname in Records.INTEGER_READ_VARS:
+                dtype = np.int32
+            else:
+                dtype = np.float64
+            if var.dtype != dtype or var.size != self.__dim:
+                msg = 'cached variable {} has wrong dtype or size'
+                raise ValueError(msg.format(varname))
+            setattr(self, varname, var)
+            READ_VARS.add(varname)
+        return READ_VARS
+
     def zero_out_changing_calculated_vars(self):
         """
         Set to zero all variables in the Records.CHANGING_CALCULATED_VARS set.
         """
+        self.unshare(Records.CHANGING_CALCULATED_VARS)
         for varname in Records.CHANGING_CALCULATED_VARS:
             var = getattr(self, varname)
             var.fill(0.)
@@ -497,9 +763,16 @@ class Records(object):
         create empty DataFrame if None.
         Assumes weights are integers equal to 100 times the real weight.
         """
+        setattr(self, 'WT', Records._weights_dataframe(weights))
+
+    @staticmethod
+    def _weights_dataframe(weights):
+        """
+        Return Records weights read from file or specified DataFrame as
+        a DataFrame of integers or an empty DataFrame if weights is None.
+        """
         if weights is None:
-            setattr(self, 'WT', pd.DataFrame({'nothing': []}))
-            return
+            return pd.DataFrame({'nothing': []})
         if isinstance(weights, pd.DataFrame):
             WT = weights
         elif isinstance(weights, str):
@@ -514,8 +787,7 @@ class Records(object):
             msg = 'weights is not None or a string or a Pandas DataFrame'
             raise ValueError(msg)
         assert isinstance(WT, pd.DataFrame)
-        setattr(self, 'WT', WT.astype(np.int32))
-        del WT
+        return WT.astype(np.int32)
 
     def _read_ratios(self, ratios):
         """
@@ -7,7 +7,6 @@ Tax-Calculator Input-Output class.
 
 import os
 import gc
-import copy
 import sqlite3
 import numpy as np
 import pandas as pd
@@ -19,9 +18,7 @@ from taxcalc.growdiff import GrowDiff
 from taxcalc.growfactors import GrowFactors
 from taxcalc.calculate import Calculator
 from taxcalc.growmodel import GrowModel
-from taxcalc.utils import (delete_file, write_graph_file,
-                           add_quantile_table_row_variable,
-                           unweighted_sum, weighted_sum)
+from taxcalc.utils import (delete_file, write_graph_file, TableRows)
 
 
 class TaxCalcIO(object):
@@ -329,28 +326,19 @@ class TaxCalcIO(object):
         # set policy to tax_year
         pol.set_year(tax_year)
         base.set_year(tax_year)
-        # read input file contents into Records objects
+        # read input file contents into a Records object
         if aging_input_data:
             if self.cps_input_data:
                 recs = Records.cps_constructor(
                     gfactors=gfactors_ref,
                     exact_calculations=exact_calculations
                 )
-                recs_base = Records.cps_constructor(
-                    gfactors=gfactors_base,
-                    exact_calculations=exact_calculations
-                )
             else:  # if not cps_input_data but aging_input_data
                 recs = Records(
                     data=input_data,
                     gfactors=gfactors_ref,
                     exact_calculations=exact_calculations
                 )
-                recs_base = Records(
-                    data=input_data,
-                    gfactors=gfactors_base,
-                    exact_calculations=exact_calculations
-                )
         else:  # input_data are raw data that are not being aged
             recs = Records(data=input_data,
                            gfactors=None,
@@ -358,21 +346,25 @@ class TaxCalcIO(object):
                            weights=None,
                            adjust_ratios=None,
                            start_year=tax_year)
-            recs_base = copy.deepcopy(recs)
         if tax_year < recs.data_year:
             msg = 'tax_year {} less than records.data_year {}'
             msg = msg.format(tax_year, recs.data_year)
             self.errmsg += 'ERROR: {}\n'.format(msg)
-        # create Calculator objects
+        # create Calculator objects that share the Records variable arrays
+        # until the arrays are changed
         self.calc = Calculator(policy=pol, records=recs,
                                verbose=True,
                                consumption=con,
                                behavior=beh,
-                               sync_years=aging_input_data)
-        self.calc_base = Calculator(policy=base, records=recs_base,
+                               sync_years=aging_input_data,
+                               copy_on_write=True)
+        if aging_input_data:
+            recs.gfactors = gfactors_base
+        self.calc_base = Calculator(policy=base, records=recs,
                                     verbose=False,
                                     consumption=con,
-                                    sync_years=aging_input_data)
+                                    sync_years=aging_input_data,
+                                    copy_on_write=True)
 
     def custom_dump_variables(self, tcdumpvars_str):
         """
@@ -599,31 +591,44 @@ class TaxCalcIO(object):
         change = [(reform[idx] - base[idx]) for idx in range(0, len(tax_vars))]
         diff = nontax + change  # using expanded_income under baseline policy
         diffdf = pd.DataFrame(data=np.column_stack(diff), columns=all_vars)
-        # write each kind of distributional table
+        # write each kind of distributional table using the same table rows
+        table_rows = self.calc_base.table_rows()
         with open(tab_fname, 'w') as tfile:
-            TaxCalcIO.write_decile_table(distdf, tfile, tkind='Reform Totals')
+            TaxCalcIO.write_decile_table(distdf, tfile, tkind='Reform Totals',
+                                         table_rows=table_rows)
             tfile.write('\n')
-            TaxCalcIO.write_decile_table(diffdf, tfile, tkind='Differences')
+            TaxCalcIO.write_decile_table(diffdf, tfile, tkind='Differences',
+                                         table_rows=table_rows)
         # delete intermediate DataFrame objects
         del distdf
         del diffdf
         gc.collect()
 
     @staticmethod
-    def write_decile_table(dfx, tfile, tkind='Totals'):
-        """
-        Write to tfile the tkind decile table using dfx DataFrame.
-        """
-        dfx = add_quantile_table_row_variable(dfx, 'expanded_income', 10,
-                                              decile_details=False,
-                                              weight_by_income_measure=False)
-        gdfx = dfx.groupby('table_row', as_index=False)
-        rtns_series = gdfx.apply(unweighted_sum, 's006')
-        xinc_series = gdfx.apply(weighted_sum, 'expanded_income')
-        itax_series = gdfx.apply(weighted_sum, 'iitax')
-        ptax_series = gdfx.apply(weighted_sum, 'payrolltax')
-        htax_series = gdfx.apply(weighted_sum, 'lumpsum_tax')
-        ctax_series = gdfx.apply(weighted_sum, 'combined')
+    def write_decile_table(dfx, tfile, tkind='Totals', table_rows=None):
+        """
+        Write to tfile the tkind decile table using dfx DataFrame, where the
+        optional table_rows is a TableRows object for the dfx expanded_income.
+        """
+        if table_rows is None:
+            table_rows = TableRows(dfx['expanded_income'].values,
+                                   dfx['s006'].values)
+        # merge the decile-detail rows into the bottom and top decile rows
+        decile = np.clip(table_rows.codes('weighted_deciles') - 2, 0, 9)
+        weight = dfx['s006'].values
+
+        def decile_sums(values):
+            """
+            Return numpy array containing sum of values in each decile.
+            """
+            return np.bincount(decile, weights=values, minlength=10)
+
+        rtns_series = decile_sums(weight)
+        xinc_series = decile_sums(dfx['expanded_income'].values * weight)
+        itax_series = decile_sums(dfx['iitax'].values * weight)
+        ptax_series = decile_sums(dfx['payrolltax'].values * weight)
+        htax_series = decile_sums(dfx['lumpsum_tax'].values * weight)
+        ctax_series = decile_sums(dfx['combined'].values * weight)
         # write decile table to text file
         row = 'Weighted Tax {} by Baseline Expanded-Income Decile\n'
         tfile.write(row.format(tkind))
@@ -660,7 +665,7 @@ class TaxCalcIO(object):
                              htax_series.sum() * 1e-9,
                              ctax_series.sum() * 1e-9)
         tfile.write(row)
-        del gdfx
+        del decile
         del rtns_series
         del xinc_series
         del itax_series
@@ -1,3 +1,4 @@
 from taxcalc.tbi.tbi import (run_nth_year_taxcalc_model,
+                             run_taxcalc_years_model,
                              run_nth_year_gdp_elast_model,
                              reform_warnings_errors)
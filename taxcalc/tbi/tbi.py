@@ -19,6 +19,7 @@ import numpy as np
 import pandas as pd
 from taxcalc.tbi.tbi_utils import (check_years_return_first_year,
                                    calculate,
+                                   create_calculators,
                                    random_seed,
                                    fuzzed,
                                    summary_aggregate,
@@ -26,7 +27,7 @@ from taxcalc.tbi.tbi_utils import (check_years_return_first_year,
                                    summary_dist_xdec, summary_diff_xdec,
                                    create_dict_table,
                                    AGGR_ROW_NAMES)
-from taxcalc import (DIST_TABLE_LABELS, DIFF_TABLE_LABELS,
+from taxcalc import (DIST_TABLE_LABELS, DIFF_TABLE_LABELS, TableRows,
                      proportional_change_in_gdp,
                      GrowDiff, GrowFactors, Policy, Behavior, Consumption)
 
@@ -107,7 +108,7 @@ def run_nth_year_taxcalc_model(year_n, start_year,
     Setting use_full_sample=False implies use sub-sample of input file;
       otherwsie, use the complete sample.
     """
-    # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+    # pylint: disable=too-many-arguments
 
     start_time = time.time()
 
@@ -127,7 +128,74 @@ def run_nth_year_taxcalc_model(year_n, start_year,
     del calc2
 
     # construct TaxBrain summary results from raw results
+    res = _summary_results(year_n, dv1, dv2,
+                           use_puf_not_cps, user_mods, return_dict)
+
+    elapsed_time = time.time() - start_time
+    print('elapsed time for this run: {:.1f}'.format(elapsed_time))
+
+    return res
+
+
+def run_taxcalc_years_model(num_years, start_year,
+                            use_puf_not_cps,
+                            use_full_sample,
+                            user_mods,
+                            return_dict=True):
+    """
+    The run_taxcalc_years_model function assumes user_mods is a dictionary
+      returned by the Calculator.read_json_param_objects() function.
+    Setting use_puf_not_cps=True implies use puf.csv input file;
+      otherwise, use cps.csv input file.
+    Setting use_full_sample=False implies use sub-sample of input file;
+      otherwsie, use the complete sample.
+    Returns list of num_years results, where the year_n item in the list
+      is the same as the results returned by run_nth_year_taxcalc_model
+      for year_n, but the input file is read and extrapolated only once.
+    """
+    # pylint: disable=too-many-arguments
+
+    start_time = time.time()
+
+    # create calc1 and calc2 for start_year
+    if num_years < 1:
+        msg = 'num_years={} < 1'
+        raise ValueError(msg.format(num_years))
+    check_years_return_first_year(num_years - 1, start_year, use_puf_not_cps)
+    calc1, calc2 = create_calculators(start_year,
+                                      use_puf_not_cps, use_full_sample,
+                                      user_mods,
+                                      behavior_allowed=True)
+
+    # construct TaxBrain summary results for each year in budget window
+    results = list()
+    last_year = start_year + num_years - 1
+    for year, dv1, dv2 in calc1.run_budget_window(start_year, last_year,
+                                                  calc=calc2):
+        results.append(_summary_results(year - start_year, dv1, dv2,
+                                        use_puf_not_cps, user_mods,
+                                        return_dict))
+        del dv1
+        del dv2
+
+    elapsed_time = time.time() - start_time
+    print('elapsed time for this run: {:.1f}'.format(elapsed_time))
+
+    return results
+
+
+def _summary_results(year_n, dv1, dv2, use_puf_not_cps, user_mods,
+                     return_dict):
+    """
+    Return TaxBrain summary results for year_n constructed from the dv1
+      (pre-reform) and dv2 (post-reform) raw results.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+
     sres = dict()
+    # all tables are grouped by the baseline expanded_income, whose table
+    # rows are computed only once for the tables and the fuzzing passes
+    table_rows = TableRows(dv1['expanded_income'].values, dv1['s006'].values)
     fuzzing = use_puf_not_cps
     if fuzzing:
         # seed random number generator with a seed value based on user_mods
@@ -143,23 +211,23 @@ def run_nth_year_taxcalc_model(year_n, start_year,
         sres = summary_aggregate(sres, agg1, agg2)
         del agg1
         del agg2
-        dv1b, dv2b = fuzzed(dv1, dv2, reform_affected, 'xbin')
-        sres = summary_dist_xbin(sres, dv1b, dv2b)
-        sres = summary_diff_xbin(sres, dv1b, dv2b)
+        dv1b, dv2b = fuzzed(dv1, dv2, reform_affected, 'xbin', table_rows)
+        sres = summary_dist_xbin(sres, dv1b, dv2b, table_rows)
+        sres = summary_diff_xbin(sres, dv1b, dv2b, table_rows)
         del dv1b
         del dv2b
-        dv1d, dv2d = fuzzed(dv1, dv2, reform_affected, 'xdec')
-        sres = summary_dist_xdec(sres, dv1d, dv2d)
-        sres = summary_diff_xdec(sres, dv1d, dv2d)
+        dv1d, dv2d = fuzzed(dv1, dv2, reform_affected, 'xdec', table_rows)
+        sres = summary_dist_xdec(sres, dv1d, dv2d, table_rows)
+        sres = summary_diff_xdec(sres, dv1d, dv2d, table_rows)
         del dv1d
         del dv2d
         del reform_affected
     else:
         sres = summary_aggregate(sres, dv1, dv2)
-        sres = summary_dist_xbin(sres, dv1, dv2)
-        sres = summary_diff_xbin(sres, dv1, dv2)
-        sres = summary_dist_xdec(sres, dv1, dv2)
-        sres = summary_diff_xdec(sres, dv1, dv2)
+        sres = summary_dist_xbin(sres, dv1, dv2, table_rows)
+        sres = summary_diff_xbin(sres, dv1, dv2, table_rows)
+        sres = summary_dist_xdec(sres, dv1, dv2, table_rows)
+        sres = summary_diff_xdec(sres, dv1, dv2, table_rows)
 
     # nested function used below
     def append_year(pdf):
@@ -174,8 +242,6 @@ def run_nth_year_taxcalc_model(year_n, start_year,
         res = dict()
         for tbl in sres:
             res[tbl] = append_year(sres[tbl])
-        elapsed_time = time.time() - start_time
-        print('elapsed time for this run: {:.1f}'.format(elapsed_time))
         return res
 
     # optionally construct JSON-like results dictionaries for year n
@@ -210,9 +276,6 @@ def run_nth_year_taxcalc_model(year_n, start_year,
                                          row_names=info[tbl]['row_names'],
                                          column_types=info[tbl]['col_types'])
 
-    elapsed_time = time.time() - start_time
-    print('elapsed time for this run: {:.1f}'.format(elapsed_time))
-
     return res
 
 
@@ -7,16 +7,15 @@ Private utility functions used only by public functions in the tbi.py file.
 
 import os
 import time
-import copy
+import collections
 import hashlib
 import numpy as np
 import pandas as pd
 from taxcalc import (Policy, Records, Calculator,
                      Consumption, Behavior, GrowFactors, GrowDiff)
-from taxcalc.utils import (add_income_table_row_variable,
-                           add_quantile_table_row_variable,
+from taxcalc.utils import (TableRows, income_sort_order,
                            create_difference_table, create_distribution_table,
-                           STANDARD_INCOME_BINS, read_egg_csv)
+                           read_egg_csv)
 
 
 def check_years_return_first_year(year_n, start_year, use_puf_not_cps):
@@ -74,6 +73,42 @@ def calculate(year_n, start_year,
     Set behavior_allowed to False when generating static results or
       set behavior_allowed to True when generating dynamic results.
     """
+    # pylint: disable=too-many-arguments
+    calc1, calc2 = create_calculators(start_year,
+                                      use_puf_not_cps,
+                                      use_full_sample,
+                                      user_mods,
+                                      behavior_allowed)
+
+    # increment Calculator objects for year_n years and calculate
+    for _ in range(0, year_n):
+        calc1.increment_year()
+        calc2.increment_year()
+    calc1.calc_all()
+    if calc2.behavior_has_response():
+        calc2 = Behavior.response(calc1, calc2)
+    else:
+        calc2.calc_all()
+
+    # return calculated Calculator objects
+    return (calc1, calc2)
+
+
+def create_calculators(start_year,
+                       use_puf_not_cps,
+                       use_full_sample,
+                       user_mods,
+                       behavior_allowed):
+    """
+    The create_calculators function assumes the specified user_mods is a
+      dictionary returned by the Calculator.read_json_param_objects()
+      function.
+    The function returns (calc1, calc2) where
+      calc1 is pre-reform Calculator object calculated for start_year, and
+      calc2 is post-reform Calculator object not yet calculated.
+    Set behavior_allowed to False when generating static results or
+      set behavior_allowed to True when generating dynamic results.
+    """
     # pylint: disable=too-many-arguments,too-many-locals
     # pylint: disable=too-many-branches,too-many-statements
 
@@ -134,14 +169,17 @@ def calculate(year_n, start_year,
         print('cps-read-time= {:.1f}'.format(time.time() - stime))
 
     # create pre-reform Calculator instance
+    # (the pre-reform and post-reform Calculator objects share the variable
+    #  arrays of one Records object until the arrays are changed)
     if use_puf_not_cps:
-        recs1 = Records(data=sample,
-                        gfactors=growfactors_pre)
+        recs = Records(data=sample,
+                       gfactors=growfactors_pre)
     else:
-        recs1 = Records.cps_constructor(data=sample,
-                                        gfactors=growfactors_pre)
+        recs = Records.cps_constructor(data=sample,
+                                       gfactors=growfactors_pre)
     policy1 = Policy(gfactors=growfactors_pre)
-    calc1 = Calculator(policy=policy1, records=recs1, consumption=consump)
+    calc1 = Calculator(policy=policy1, records=recs, consumption=consump,
+                       copy_on_write=True)
     while calc1.current_year < start_year:
         calc1.increment_year()
     calc1.calc_all()
@@ -163,17 +201,13 @@ def calculate(year_n, start_year,
         raise ValueError(msg)
 
     # create post-reform Calculator instance
-    if use_puf_not_cps:
-        recs2 = Records(data=sample,
-                        gfactors=growfactors_post)
-    else:
-        recs2 = Records.cps_constructor(data=sample,
-                                        gfactors=growfactors_post)
+    recs.gfactors = growfactors_post
     policy2 = Policy(gfactors=growfactors_post)
     policy_reform = user_mods['policy']
     policy2.implement_reform(policy_reform)
-    calc2 = Calculator(policy=policy2, records=recs2,
-                       consumption=consump, behavior=behv)
+    calc2 = Calculator(policy=policy2, records=recs,
+                       consumption=consump, behavior=behv,
+                       copy_on_write=True)
     while calc2.current_year < start_year:
         calc2.increment_year()
     assert calc2.current_year == start_year
@@ -187,22 +221,11 @@ def calculate(year_n, start_year,
     del growfactors_pre
     del growfactors_post
     del behv
-    del recs1
-    del recs2
+    del recs
     del policy1
     del policy2
 
-    # increment Calculator objects for year_n years and calculate
-    for _ in range(0, year_n):
-        calc1.increment_year()
-        calc2.increment_year()
-    calc1.calc_all()
-    if calc2.behavior_has_response():
-        calc2 = Behavior.response(calc1, calc2)
-    else:
-        calc2.calc_all()
-
-    # return calculated Calculator objects
+    # return Calculator objects
     return (calc1, calc2)
 
 
@@ -245,7 +268,7 @@ def random_seed_from_subdict(subdict):
 NUM_TO_FUZZ = 3  # when using dropq algorithm on puf.csv results
 
 
-def fuzzed(df1, df2, reform_affected, table_row_type):
+def fuzzed(df1, df2, reform_affected, table_row_type, table_rows=None):
     """
     Create fuzzed df2 dataframe and corresponding unfuzzed df1 dataframe.
 
@@ -266,64 +289,71 @@ def fuzzed(df1, df2, reform_affected, table_row_type):
     table_row_type: string
         valid values are 'aggr', 'xbin', and 'xdec'
 
+    table_rows: TableRows object or None
+        table rows defined by the df1 expanded_income and s006 values,
+        which are computed by this function when table_rows is None
+
     Returns
     -------
     df1, df2: Pandas DataFrames
-        where copied df2 is fuzzed to maintain data privacy and
-        where copied df1 has same filing unit order as has the fuzzed df2
+        where df1 is the unchanged df1 argument (not a copy) and where df2
+        is a fuzzed copy of the df2 argument with the same filing unit order
+
+    Notes
+    -----
+    Up to NUM_TO_FUZZ reform-affected filing units are randomly chosen in
+    each table row (using the global numpy random number generator, which
+    is seeded by the caller), where the table rows are visited in order and
+    the filing units in each row are in df1 expanded_income order for the
+    'xdec' table rows and in df1 order otherwise.  Fuzzing replaces the
+    reform (2) results with the baseline (1) results for each chosen unit.
     """
     assert (table_row_type == 'aggr' or
             table_row_type == 'xbin' or
             table_row_type == 'xdec')
     assert len(df1.index) == len(df2.index)
     assert reform_affected.size == len(df1.index)
-    df1 = copy.deepcopy(df1)
-    df2 = copy.deepcopy(df2)
-    # add copy of reform_affected to df2
-    df2['reform_affected'] = copy.deepcopy(reform_affected)
     # construct table rows, for which filing units in each row must be fuzzed
-    if table_row_type == 'xbin':
-        df1 = add_income_table_row_variable(df1, 'expanded_income',
-                                            STANDARD_INCOME_BINS)
-        df2['expanded_income_baseline'] = df1['expanded_income']
-        df2 = add_income_table_row_variable(df2, 'expanded_income_baseline',
-                                            STANDARD_INCOME_BINS)
-        del df2['expanded_income_baseline']
-    elif table_row_type == 'xdec':
-        df1 = add_quantile_table_row_variable(df1, 'expanded_income',
-                                              10, decile_details=True)
-        df2['expanded_income_baseline'] = df1['expanded_income']
-        df2 = add_quantile_table_row_variable(df2, 'expanded_income_baseline',
-                                              10, decile_details=True)
-        del df2['expanded_income_baseline']
-    elif table_row_type == 'aggr':
-        df1['table_row'] = np.ones(reform_affected.shape, dtype=int)
-        df2['table_row'] = df1['table_row']
-    gdf1 = df1.groupby('table_row', sort=False)
-    gdf2 = df2.groupby('table_row', sort=False)
-    del df1['table_row']
-    del df2['table_row']
-    # fuzz up to NUM_TO_FUZZ filing units randomly chosen in each group
-    # (or table row), where fuzz means to replace the reform (2) results
-    # with the baseline (1) results for each chosen filing unit
-    pd.options.mode.chained_assignment = None
-    group_list = list()
-    for name, group2 in gdf2:
-        indices = np.where(group2['reform_affected'])
+    if table_row_type == 'aggr':
+        codes = np.zeros(reform_affected.size, dtype=np.int64)
+        order = np.arange(reform_affected.size)
+    else:
+        if table_rows is None:
+            table_rows = TableRows(df1['expanded_income'].values,
+                                   df1['s006'].values)
+        assert len(table_rows) == len(df1.index)
+        if table_row_type == 'xbin':
+            codes = table_rows.codes('standard_income_bins')
+            order = np.arange(reform_affected.size)
+        else:
+            codes = table_rows.codes('weighted_deciles')
+            order = income_sort_order(df1['expanded_income'].values)
+    # arrange filing units by table row keeping their within-row order
+    members = order[np.argsort(codes[order], kind='stable')]
+    member_codes = codes[members]
+    row_starts = np.flatnonzero(np.diff(member_codes)) + 1
+    # choose up to NUM_TO_FUZZ reform-affected filing units in each table row
+    chosen = list()
+    for row_members in np.split(members, row_starts):
+        if codes[row_members[0]] < 0:
+            continue  # filing units not in any table row are not fuzzed
+        indices = np.where(reform_affected[row_members])
         num = min(len(indices[0]), NUM_TO_FUZZ)
         if num > 0:
             choices = np.random.choice(indices[0],  # pylint: disable=no-member
                                        size=num, replace=False)
-            group1 = gdf1.get_group(name)
-            for idx in choices:
-                group2.iloc[idx] = group1.iloc[idx]
-        group_list.append(group2)
-    df2 = pd.concat(group_list)
-    del df2['reform_affected']
-    pd.options.mode.chained_assignment = 'warn'
-    # reinstate index order of df1 and df2 and return
-    df1.sort_index(inplace=True)
-    df2.sort_index(inplace=True)
+            chosen.append(row_members[choices])
+    # replace reform results with baseline results for the chosen units
+    fuzz = np.zeros(reform_affected.size, dtype=np.bool_)
+    if chosen:
+        fuzz[np.concatenate(chosen)] = True
+    columns = collections.OrderedDict()
+    for col in df2.columns:
+        if col in df1:
+            columns[col] = np.where(fuzz, df1[col].values, df2[col].values)
+        else:
+            columns[col] = np.where(fuzz, np.nan, df2[col].values)
+    df2 = pd.DataFrame(columns, index=df2.index, columns=df2.columns)
     return (df1, df2)
 
 
@@ -362,78 +392,90 @@ def summary_aggregate(res, df1, df2):
     return res
 
 
-def summary_dist_xbin(res, df1, df2):
+def summary_dist_xbin(res, df1, df2, table_rows=None):
     """
     res is dictionary of summary-results DataFrames.
     df1 contains results variables for baseline policy.
     df2 contains results variables for reform policy.
+    table_rows is optional TableRows object for df1 expanded_income.
     returns augmented dictionary of summary-results DataFrames.
     """
     # create distribution tables grouped by xbin
     res['dist1_xbin'] = \
         create_distribution_table(df1, 'standard_income_bins',
-                                  'expanded_income')
+                                  'expanded_income', table_rows=table_rows)
     df2['expanded_income_baseline'] = df1['expanded_income']
     res['dist2_xbin'] = \
         create_distribution_table(df2, 'standard_income_bins',
-                                  'expanded_income_baseline')
+                                  'expanded_income_baseline',
+                                  table_rows=table_rows)
     del df2['expanded_income_baseline']
     # return res dictionary
     return res
 
 
-def summary_diff_xbin(res, df1, df2):
+def summary_diff_xbin(res, df1, df2, table_rows=None):
     """
     res is dictionary of summary-results DataFrames.
     df1 contains results variables for baseline policy.
     df2 contains results variables for reform policy.
+    table_rows is optional TableRows object for df1 expanded_income.
     returns augmented dictionary of summary-results DataFrames.
     """
     # create difference tables grouped by xbin
     res['diff_itax_xbin'] = \
-        create_difference_table(df1, df2, 'standard_income_bins', 'iitax')
+        create_difference_table(df1, df2, 'standard_income_bins', 'iitax',
+                                table_rows=table_rows)
     res['diff_ptax_xbin'] = \
-        create_difference_table(df1, df2, 'standard_income_bins', 'payrolltax')
+        create_difference_table(df1, df2, 'standard_income_bins', 'payrolltax',
+                                table_rows=table_rows)
     res['diff_comb_xbin'] = \
-        create_difference_table(df1, df2, 'standard_income_bins', 'combined')
+        create_difference_table(df1, df2, 'standard_income_bins', 'combined',
+                                table_rows=table_rows)
     # return res dictionary
     return res
 
 
-def summary_dist_xdec(res, df1, df2):
+def summary_dist_xdec(res, df1, df2, table_rows=None):
     """
     res is dictionary of summary-results DataFrames.
     df1 contains results variables for baseline policy.
     df2 contains results variables for reform policy.
+    table_rows is optional TableRows object for df1 expanded_income.
     returns augmented dictionary of summary-results DataFrames.
     """
     # create distribution tables grouped by xdec
     res['dist1_xdec'] = \
         create_distribution_table(df1, 'weighted_deciles',
-                                  'expanded_income')
+                                  'expanded_income', table_rows=table_rows)
     df2['expanded_income_baseline'] = df1['expanded_income']
     res['dist2_xdec'] = \
         create_distribution_table(df2, 'weighted_deciles',
-                                  'expanded_income_baseline')
+                                  'expanded_income_baseline',
+                                  table_rows=table_rows)
     del df2['expanded_income_baseline']
     # return res dictionary
     return res
 
 
-def summary_diff_xdec(res, df1, df2):
+def summary_diff_xdec(res, df1, df2, table_rows=None):
     """
     res is dictionary of summary-results DataFrames.
     df1 contains results variables for baseline policy.
     df2 contains results variables for reform policy.
+    table_rows is optional TableRows object for df1 expanded_income.
     returns augmented dictionary of summary-results DataFrames.
     """
     # create difference tables grouped by xdec
     res['diff_itax_xdec'] = \
-        create_difference_table(df1, df2, 'weighted_deciles', 'iitax')
+        create_difference_table(df1, df2, 'weighted_deciles', 'iitax',
+                                table_rows=table_rows)
     res['diff_ptax_xdec'] = \
-        create_difference_table(df1, df2, 'weighted_deciles', 'payrolltax')
+        create_difference_table(df1, df2, 'weighted_deciles', 'payrolltax',
+                                table_rows=table_rows)
     res['diff_comb_xdec'] = \
-        create_difference_table(df1, df2, 'weighted_deciles', 'combined')
+        create_difference_table(df1, df2, 'weighted_deciles', 'combined',
+                                table_rows=table_rows)
     # return res dictionary
     return res
 
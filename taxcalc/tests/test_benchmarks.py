@@ -0,0 +1,72 @@
+"""
+Tests of the Tax-Calculator benchmark suite.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle test_benchmarks.py
+# pylint --disable=locally-disabled test_benchmarks.py
+#
+# pylint: disable=missing-docstring
+
+import copy
+import numpy as np
+import pytest
+# pylint: disable=import-error
+from taxcalc import Records
+from taxcalc.benchmarks import (synthetic_records_data,
+                                synthetic_records,
+                                bundled_reforms,
+                                run_benchmarks,
+                                compare_benchmarks)
+
+
+def test_synthetic_records_data():
+    data1, weights1 = synthetic_records_data(1000, seed=1)
+    data2, weights2 = synthetic_records_data(1000, seed=1)
+    assert data1.equals(data2)
+    assert weights1.equals(weights2)
+    assert set(data1.columns) == set(Records.read_var_info()['read'])
+    assert len(data1.index) == 1000
+    assert np.all(data1['MARS'].between(1, 5))
+    assert np.all(data1['EIC'].between(0, 3))
+    assert np.allclose(data1['e00200'], data1['e00200p'] + data1['e00200s'])
+    assert np.all(data1['e00650'] <= data1['e00600'])
+    assert np.all(weights1['WT2014'] > 0)
+    data3, _ = synthetic_records_data(1000, seed=2)
+    assert not data1.equals(data3)
+    with pytest.raises(ValueError):
+        synthetic_records_data(0)
+
+
+def test_synthetic_records():
+    recs = synthetic_records(1000)
+    assert recs.array_length == 1000
+    assert recs.current_year == Records.CPSCSV_YEAR
+    recs.increment_year()
+    assert recs.current_year == Records.CPSCSV_YEAR + 1
+
+
+def test_run_and_compare_benchmarks():
+    assert 'ptaxes0' in bundled_reforms()
+    results = run_benchmarks(sizes=[500], reforms=['ptaxes0'], repeat=1)
+    names = [res['name'] for res in results['results']]
+    assert names == ['calc_all', 'mtr', 'create_distribution_table',
+                     'Behavior.response', 'calc_all:ptaxes0']
+    for res in results['results']:
+        assert res['num_units'] == 500
+        assert res['wall_time'] > 0.
+        assert res['peak_memory'] >= 0
+        assert res['records_per_sec'] > 0.
+    table = compare_benchmarks(results, results)
+    assert len(table.index) == len(names)
+    assert np.allclose(table['time_ratio'], 1.)
+    assert not table['regression'].any()
+    slower = copy.deepcopy(results)
+    slower['results'][0]['wall_time'] *= 2.
+    table = compare_benchmarks(slower, results)
+    assert table['regression'].tolist() == [True, False, False, False, False]
+    with pytest.raises(ValueError):
+        compare_benchmarks(results, results, tolerance=-1.)
+    with pytest.raises(ValueError):
+        run_benchmarks(sizes=[0], reforms=[])
+    with pytest.raises(ValueError):
+        run_benchmarks(sizes=[500], reforms=['no_such_reform'])
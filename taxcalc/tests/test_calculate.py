@@ -10,6 +10,7 @@ import pytest
 import numpy as np
 import pandas as pd
 from taxcalc import Policy, Records, Calculator, Behavior, Consumption
+from taxcalc.functions import ComputeBenefit
 
 
 RAWINPUTFILE_FUNITS = 4
@@ -145,6 +146,29 @@ def test_calculator_advance_to_year(cps_subsample):
         calc.advance_to_year(2015)
 
 
+def test_calculator_run_budget_window(cps_subsample):
+    rec = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    calc1 = Calculator(policy=pol, records=rec)
+    pol.implement_reform({2016: {'_II_em': [1000]}})
+    calc2 = Calculator(policy=pol, records=rec)
+    years = list()
+    for year, dv1, dv2 in calc1.run_budget_window(2015, 2017, calc=calc2):
+        years.append(year)
+        calc = Calculator(policy=pol, records=rec)
+        calc.advance_to_year(year)
+        calc.calc_all()
+        assert dv2.equals(calc.distribution_table_dataframe())
+        assert len(dv1.index) == len(dv2.index)
+    assert years == [2015, 2016, 2017]
+    assert calc1.current_year == 2017
+    assert calc2.current_year == 2017
+    with pytest.raises(ValueError):
+        next(calc1.run_budget_window(2016, 2018))
+    with pytest.raises(ValueError):
+        next(calc1.run_budget_window(2018, 2017))
+
+
 def test_make_calculator_raises_on_no_policy(cps_subsample):
     rec = Records.cps_constructor(data=cps_subsample)
     with pytest.raises(ValueError):
@@ -192,6 +216,130 @@ def test_calculator_mtr(cps_subsample):
     assert np.allclose(calc.array('c00100'), c00100x)
 
 
+def test_calculator_mtr_does_not_copy_records(cps_subsample):
+    rec = Records.cps_constructor(data=cps_subsample)
+    calc = Calculator(policy=Policy(), records=rec)
+    calc.calc_all()
+    e00200p = calc.array('e00200p')
+    e00300 = calc.array('e00300')
+    combined = calc.array('combined')
+    combined_values = combined.copy()
+    calc.mtr(variable_str='e00200p', calc_all_already_called=True)
+    # unchanged input arrays are not copied and changed ones are restored
+    assert calc.array('e00300') is e00300
+    assert calc.array('e00200p') is e00200p
+    assert calc.array('combined') is combined
+    assert np.array_equal(combined, combined_values)
+
+
+def test_calculator_mtrs(cps_subsample):
+    rec = Records.cps_constructor(data=cps_subsample)
+    calc = Calculator(policy=Policy(), records=rec)
+    variables = ['e00200p', 'e00200s', 'e00650', 'p23250']
+    mtrs = calc.mtrs(variables)
+    assert sorted(mtrs.keys()) == sorted(variables)
+    for var in variables:
+        mtr = calc.mtr(variable_str=var)
+        for batch_rates, rates in zip(mtrs[var], mtr):
+            assert np.allclose(batch_rates, rates, equal_nan=True)
+    with pytest.raises(ValueError):
+        calc.mtrs(['e00200p', 'bad_income_type'])
+
+
+def test_calc_all_profile(cps_subsample):
+    rec = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    pol.implement_reform({2015: {'_ID_BenefitSurtax_crt': [0.1]}})
+    calc1 = Calculator(policy=pol, records=rec)
+    calc2 = Calculator(policy=pol, records=rec)
+    calc1.advance_to_year(2015)
+    calc2.advance_to_year(2015)
+    assert calc1.calc_all() is None
+    table = calc2.calc_all(profile=True)
+    assert isinstance(table, pd.DataFrame)
+    assert list(table.columns) == ['calls', 'wall_time', 'bytes_touched']
+    stages = list(table.index)
+    assert stages[0] == 'BenefitPrograms'
+    assert stages[-1] == 'AfterTaxIncome'
+    for stage in ['EI_PayrollTax', 'ItemDed', '_taxinc_to_amt:standard',
+                  '_taxinc_to_amt:itemized', '_taxinc_to_amt:optimal',
+                  'BenefitSurtax', 'IITAX']:
+        assert stage in stages
+    assert 'TaxInc' not in stages  # included in the _taxinc_to_amt passes
+    assert (table['calls'] == 1).all()
+    assert (table['wall_time'] >= 0.).all()
+    itax_bytes = calc2.array('iitax').nbytes
+    assert table.loc['IITAX', 'bytes_touched'] > itax_bytes
+    assert table.loc['BenefitSurtax', 'bytes_touched'] > \
+        table.loc['_taxinc_to_amt:optimal', 'bytes_touched']
+    assert np.allclose(calc1.array('combined'), calc2.array('combined'))
+    fused_table = calc2.calc_all(fused=True, profile=True)
+    assert 'FUSED_CALC_ONE_YEAR_PARTS[1]' in fused_table.index
+    assert 'ItemDed' not in fused_table.index
+    assert calc2.calc_all() is None
+    with pytest.raises(ValueError):
+        calc2.calc_all(n_jobs=2, profile=True)
+
+
+def test_calc_all_changed(cps_subsample):
+    rec = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    pol.implement_reform({2015: {'_ID_BenefitSurtax_crt': [0.1]}})
+    calc1 = Calculator(policy=pol, records=rec)
+    calc2 = Calculator(policy=pol, records=rec)
+    calc1.advance_to_year(2015)
+    calc2.advance_to_year(2015)
+    calc1.calc_all()
+    calc2.calc_all()
+    for calc in [calc1, calc2]:
+        calc.array('e00300', calc.array('e00300') + 100.)
+    calc1.calc_all()
+    assert calc2.calc_all(changed=['e00300']) is None
+    # surtax is not compared because it is a subtotal that each step writing
+    # it adds to (rather than resets), so repeated calc_all calls accumulate
+    # it and calc_all(changed=...) does not rerun the unaffected steps that
+    # write it (see the Calculator.affected_steps docstring)
+    for varname in Records.CALCULATED_VARS - set(['surtax']):
+        assert np.allclose(calc1.array(varname), calc2.array(varname))
+    # check dependency graph and list of affected steps
+    graph = Calculator.dependency_graph()
+    assert list(graph.keys())[0] == 'BenefitPrograms'
+    assert list(graph.keys())[-1] == 'AfterTaxIncome'
+    assert 'SSBenefits' in graph['BenefitPrograms']['successors']
+    assert 'e00200p' in graph['EI_PayrollTax']['inputs']
+    assert 'payrolltax' in graph['EI_PayrollTax']['outputs']
+    steps = Calculator.affected_steps(['_CTC_c'])
+    assert 'ChildDepTaxCredit' in steps
+    assert 'IITAX' in steps
+    for name in ['EI_PayrollTax', 'AGI', '_taxes_with_optimal_deduction']:
+        assert name not in steps
+    assert Calculator.affected_steps(['e00200p'])[0] == 'EI_PayrollTax'
+    with pytest.raises(ValueError):
+        Calculator.affected_steps(['bogus_name'])
+    with pytest.raises(ValueError):
+        calc2.calc_all(fused=True, changed=['e00300'])
+
+
+def test_calculator_copy_on_write(cps_subsample):
+    rec = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    calc1 = Calculator(policy=pol, records=rec)
+    pol.implement_reform({2015: {'_II_em': [5000]}})
+    calc2 = Calculator(policy=pol, records=rec)
+    calc1_cow = Calculator(policy=Policy(), records=rec, copy_on_write=True)
+    calc2_cow = Calculator(policy=pol, records=rec, copy_on_write=True)
+    assert calc1_cow.array('MARS') is rec.MARS
+    assert calc2_cow.array('MARS') is rec.MARS
+    e00200 = rec.e00200.copy()
+    for calc in [calc1, calc2, calc1_cow, calc2_cow]:
+        calc.advance_to_year(2016)
+        calc.calc_all()
+    assert np.array_equal(rec.e00200, e00200)
+    assert np.allclose(calc1_cow.array('combined'), calc1.array('combined'))
+    assert np.allclose(calc2_cow.array('combined'), calc2.array('combined'))
+    assert not np.allclose(calc1.array('combined'), calc2.array('combined'))
+
+
 def test_calculator_mtr_when_PT_rates_differ():
     reform = {2013: {'_II_rt1': [0.40],
                      '_II_rt2': [0.40],
@@ -688,6 +836,70 @@ def test_calc_all(reform_file, rawinputfile):
     assert calc.reform_warnings == ''
 
 
+def test_calc_all_fused(cps_subsample):
+    rec = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    reform = {2018: {'_ID_BenefitSurtax_crt': [0.0],
+                     '_ID_BenefitSurtax_trt': [0.3],
+                     '_II_em': [2000]}}
+    pol.implement_reform(reform)
+    calc = Calculator(policy=pol, records=rec)
+    calc.advance_to_year(2018)
+    fcalc = copy.deepcopy(calc)
+    calc.calc_all()
+    fcalc.calc_all(fused=True)
+    for varname in Records.CALCULATED_VARS:
+        assert np.array_equal(fcalc.array(varname), calc.array(varname))
+
+
+def test_compute_benefit(cps_subsample):
+    rec = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    reform = {2018: {'_ID_BenefitSurtax_crt': [0.0],
+                     '_ID_BenefitSurtax_trt': [0.3],
+                     '_ID_BenefitCap_rt': [0.2]}}
+    pol.implement_reform(reform)
+    calc = Calculator(policy=pol, records=rec)
+    calc.advance_to_year(2018)
+    calc.calc_all()
+    switch = [True, True, False, True, True, True, False]
+    # compute benefit by recomputing all of a deep copy of calc
+    no_id_calc = copy.deepcopy(calc)
+    for param, use in zip(['ID_Medical_hc', 'ID_StateLocalTax_hc',
+                           'ID_RealEstate_hc', 'ID_Casualty_hc',
+                           'ID_Miscellaneous_hc', 'ID_InterestPaid_hc',
+                           'ID_Charity_hc'], switch):
+        if use:
+            no_id_calc.policy_param(param, 1.)
+    no_id_calc._calc_one_year()
+    diff_iitax = no_id_calc.array('iitax') - calc.array('iitax')
+    expected_benefit = np.where(diff_iitax > 0., diff_iitax, 0.)
+    # compute benefit incrementally without changing calc
+    before = copy.deepcopy(calc)
+    benefit = ComputeBenefit(calc, switch)
+    assert np.array_equal(benefit, expected_benefit)
+    assert benefit.max() > 0.
+    assert calc.policy_param('ID_Medical_hc') == 0.
+    for varname in Records.CALCULATED_VARS | Records.USABLE_READ_VARS:
+        assert np.array_equal(calc.array(varname), before.array(varname))
+
+
+def test_calc_all_n_jobs(cps_subsample):
+    rec = Records.cps_constructor(data=cps_subsample)
+    pol = Policy()
+    reform = {2018: {'_ID_BenefitSurtax_crt': [0.0],
+                     '_ID_BenefitSurtax_trt': [0.3],
+                     '_BEN_ssi_repeal': [True]}}
+    pol.implement_reform(reform)
+    calc = Calculator(policy=pol, records=rec)
+    calc.advance_to_year(2018)
+    pcalc = copy.deepcopy(calc)
+    calc.calc_all()
+    pcalc.calc_all(n_jobs=3)
+    for varname in Records.CALCULATED_VARS | Records.USABLE_READ_VARS:
+        assert np.array_equal(pcalc.array(varname), calc.array(varname))
+
+
 def test_translate_json_reform_suffixes_mars_non_indexed():
     # test read_json_param_objects()
     # using MARS-indexed parameter suffixes
@@ -932,6 +1144,146 @@ def test_difference_table(cps_subsample):
     assert isinstance(diff, pd.DataFrame)
 
 
+def test_score_reforms(cps_subsample):
+    cyr = 2018
+    recs = Records.cps_constructor(data=cps_subsample)
+    calc1 = Calculator(policy=Policy(), records=recs)
+    calc1.advance_to_year(cyr)
+    reforms = [
+        {'policy': {2017: {'_SS_Earnings_c': [9e99]}}},
+        {'policy': {2018: {'_II_em': [5000]}},
+         'consumption': {2018: {'_MPC_e17500': [0.3]}}}
+    ]
+    scores = calc1.score_reforms(reforms, n_jobs=2)
+    assert len(scores) == len(reforms)
+    for reform, (dist, diff) in zip(reforms, scores):
+        pol = Policy()
+        pol.implement_reform(reform['policy'])
+        con = Consumption()
+        if 'consumption' in reform:
+            con.update_consumption(reform['consumption'])
+        calc2 = Calculator(policy=pol, records=recs, consumption=con)
+        calc2.advance_to_year(cyr)
+        calc2.calc_all()
+        expect_dist = calc1.distribution_tables(calc2, 'weighted_deciles')[1]
+        expect_diff = calc1.difference_table(calc2, 'weighted_deciles',
+                                             'combined')
+        pd.testing.assert_frame_equal(dist, expect_dist)
+        pd.testing.assert_frame_equal(diff, expect_diff)
+    with pytest.raises(ValueError):
+        calc1.score_reforms(reforms, n_jobs=0)
+    with pytest.raises(ValueError):
+        bad_reform = {'growdiff_response': {2018: {'_AWAGE': [0.01]}}}
+        calc1.score_reforms([bad_reform])
+
+
+def test_parameter_sweep(cps_subsample):
+    cyr = 2018
+    recs = Records.cps_constructor(data=cps_subsample)
+    calc1 = Calculator(policy=Policy(), records=recs)
+    calc1.advance_to_year(cyr)
+    calc1.calc_all()
+    combined1 = calc1.weighted_total('combined')
+    values = [100000, 200000, 9e99]
+    sweep = calc1.parameter_sweep('_SS_Earnings_c', values)
+    assert list(sweep.columns) == ['iitax', 'payrolltax', 'combined']
+    assert len(sweep.index) == len(values)
+    for idx, value in enumerate(values):
+        pol = Policy()
+        pol.implement_reform({cyr: {'_SS_Earnings_c': [value]}})
+        calc2 = Calculator(policy=pol, records=recs)
+        calc2.advance_to_year(cyr)
+        calc2.calc_all()
+        for name in sweep.columns:
+            assert np.allclose(sweep[name][idx], calc2.weighted_total(name))
+    assert calc1.weighted_total('combined') == combined1
+    with pytest.raises(ValueError):
+        calc1.parameter_sweep('_unknown_param', values)
+
+
+def test_streamed_tables(cps_subsample):
+    cyr = 2018
+    pol2 = Policy()
+    pol2.implement_reform({cyr: {'_II_em': [5000]}})
+    recs = Records.cps_constructor(data=cps_subsample)
+    calc1 = Calculator(policy=Policy(), records=recs)
+    calc1.advance_to_year(cyr)
+    calc1.calc_all()
+    calc2 = Calculator(policy=pol2, records=recs)
+    calc2.advance_to_year(cyr)
+    calc2.calc_all()
+    dist1, dist2 = calc1.distribution_tables(calc2, 'standard_income_bins')
+    diff = calc1.difference_table(calc2, 'standard_income_bins', 'iitax')
+    dump = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+    dump.close()
+    try:
+        chunks = Records.read_chunks(cps_subsample, 500,
+                                     weights=Records.CPS_WEIGHTS_FILENAME,
+                                     adjust_ratios=Records.CPS_RATIOS_FILENAME,
+                                     start_year=Records.CPSCSV_YEAR)
+        tables = Calculator.streamed_tables(chunks, cyr, Policy(), pol2,
+                                            groupby='standard_income_bins',
+                                            tax_to_diff='iitax',
+                                            dump_filename=dump.name,
+                                            dump_varset={'RECID', 'iitax'})
+        for table, expected in zip(tables, [dist1, dist2, diff]):
+            assert list(table.index) == list(expected.index)
+            assert np.allclose(table.values.astype(float),
+                               expected.values.astype(float),
+                               equal_nan=True)
+        dumpdf = pd.read_csv(dump.name)
+        assert np.array_equal(dumpdf['RECID'], calc2.array('RECID'))
+        assert np.allclose(dumpdf['iitax'], calc2.array('iitax'), atol=0.01)
+    finally:
+        os.remove(dump.name)
+    with pytest.raises(ValueError):
+        Calculator.streamed_tables([recs], cyr, Policy(),
+                                   groupby='weighted_deciles')
+
+
+def test_compact_records(cps_subsample):
+    """
+    Check that tax liabilities calculated using compact Records variables
+    are within one dollar of those calculated using full-precision Records
+    variables for every filing unit and that the weighted totals differ
+    by less than one part in a million.
+    """
+    cyr = 2018
+    calcs = list()
+    for compact in [False, True]:
+        recs = Records.cps_constructor(data=cps_subsample, compact=compact)
+        assert recs.compact is compact
+        calc = Calculator(policy=Policy(), records=recs)
+        assert calc.records_compact is compact
+        calc.advance_to_year(cyr)
+        calc.calc_all()
+        calcs.append(calc)
+    calc64, calc32 = calcs
+    assert calc32.array('MARS').dtype == np.int8
+    assert calc32.array('e00200').dtype == np.float32
+    assert calc32.array('c00100').dtype == np.float32
+    for varname in ['iitax', 'payrolltax', 'combined',
+                    'expanded_income', 'aftertax_income']:
+        assert calc32.array(varname).dtype == np.float64
+        assert np.allclose(calc32.array(varname), calc64.array(varname),
+                           rtol=0., atol=1.)
+        assert np.allclose(calc32.weighted_total(varname),
+                           calc64.weighted_total(varname),
+                           rtol=1e-6, atol=0.)
+    with pytest.raises(ValueError):
+        calc32.mtr()
+    with pytest.raises(ValueError):
+        calc32.mtrs(['e00200p', 'e00300'])
+    # behavioral responses that depend on marginal tax rates
+    beh = Behavior()
+    beh.update_behavior({cyr: {'_BE_sub': [0.25]}})
+    recs = Records.cps_constructor(data=cps_subsample, compact=True)
+    calc32b = Calculator(policy=Policy(), records=recs, behavior=beh)
+    calc32b.advance_to_year(cyr)
+    with pytest.raises(ValueError):
+        Behavior.response(calc32, calc32b)
+
+
 def test_diagnostic_table(cps_subsample):
     recs = Records.cps_constructor(data=cps_subsample)
     calc = Calculator(policy=Policy(), records=recs)
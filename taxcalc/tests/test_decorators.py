@@ -264,6 +264,79 @@ def test_function_parameters_optional():
     assert_frame_equal(ans, exp)
 
 
+@iterate_jit(nopython=True)
+def Magic_calc7(x, y, z):
+    a = x + y
+    b = x + y + z
+    return (a, b)
+
+
+def test_iterate_jit_caches_toplevel_function():
+    pm = Foo()
+    pf = Foo()
+    pm.a = np.ones((5,))
+    pm.b = np.ones((5,))
+    pf.x = np.ones((5,))
+    pf.y = np.ones((5,))
+    pf.z = np.ones((5,))
+    assert Magic_calc7.saved_compiles == 0
+    for _ in range(3):
+        ans = Magic_calc7(pm, pf)
+    exp = DataFrame(data=[[2.0, 3.0]] * 5, columns=["a", "b"])
+    assert_frame_equal(ans, exp)
+    assert len(Magic_calc7.hl_func_cache) == 1
+    assert Magic_calc7.saved_compiles == 2
+    # a different layout of the arguments gets its own compiled function
+    pf.a = pm.a
+    pf.b = pm.b
+    del pm.a
+    del pm.b
+    ans = Magic_calc7(pm, pf)
+    assert_frame_equal(ans, exp)
+    assert len(Magic_calc7.hl_func_cache) == 2
+    assert Magic_calc7.saved_compiles == 2
+
+
+@iterate_jit(parameters=['w'], nopython=True)
+def Magic_calc8(w, a, x):
+    b = w * a + x
+    return b
+
+
+def test_create_fused_function_string():
+    ans = create_fused_function_string([Magic_calc7, 'x[i] = a[i]',
+                                        Magic_calc8],
+                                       ['a', 'b', 'x', 'y', 'z'], ['w'])
+    exp = ("def fused_func(a,b,x,y,z,w):\n"
+           "    for i in range(len(a)):\n"
+           "        a[i],b[i] = f_0(x[i],y[i],z[i])\n"
+           "        x[i] = a[i]\n"
+           "        b[i] = f_2(w,a[i],x[i])\n"
+           "    return 0\n")
+    assert ans == exp
+
+
+def test_fuse_iterate_jit():
+    fused = fuse_iterate_jit([Magic_calc7,
+                              'if b[i] > 3.:\n'
+                              '    x[i] = 0.',
+                              Magic_calc8], nopython=True)
+    assert fused.rec_args == ['a', 'b', 'x', 'y', 'z']
+    assert fused.par_args == ['w']
+    pm = Foo()
+    pf = Foo()
+    pm.w = 2.
+    pf.a = np.zeros((3,))
+    pf.b = np.zeros((3,))
+    pf.x = np.ones((3,))
+    pf.y = np.ones((3,))
+    pf.z = np.array([1., 2., 3.])
+    fused(pm, pf)
+    assert np.allclose(pf.a, [2., 2., 2.])
+    assert np.allclose(pf.b, [5., 4., 4.])
+    assert np.allclose(pf.x, [1., 0., 0.])
+
+
 def unjittable_function1(w, x, y, z):
     a = x + y
     b = w[0] + x + y + z
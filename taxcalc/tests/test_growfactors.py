@@ -81,6 +81,19 @@ def test_proper_usage():
     assert val > 1.0
 
 
+def test_update_of_cached_factors():
+    """
+    Test that updating one GrowFactors object does not change another one.
+    """
+    gfo1 = GrowFactors()
+    gfo2 = GrowFactors()
+    val = gfo2.factor_value('AWAGE', 2014)
+    gfo1.update('AWAGE', 2014, 0.01)
+    assert gfo1.factor_value('AWAGE', 2014) == val + 0.01
+    assert gfo2.factor_value('AWAGE', 2014) == val
+    assert GrowFactors().factor_value('AWAGE', 2014) == val
+
+
 def test_growfactors_csv_values():
     """
     Test numerical contents of growfactors.csv file.
@@ -6,6 +6,7 @@ Tests for Tax-Calculator ParametersBase class and JSON parameter files.
 # pylint --disable=locally-disabled test_parameters.py
 
 import os
+import copy
 import json
 import math
 import numpy as np
@@ -203,6 +204,31 @@ def test_parameters_mentioned(tests_path, jfname, pfname):
 # following tests access private methods, so pylint: disable=protected-access
 
 
+def test_current_year_values():
+    """
+    Check current-year parameter values that set_year does not copy.
+    """
+    syr = Policy.JSON_START_YEAR
+    pol = Policy()
+    assert pol.II_em == pol._II_em[0]
+    pol.set_year(2016)
+    assert pol.II_em == pol._II_em[2016 - syr]
+    assert np.array_equal(pol.STD, pol._STD[2016 - syr])
+    pol.II_em = 1.
+    assert pol.II_em == 1.
+    pol.set_year(2016)
+    assert pol.II_em == pol._II_em[2016 - syr]
+    pol.implement_reform({2016: {'_II_em': [9000]}})
+    assert pol.II_em == 9000
+    pol_copy = copy.deepcopy(pol)
+    pol_copy.set_year(2017)
+    assert pol.II_em == 9000
+    assert pol_copy.II_em > 9000
+    assert not hasattr(pol, 'unknown_param_name')
+    with pytest.raises(AttributeError):
+        pol.e00200  # pylint: disable=pointless-statement
+
+
 def test_expand_xd_errors():
     """
     One of several _expand_?D tests.
@@ -308,6 +334,42 @@ def test_expand_2d_partial_expand():
     assert np.allclose(res, exp, atol=0.01, rtol=0.0)
 
 
+def test_expand_rounding_and_cap():
+    """
+    One of several _expand_?D tests.
+    """
+    # each year's value is rounded to the nearest cent before being inflated
+    res = ParametersBase._expand_1D(np.array([10.004]),
+                                    inflate=True, inflation_rates=[0.5] * 3,
+                                    num_years=3)
+    assert np.array_equal(res, np.array([10.004, 15.01, 22.52]))
+    res = ParametersBase._expand_2D(np.array([[9e99, 1.]]),
+                                    inflate=True, inflation_rates=[0.1] * 2,
+                                    num_years=2)
+    assert np.array_equal(res, np.array([[9e99, 1.], [9e99, 1.1]]))
+
+
+def test_expand_arrays():
+    """
+    Check that _expand_arrays gives same results as _expand_array calls.
+    """
+    irates = [0.02, 0.025, 0.03, 0.035, 0.04]
+    specs = [([1.5], False, False, True, irates),
+             ([[100., 200.], [110., 220.]], False, False, True, irates),
+             ([1.5, 2.5], False, False, True, irates),
+             ([[100., 200., 300.]], False, False, True, irates[1:] + [0.1]),
+             ([[100., 200.]], False, False, False, None),
+             ([3], True, False, False, None),
+             ([True], False, True, False, None),
+             ([1., 2., 3., 4., 5., 6.], False, False, True, irates)]
+    results = ParametersBase._expand_arrays(specs, 5)
+    assert len(results) == len(specs)
+    for spec, res in zip(specs, results):
+        exp = ParametersBase._expand_array(*spec, num_years=5)
+        assert res.dtype == exp.dtype
+        assert np.array_equal(res, exp)
+
+
 @pytest.mark.parametrize('json_filename',
                          ['current_law_policy.json',
                           'behavior.json',
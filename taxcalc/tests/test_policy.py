@@ -8,7 +8,7 @@ import tempfile
 import numpy as np
 from numpy.testing import assert_allclose
 import pytest
-from taxcalc import Policy, Calculator
+from taxcalc import Policy, Calculator, GrowFactors
 
 
 def test_incorrect_Policy_instantiation():
@@ -35,6 +35,46 @@ def test_correct_Policy_instantiation():
         pol.implement_reform({2020: {'_II_em': [-1000]}})
 
 
+def test_cached_current_law_arrays():
+    # make sure current-law arrays for default indexing rates are cached
+    pol1 = Policy()
+    pol2 = Policy()
+    pol1.implement_reform({2016: {'_II_em': [5000], '_II_em_cpi': False}})
+    pol2.set_year(2018)
+    assert pol1._II_em is not pol2._II_em
+    assert pol1._II_em[2017 - Policy.JSON_START_YEAR] == 5000
+    assert pol2._II_em[2017 - Policy.JSON_START_YEAR] != 5000
+    pol3 = Policy()
+    pol3.set_year(2018)
+    assert pol3.II_em == pol2.II_em
+    for name in pol3._vals:
+        assert np.array_equal(getattr(pol3, name), getattr(pol2, name))
+    # different indexing rates produce different expanded arrays
+    gfactors = GrowFactors()
+    gfactors.update('ACPIU', 2018, 0.01)
+    pol4 = Policy(gfactors=gfactors)
+    assert pol4.inflation_rates() != pol3.inflation_rates()
+    assert pol4._STD_Aged[-1, 0] > pol3._STD_Aged[-1, 0]
+    assert len(Policy._CLP_ARRAYS_CACHE) <= Policy.CLP_ARRAYS_CACHE_SIZE
+
+
+def test_default_data_changes_are_not_shared():
+    # make sure changing a default_data result in place changes nothing else
+    expected_data = Policy.default_data(metadata=True)['_II_em']
+    expected_ii_em = Policy()._II_em.copy()
+    data = Policy.default_data(metadata=True)
+    data['_II_em']['value'][0] = -999
+    data['_II_em']['row_label'][0] = 'bad'
+    Policy.default_data()['_II_em'][0] = -999
+    assert Policy.default_data(metadata=True)['_II_em'] == expected_data
+    assert np.array_equal(Policy()._II_em, expected_ii_em)
+    # expand the arrays again rather than use the cached current-law arrays
+    gfactors = GrowFactors()
+    gfactors.update('ACPIU', 2018, 0.01)
+    pol = Policy(gfactors=gfactors)
+    assert pol._II_em[0] == expected_ii_em[0]
+
+
 @pytest.fixture(scope='module', name='policyfile')
 def fixture_policyfile():
     # specify JSON text for policy reform
@@ -3,6 +3,8 @@
 
 import os
 import json
+import shutil
+import tempfile
 import numpy as np
 from numpy.testing import assert_array_equal
 import pandas as pd
@@ -92,6 +94,176 @@ def test_read_data(csv):
         Records(data=df)
 
 
+def test_records_chunk():
+    csv = (u'RECID,MARS,e00200,e00200p,e00200s\n'
+           u'1,    2,   200000, 200000,   0\n'
+           u'2,    1,   100000, 100000,   0\n'
+           u'3,    1,    50000,  50000,   0\n')
+    rec = Records(data=pd.read_csv(StringIO(csv)), gfactors=None,
+                  weights=None, adjust_ratios=None, start_year=2015)
+    chunk = rec.chunk(1, 3)
+    assert chunk.array_length == 2
+    assert rec.array_length == 3
+    assert chunk.current_year == rec.current_year
+    assert_array_equal(chunk.RECID, [2, 3])
+    chunk.e00200[:] = 0.
+    chunk.iitax[:] = 1.
+    assert_array_equal(rec.e00200, [200000., 0., 0.])
+    assert_array_equal(rec.iitax, [0., 1., 1.])
+
+
+def test_records_stacked():
+    csv = (u'RECID,MARS,e00200,e00200p,e00200s\n'
+           u'1,    2,   200000, 200000,   0\n'
+           u'2,    1,   100000, 100000,   0\n')
+    rec = Records(data=pd.read_csv(StringIO(csv)), gfactors=None,
+                  weights=None, adjust_ratios=None, start_year=2015)
+    stacked = rec.stacked(3)
+    assert stacked.array_length == 6
+    assert rec.array_length == 2
+    assert stacked.current_year == rec.current_year
+    assert_array_equal(stacked.RECID, [1, 2, 1, 2, 1, 2])
+    stacked.e00200[:] = 0.
+    assert_array_equal(rec.e00200, [200000., 100000.])
+
+
+def test_records_shared_copy():
+    csv = (u'RECID,MARS,e00200,e00200p,e00200s\n'
+           u'1,    2,   200000, 200000,   0\n'
+           u'2,    1,   100000, 100000,   0\n')
+    rec = Records(data=pd.read_csv(StringIO(csv)), gfactors=GrowFactors(),
+                  weights=None, adjust_ratios=None, start_year=2015)
+    shared = rec.shared_copy()
+    assert shared.e00200 is rec.e00200
+    assert shared.MARS is rec.MARS
+    # changing variable values in place gives the changing object a copy
+    shared.increment_year()
+    assert shared.current_year == 2016
+    assert rec.current_year == 2015
+    assert_array_equal(rec.e00200, [200000., 100000.])
+    assert not np.array_equal(shared.e00200, rec.e00200)
+    assert shared.MARS is rec.MARS
+    rec.set_current_year(2017)
+    assert_array_equal(rec.FLPDYR, [2017, 2017])
+    assert_array_equal(shared.FLPDYR, [2015, 2015])
+    # unshared variables are not copied again
+    e00200 = shared.e00200
+    shared.unshare(['e00200'])
+    assert shared.e00200 is e00200
+
+
+def test_records_read_chunks():
+    csv = (u'RECID,MARS,e00200,e00200p,e00200s\n'
+           u'1,    2,   200000, 200000,   0\n'
+           u'2,    1,   100000, 100000,   0\n'
+           u'3,    1,    50000,  50000,   0\n')
+    data = pd.read_csv(StringIO(csv))
+    weights = pd.DataFrame({'WT2015': [100, 200, 300, 400],
+                            'WT2016': [500, 600, 700, 800]})
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv',
+                                     delete=False) as dfile:
+        data.to_csv(dfile, index=False)
+    gzfilename = dfile.name + '.gz'
+    data.to_csv(gzfilename, index=False, compression='gzip')
+    try:
+        for dsource in [data, dfile.name, gzfilename]:
+            expected = Records(data=data, gfactors=GrowFactors(),
+                               weights=weights, adjust_ratios=None,
+                               start_year=2015)
+            chunks = list(Records.read_chunks(dsource, 2,
+                                              gfactors=GrowFactors(),
+                                              weights=weights,
+                                              adjust_ratios=None,
+                                              start_year=2015))
+            assert [chunk.array_length for chunk in chunks] == [2, 1]
+            assert_array_equal(np.concatenate([chunk.RECID
+                                               for chunk in chunks]),
+                               expected.RECID)
+            for year in [2015, 2016]:
+                if year > expected.current_year:
+                    for chunk in chunks:
+                        chunk.increment_year()
+                    expected.increment_year()
+                assert np.allclose(np.concatenate([chunk.s006
+                                                   for chunk in chunks]),
+                                   expected.s006)
+        # records are counted without parsing and blank lines are ignored
+        with open(dfile.name, 'a') as cfile:
+            cfile.write('\n4,1,1000,1000,0')
+        assert Records._csv_record_count(dfile.name) == 4
+    finally:
+        os.remove(dfile.name)
+        os.remove(gzfilename)
+    with pytest.raises(ValueError):
+        next(Records.read_chunks(data, 0))
+    with pytest.raises(ValueError):
+        next(Records.read_chunks(list(), 2))
+
+
+def test_records_cache():
+    csv = (u'RECID,MARS,e00200,e00200p,e00200s,unused\n'
+           u'1,    2,   200000, 200000,   0,    9\n'
+           u'2,    1,   100000, 100000,   0,    9\n')
+    data = pd.read_csv(StringIO(csv))
+    cache_dir = tempfile.mkdtemp()
+    try:
+        Records.write_cache(data, cache_dir)
+        assert os.path.isfile(os.path.join(cache_dir, 'MARS.npy'))
+        assert not os.path.isfile(os.path.join(cache_dir, 'unused.npy'))
+        rec = Records(data=cache_dir, gfactors=GrowFactors(),
+                      weights=None, adjust_ratios=None, start_year=2015)
+        expected = Records(data=data, gfactors=GrowFactors(),
+                           weights=None, adjust_ratios=None, start_year=2015)
+        assert rec.array_length == 2
+        assert rec.MARS.dtype == np.int32
+        assert rec.e00200.dtype == np.float64
+        for varname in Records.USABLE_READ_VARS:
+            assert_array_equal(getattr(rec, varname),
+                               getattr(expected, varname))
+        # changing variable values does not change the cache files
+        rec.increment_year()
+        assert_array_equal(np.load(os.path.join(cache_dir, 'e00200.npy')),
+                           [200000., 100000.])
+        del rec
+        with pytest.raises(ValueError):
+            Records.write_cache(list(), cache_dir)
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+def test_blowup():
+    csv = (u'RECID,MARS,e00200,e00200p,e00200s,e00900,e00900p,e00900s\n'
+           u'1,    2,   200000, 200000,   0,      500,   1000,    -500\n'
+           u'2,    1,   100000, 100000,   0,    -2000,  -2000,       0\n')
+    gfactors = GrowFactors()
+    rec = Records(data=pd.read_csv(StringIO(csv)), gfactors=gfactors,
+                  weights=None, adjust_ratios=None, start_year=2015)
+    rec.increment_year()
+    awage = gfactors.factor_value('AWAGE', 2016)
+    aschci = gfactors.factor_value('ASCHCI', 2016)
+    aschcl = gfactors.factor_value('ASCHCL', 2016)
+    assert_array_equal(rec.e00200, [200000. * awage, 100000. * awage])
+    assert_array_equal(rec.e00900p, [1000. * aschci, -2000. * aschcl])
+    assert_array_equal(rec.e00900s, [-500. * aschcl, 0.])
+    assert_array_equal(rec.e00900, rec.e00900p + rec.e00900s)
+    # a variable that is replaced by another array is still grown
+    rec.e00200p = rec.e00200p.copy()
+    rec.increment_year()
+    awage *= gfactors.factor_value('AWAGE', 2017)
+    assert np.allclose(rec.e00200p, [200000. * awage, 100000. * awage])
+
+
+def test_records_growth_factors():
+    Records.read_var_info()
+    for varname in Records.GROWN_VARS:
+        assert varname in Records.USABLE_READ_VARS
+        assert varname not in Records.INTEGER_READ_VARS
+        assert Records.GROWTH_FACTOR[varname] in GrowFactors.VALID_NAMES
+    for varname, name in Records.NEGATIVE_GROWTH_FACTOR.items():
+        assert varname in Records.GROWTH_FACTOR
+        assert name in GrowFactors.VALID_NAMES
+
+
 def test_for_duplicate_names():
     varnames = set()
     for varname in Records.USABLE_READ_VARS:
@@ -10,7 +10,7 @@ import pandas as pd
 import pytest
 from taxcalc.tbi.tbi_utils import *
 from taxcalc.tbi import *
-from taxcalc import Policy, Records, Calculator
+from taxcalc import Policy, Records, Calculator, TableRows
 
 
 USER_MODS = {
@@ -126,6 +126,33 @@ def test_run_gdp_qelast_model_3():
     assert res == 0.0
 
 
+def test_run_taxcalc_years_model():
+    usermods = {
+        'policy': {2017: {'_II_em': [1000]}},
+        'consumption': {},
+        'behavior': {2017: {'_BE_sub': [0.25]}},
+        'growdiff_baseline': {},
+        'growdiff_response': {},
+        'growmodel': {}
+    }
+    results = run_taxcalc_years_model(2, 2017,
+                                      use_puf_not_cps=False,
+                                      use_full_sample=False,
+                                      user_mods=usermods)
+    assert len(results) == 2
+    for year_n in range(0, 2):
+        res = run_nth_year_taxcalc_model(year_n, 2017,
+                                         use_puf_not_cps=False,
+                                         use_full_sample=False,
+                                         user_mods=usermods)
+        assert results[year_n] == res
+    with pytest.raises(ValueError):
+        run_taxcalc_years_model(0, 2017,
+                                use_puf_not_cps=False,
+                                use_full_sample=False,
+                                user_mods=usermods)
+
+
 def test_random_seed_from_subdict():
     """
     Test except logic in try statement in random_seed_from_subdict function.
@@ -156,6 +183,51 @@ def test_create_dict_table():
         create_dict_table(dframe)
 
 
+@pytest.mark.parametrize('table_row_type', ['aggr', 'xbin', 'xdec'])
+def test_fuzzed(table_row_type):
+    """
+    Test that fuzzed replaces reform results with baseline results for at
+    most NUM_TO_FUZZ affected filing units in each table row.
+    """
+    rng = np.random.RandomState(24680)
+    num = 3000
+    df1 = pd.DataFrame({'expanded_income': rng.normal(40e3, 90e3, num),
+                        's006': rng.uniform(1., 200., num),
+                        'combined': rng.normal(5e3, 9e3, num)})
+    df2 = df1.copy()
+    reform_affected = rng.uniform(size=num) < 0.2
+    df2.loc[reform_affected, 'combined'] += 100.
+    df1_before = df1.copy()
+    df2_before = df2.copy()
+    np.random.seed(13579)
+    fdf1, fdf2 = fuzzed(df1, df2, reform_affected, table_row_type)
+    assert df1.equals(df1_before)
+    assert df2.equals(df2_before)
+    assert fdf1.equals(df1)
+    assert list(fdf2.columns) == list(df2.columns)
+    fuzz = np.logical_not(np.isclose(fdf2['combined'], df2['combined']))
+    assert np.all(reform_affected[fuzz])
+    assert np.allclose(fdf2['combined'][fuzz], df1['combined'][fuzz])
+    assert np.allclose(fdf2['combined'][~fuzz], df2['combined'][~fuzz])
+    if table_row_type == 'aggr':
+        num_rows = 1
+        codes = np.zeros(num, dtype=int)
+    else:
+        table_rows = TableRows(df1['expanded_income'], df1['s006'])
+        groupby = {'xbin': 'standard_income_bins',
+                   'xdec': 'weighted_deciles'}[table_row_type]
+        codes = table_rows.codes(groupby)
+        num_rows = codes.max() + 1
+    num_fuzzed = np.bincount(codes[fuzz], minlength=num_rows)
+    num_affected = np.bincount(codes[reform_affected], minlength=num_rows)
+    assert np.array_equal(num_fuzzed,
+                          np.minimum(num_affected, NUM_TO_FUZZ))
+    # same seed fuzzes the same filing units
+    np.random.seed(13579)
+    _, fdf2_again = fuzzed(df1, df2, reform_affected, table_row_type)
+    assert fdf2_again.equals(fdf2)
+
+
 @pytest.mark.requires_pufcsv
 def test_with_pufcsv(puf_fullsample):
     # specify usermods dictionary in code
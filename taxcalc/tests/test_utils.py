@@ -19,14 +19,18 @@ from taxcalc.utils import (DIST_VARIABLES,
                            DIST_TABLE_COLUMNS, DIST_TABLE_LABELS,
                            DIFF_VARIABLES,
                            DIFF_TABLE_COLUMNS, DIFF_TABLE_LABELS,
-                           SOI_AGI_BINS,
+                           STANDARD_INCOME_BINS, SOI_AGI_BINS,
                            create_distribution_table, create_difference_table,
+                           distribution_table_sums,
                            weighted_count_lt_zero, weighted_count_gt_zero,
                            weighted_count, weighted_sum, weighted_mean,
                            wage_weighted, agi_weighted,
                            expanded_income_weighted,
                            add_income_table_row_variable,
                            add_quantile_table_row_variable,
+                           table_row_codes,
+                           income_sort_order, weighted_quantile_row_codes,
+                           TableRows,
                            mtr_graph_data, atr_graph_data, dec_graph_data,
                            xtr_graph_plot, write_graph_file,
                            read_egg_csv, read_egg_json, delete_file,
@@ -576,6 +580,105 @@ def test_add_quantile_trow_var():
                                               100, decile_details=True)
 
 
+def test_table_row_codes():
+    rng = np.random.RandomState(123456789)
+    num = 1000
+    income = np.round(rng.normal(50e3, 80e3, size=num), -2)
+    income[:50] = 0.
+    vdf = pd.DataFrame({'expanded_income': income,
+                        's006': rng.uniform(1., 100., size=num)})
+    codes = table_row_codes(vdf, 'weighted_deciles', 'expanded_income')
+    pdf = add_quantile_table_row_variable(vdf.copy(), 'expanded_income',
+                                          10, decile_details=True)
+    pdf.sort_index(inplace=True)
+    assert np.array_equal(codes, pdf['table_row'].astype(int).values - 1)
+    for groupby, bins in [('standard_income_bins', STANDARD_INCOME_BINS),
+                          ('soi_agi_bins', SOI_AGI_BINS)]:
+        codes = table_row_codes(vdf, groupby, 'expanded_income')
+        pdf = add_income_table_row_variable(vdf.copy(), 'expanded_income',
+                                            bins)
+        assert np.array_equal(codes, pdf['table_row'].cat.codes.values)
+    assert 'table_row' not in vdf
+    with pytest.raises(ValueError):
+        table_row_codes(vdf, 'unknown_bins', 'expanded_income')
+
+
+def test_weighted_quantile_row_codes():
+    rng = np.random.RandomState(987654321)
+    num = 1000
+    income = rng.permutation(np.arange(num, dtype=np.float64) - 100.)
+    weights = np.ones(num)
+    codes = weighted_quantile_row_codes(income, weights, 10)
+    # cumulative weight of unit is its income rank plus one and bin edges
+    # are left-inclusive, so unit with cumulative weight of 100 is in row 1
+    expected = np.minimum((income + 101.) // 100, 9).astype(int)
+    assert np.array_equal(codes, expected)
+    # sort order of an income array with the same values is reused
+    order = income_sort_order(income)
+    assert income_sort_order(income.copy()) is order
+    assert not order.flags.writeable
+    income_copy = income.copy()
+    income_copy[0] += 1.
+    assert income_sort_order(income_copy) is not order
+    # dollar-weighted rows match those of add_quantile_table_row_variable
+    vdf = pd.DataFrame({'expanded_income': income, 's006': weights})
+    codes = weighted_quantile_row_codes(income, weights, 100,
+                                        weight_by_income_measure=True)
+    pdf = add_quantile_table_row_variable(vdf.copy(), 'expanded_income', 100,
+                                          weight_by_income_measure=True)
+    pdf.sort_index(inplace=True)
+    assert np.array_equal(codes, pdf['table_row'].cat.codes.values)
+    with pytest.raises(ValueError):
+        weighted_quantile_row_codes(income, weights, 100,
+                                    decile_details=True)
+
+
+def test_table_rows():
+    rng = np.random.RandomState(135792468)
+    num = 2000
+    columns = set(DIST_VARIABLES + DIFF_VARIABLES +
+                  ['num_returns_StandardDed', 'num_returns_ItemDed',
+                   'num_returns_AMT'])
+    vdf1 = pd.DataFrame({col: rng.normal(40e3, 90e3, size=num)
+                         for col in columns})
+    vdf1['s006'] = rng.uniform(1., 200., size=num)
+    vdf1.loc[:99, 'expanded_income'] = 0.
+    vdf2 = vdf1.copy()
+    vdf2['combined'] += rng.normal(0., 500., size=num)
+    rows = TableRows(vdf1['expanded_income'], vdf1['s006'])
+    assert len(rows) == num
+    for groupby in ['weighted_deciles', 'standard_income_bins',
+                    'soi_agi_bins']:
+        codes = rows.codes(groupby)
+        assert rows.codes(groupby) is codes  # codes are computed only once
+        assert not codes.flags.writeable
+        assert np.array_equal(codes,
+                              table_row_codes(vdf1, groupby,
+                                              'expanded_income'))
+        dist = create_distribution_table(vdf1, groupby, 'expanded_income')
+        dist_rows = create_distribution_table(vdf1, groupby,
+                                              'expanded_income',
+                                              table_rows=rows)
+        assert dist_rows.equals(dist)
+        diff = create_difference_table(vdf1, vdf2, groupby, 'combined')
+        diff_rows = create_difference_table(vdf1, vdf2, groupby, 'combined',
+                                            table_rows=rows)
+        assert diff_rows.equals(diff)
+        sums = distribution_table_sums(vdf1, groupby, 'expanded_income')
+        assert np.allclose(rows.sums(groupby, vdf1['s006'].values),
+                           sums['s006'].values)
+    # table rows do not change when the income array changes later
+    income = vdf1['expanded_income'].values.copy()
+    rows = TableRows(income, vdf1['s006'].values)
+    codes = rows.codes('standard_income_bins').copy()
+    income[:] = 0.
+    assert np.array_equal(rows.codes('standard_income_bins'), codes)
+    with pytest.raises(ValueError):
+        TableRows(np.zeros(3), np.ones(4))
+    with pytest.raises(ValueError):
+        rows.codes('unknown_bins')
+
+
 def test_dist_table_sum_row(cps_subsample):
     rec = Records.cps_constructor(data=cps_subsample)
     calc = Calculator(policy=Policy(), records=rec)
@@ -805,6 +908,34 @@ def test_bootstrap_se_ci():
     assert abs(bsd['cihi'] / 135.4 - 1) < 0.03
 
 
+def test_bootstrap_se_ci_blocks():
+    rng = np.random.RandomState(97531)
+    data = rng.normal(100., 30., size=500)
+    weights = rng.uniform(1., 10., size=500)
+    # resampling in blocks does not change the results
+    bsd = bootstrap_se_ci(data, 2468, 200, np.mean, 0.025)
+    for block_size in [1, 7, 200, 1000]:
+        assert bootstrap_se_ci(data, 2468, 200, np.mean, 0.025,
+                               block_size=block_size) == bsd
+    # weighted statistic with equal weights is same as unweighted statistic
+    bsdw = bootstrap_se_ci(data, 2468, 200, np.average, 0.025,
+                           weights=np.ones_like(data))
+    assert np.allclose([bsdw['se'], bsdw['cilo'], bsdw['cihi']],
+                       [bsd['se'], bsd['cilo'], bsd['cihi']])
+    # parallel results are reproducible and do not depend on n_jobs
+    bsd2 = bootstrap_se_ci(data, 2468, 200, np.average, 0.025,
+                           weights=weights, block_size=30, n_jobs=2)
+    bsd3 = bootstrap_se_ci(data, 2468, 200, np.average, 0.025,
+                           weights=weights, block_size=30, n_jobs=3)
+    assert bsd2 == bsd3
+    assert abs(bsd2['se'] / bsdw['se'] - 1) < 0.3
+    with pytest.raises(ValueError):
+        bootstrap_se_ci(data, 2468, 200, np.average, 0.025,
+                        weights=weights[:-1])
+    with pytest.raises(ValueError):
+        bootstrap_se_ci(data, 2468, 200, np.mean, 0.025, n_jobs=0)
+
+
 def test_table_columns_labels():
     # check that length of two lists are the same
     assert len(DIST_TABLE_COLUMNS) == len(DIST_TABLE_LABELS)
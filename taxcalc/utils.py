@@ -11,6 +11,7 @@ import os
 import math
 import json
 import collections
+from concurrent.futures import ProcessPoolExecutor
 import pkg_resources
 import numpy as np
 import pandas as pd
@@ -165,37 +166,202 @@ def add_quantile_table_row_variable(pdf, income_measure, num_quantiles,
     """
     assert isinstance(pdf, pd.DataFrame)
     assert income_measure in pdf
-    if decile_details and num_quantiles != 10:
-        msg = 'decile_details is True when num_quantiles is {}'
-        raise ValueError(msg.format(num_quantiles))
+    codes = weighted_quantile_row_codes(
+        pdf[income_measure].values, pdf['s006'].values, num_quantiles,
+        decile_details, weight_by_income_measure
+    )
+    num_rows = num_quantiles + (4 if decile_details else 0)
+    pdf['table_row'] = pd.Categorical.from_codes(
+        codes, categories=list(range(1, num_rows + 1)), ordered=True
+    )
     pdf.sort_values(by=income_measure, inplace=True)
-    if weight_by_income_measure:
-        pdf['cumsum_temp'] = np.cumsum(np.multiply(pdf[income_measure].values,
-                                                   pdf['s006'].values))
-        min_cumsum = pdf['cumsum_temp'].values[0]
-    else:
-        pdf['cumsum_temp'] = np.cumsum(pdf['s006'].values)
-        min_cumsum = 0.  # because s006 values are non-negative
-    max_cumsum = pdf['cumsum_temp'].values[-1]
+    return pdf
+
+
+def _quantile_bin_edges(min_cumsum, max_cumsum, num_quantiles,
+                        decile_details):
+    """
+    Return list of cumulative-sum bin edges for num_quantiles equal-width
+    quantiles (plus the decile_details subgroups) of the cumulative sums
+    that range from min_cumsum to max_cumsum.
+    """
     cumsum_range = max_cumsum - min_cumsum
     bin_width = cumsum_range / float(num_quantiles)
     bin_edges = list(min_cumsum +
                      np.arange(0, (num_quantiles + 1)) * bin_width)
     bin_edges[-1] = 9e99  # raise top of last bin to include all observations
     bin_edges[0] = -9e99  # lower bottom of 1st bin to include all observations
-    num_bins = num_quantiles
     if decile_details:
         assert bin_edges[1] > 1e-9  # bin_edges[1] is top of bottom decile
         bin_edges.insert(1, 1e-9)  # top of zeros
         bin_edges.insert(1, -1e-9)  # top of negatives
         bin_edges.insert(-1, bin_edges[-2] + 0.5 * bin_width)  # top of 90-95
         bin_edges.insert(-1, bin_edges[-2] + 0.4 * bin_width)  # top of 95-99
-        num_bins += 4
-    labels = range(1, (num_bins + 1))
-    pdf['table_row'] = pd.cut(pdf['cumsum_temp'], bin_edges,
-                              right=False, labels=labels)
-    pdf.drop('cumsum_temp', axis=1, inplace=True)
-    return pdf
+    return bin_edges
+
+
+# Maximum number of income arrays whose sort order is remembered by the
+# income_sort_order function.  Tables in a run are usually all grouped by
+# the baseline expanded_income, so a small cache is enough to sort it once.
+SORT_ORDER_CACHE_SIZE = 2
+
+_SORT_ORDER_CACHE = collections.deque(maxlen=SORT_ORDER_CACHE_SIZE)
+
+
+def income_sort_order(income):
+    """
+    Return read-only integer numpy array that sorts specified income array
+    in the same order as the Pandas sort_values method (when income contains
+    no NaN values).  The sort order of the most recently used income arrays
+    is cached, so calls with an array that has the same values as one of
+    those arrays do not sort again.
+    """
+    for cached_income, order in list(_SORT_ORDER_CACHE):
+        if (cached_income.shape == income.shape and
+                np.array_equal(cached_income, income)):
+            return order
+    order = np.argsort(income, kind='quicksort')
+    order.setflags(write=False)
+    _SORT_ORDER_CACHE.append((np.array(income, copy=True), order))
+    return order
+
+
+def weighted_quantile_row_codes(income, weights, num_quantiles,
+                                decile_details=False,
+                                weight_by_income_measure=False):
+    """
+    Return integer numpy array containing the zero-based table row of each
+    filing unit when the rows are the weighted quantiles of specified income
+    array defined by the add_quantile_table_row_variable function using the
+    specified weights array (normally s006) and arguments.  Unlike that
+    function, this function neither sorts nor copies any DataFrame and uses
+    the cached sort order of income returned by income_sort_order.
+    """
+    if decile_details and num_quantiles != 10:
+        msg = 'decile_details is True when num_quantiles is {}'
+        raise ValueError(msg.format(num_quantiles))
+    order = income_sort_order(income)
+    if weight_by_income_measure:
+        cumsum = np.cumsum(np.multiply(income[order], weights[order]))
+        min_cumsum = cumsum[0]
+    else:
+        cumsum = np.cumsum(weights[order])
+        min_cumsum = 0.  # because weights values are non-negative
+    bin_edges = _quantile_bin_edges(min_cumsum, cumsum[-1],
+                                    num_quantiles, decile_details)
+    codes = np.empty(income.size, dtype=np.int64)
+    # same left-inclusive bins as pd.cut(..., right=False)
+    codes[order] = np.searchsorted(bin_edges, cumsum, side='right') - 1
+    return codes
+
+
+def table_row_codes(vdf, groupby, income_measure):
+    """
+    Return integer numpy array containing the zero-based table row of each
+    filing unit in Pandas DataFrame, vdf, when the rows are specified by
+    groupby and income_measure, where the rows are the same as those
+    specified by the add_quantile_table_row_variable function (with ten
+    quantiles and decile details) when groupby is 'weighted_deciles' and
+    by the add_income_table_row_variable function otherwise.  Filing units
+    that are not in any row have a code of -1.  Unlike those functions,
+    this function leaves vdf unchanged.
+    """
+    return _income_row_codes(vdf[income_measure].values, vdf['s006'].values,
+                             groupby)
+
+
+def _income_row_codes(income, weights, groupby):
+    """
+    Return table_row_codes for filing units with the specified income
+    measure and weights arrays.
+    """
+    if groupby == 'weighted_deciles':
+        return weighted_quantile_row_codes(income, weights, 10,
+                                           decile_details=True)
+    if groupby == 'standard_income_bins':
+        bin_edges = STANDARD_INCOME_BINS
+    elif groupby == 'soi_agi_bins':
+        bin_edges = SOI_AGI_BINS
+    else:
+        msg = 'groupby="{}" is not a valid table row specification'
+        raise ValueError(msg.format(groupby))
+    # same left-inclusive bins as pd.cut(..., right=False)
+    codes = np.searchsorted(bin_edges, income, side='right') - 1
+    codes[codes >= len(bin_edges) - 1] = -1
+    return codes
+
+
+class TableRows(object):
+    """
+    Constructor for the table rows of the filing units in a run, where the
+    rows of every table in the run are defined by the same baseline income
+    measure (normally expanded_income) and sample weights (s006).  The
+    table_row_codes for each groupby value are computed only when they are
+    first needed and are then reused by all the later tables, fuzzing
+    passes, and graphs in the run.
+
+    Parameters
+    ----------
+    income: numpy array
+        baseline income measure of each filing unit
+
+    weights: numpy array
+        sample weight of each filing unit
+
+    Returns
+    -------
+    class instance: TableRows
+
+    Notes
+    -----
+    The income and weights arrays are copied, so the table rows do not
+    change when the caller changes those arrays after construction.
+    """
+
+    def __init__(self, income, weights):
+        self._income = np.array(income, dtype=np.float64)
+        self._weights = np.array(weights, dtype=np.float64)
+        if self._income.shape != self._weights.shape:
+            msg = 'income size {} differs from weights size {}'
+            raise ValueError(msg.format(self._income.size,
+                                        self._weights.size))
+        self._codes = dict()
+
+    def __len__(self):
+        return self._income.size
+
+    def codes(self, groupby):
+        """
+        Return read-only integer numpy array containing the zero-based table
+        row of each filing unit for the specified groupby, which can be
+        'weighted_deciles', 'standard_income_bins', or 'soi_agi_bins'.
+        """
+        codes = self._codes.get(groupby)
+        if codes is None:
+            codes = _income_row_codes(self._income, self._weights, groupby)
+            codes.setflags(write=False)
+            self._codes[groupby] = codes
+        return codes
+
+    def sums(self, groupby, values):
+        """
+        Return numpy array containing the sum of the specified values array
+        in each of the groupby table rows (not including the sum rows).
+        """
+        return _row_sums(self.codes(groupby), _num_table_rows(groupby),
+                         values)
+
+
+def _row_sums(codes, num_rows, values):
+    """
+    Return numpy array containing the sum of values in each of the num_rows
+    table rows specified by codes, ignoring filing units not in any row.
+    """
+    if codes.min() < 0:
+        in_row = codes >= 0
+        codes = codes[in_row]
+        values = values[in_row]
+    return np.bincount(codes, weights=values, minlength=num_rows)
 
 
 def add_income_table_row_variable(pdf, income_measure, bin_edges):
@@ -243,7 +409,8 @@ def get_sums(pdf):
     return pd.Series(sums, name='ALL')
 
 
-def create_distribution_table(vdf, groupby, income_measure):
+def create_distribution_table(vdf, groupby, income_measure,
+                              table_rows=None):
     """
     Get results from vdf, sort them by expanded_income based on groupby,
     and return them as a table.
@@ -263,6 +430,11 @@ def create_distribution_table(vdf, groupby, income_measure):
         options for input: 'expanded_income' or 'expanded_income_baseline'
         determines which variable is used to sort rows
 
+    table_rows: TableRows object or None
+        when not None, contains the table rows of the filing units in vdf
+        (which must be defined by the values of the income_measure in vdf),
+        so the rows are not computed again for this table
+
     Returns
     -------
     distribution table as a Pandas DataFrame with DIST_TABLE_COLUMNS and
@@ -278,23 +450,22 @@ def create_distribution_table(vdf, groupby, income_measure):
           positive (denoted by a 0-10p row label) values of the
           specified income_measure.
     """
-    # pylint: disable=too-many-statements,too-many-branches
-    # nested function that returns calculated column statistics as a DataFrame
-    def stat_dataframe(gpdf):
-        """
-        Returns calculated distribution table column statistics derived from
-        the specified grouped Dataframe object, gpdf.
-        """
-        unweighted_columns = ['s006', 'num_returns_StandardDed',
-                              'num_returns_ItemDed', 'num_returns_AMT']
-        sdf = pd.DataFrame()
-        for col in DIST_TABLE_COLUMNS:
-            if col in unweighted_columns:
-                sdf[col] = gpdf.apply(unweighted_sum, col)
-            else:
-                sdf[col] = gpdf.apply(weighted_sum, col)
-        return sdf
-    # main logic of create_distribution_table
+    sums = distribution_table_sums(vdf, groupby, income_measure,
+                                   table_rows=table_rows)
+    return finish_distribution_table(sums, groupby)
+
+
+def distribution_table_sums(vdf, groupby, income_measure, table_rows=None):
+    """
+    Return Pandas DataFrame containing the DIST_TABLE_COLUMNS sums for the
+    groupby rows (not including the sum rows) of the distribution table
+    returned by create_distribution_table(vdf, groupby, income_measure).
+    These sums are additive, so the sums for several sets of filing units
+    can be added together before calling finish_distribution_table when
+    groupby specifies fixed income bins.  All the sums are computed in one
+    pass over the table_row_codes using np.bincount, and vdf is unchanged.
+    The table_row_codes are taken from table_rows when it is not None.
+    """
     assert isinstance(vdf, pd.DataFrame)
     assert (groupby == 'weighted_deciles' or
             groupby == 'standard_income_bins' or
@@ -303,20 +474,42 @@ def create_distribution_table(vdf, groupby, income_measure):
             income_measure == 'expanded_income_baseline')
     assert income_measure in vdf
     assert 'table_row' not in list(vdf.columns.values)
-    # sort the data given specified groupby and income_measure
+    if table_rows is None:
+        codes = table_row_codes(vdf, groupby, income_measure)
+    else:
+        assert len(table_rows) == len(vdf.index)
+        codes = table_rows.codes(groupby)
+    num_rows = _num_table_rows(groupby)
+    unweighted_columns = ['s006', 'num_returns_StandardDed',
+                          'num_returns_ItemDed', 'num_returns_AMT']
+    weight = vdf['s006'].values
+    sums = collections.OrderedDict()
+    for col in DIST_TABLE_COLUMNS:
+        if col in unweighted_columns:
+            values = vdf[col].values
+        else:
+            values = vdf[col].values * weight
+        sums[col] = _row_sums(codes, num_rows, values)
+    return pd.DataFrame(sums, columns=DIST_TABLE_COLUMNS)
+
+
+def _num_table_rows(groupby):
+    """
+    Return number of table rows (not including sum rows) for groupby.
+    """
     if groupby == 'weighted_deciles':
-        pdf = add_quantile_table_row_variable(vdf, income_measure,
-                                              10, decile_details=True)
-    elif groupby == 'standard_income_bins':
-        pdf = add_income_table_row_variable(vdf, income_measure,
-                                            STANDARD_INCOME_BINS)
-    elif groupby == 'soi_agi_bins':
-        pdf = add_income_table_row_variable(vdf, income_measure,
-                                            SOI_AGI_BINS)
-    # construct grouped DataFrame
-    gpdf = pdf.groupby('table_row', as_index=False)
-    dist_table = stat_dataframe(gpdf)
-    del pdf['table_row']
+        return len(DECILE_ROW_NAMES) - 2  # not including ALL and 90-100 rows
+    if groupby == 'standard_income_bins':
+        return len(STANDARD_INCOME_BINS) - 1
+    return len(SOI_AGI_BINS) - 1
+
+
+def finish_distribution_table(sums, groupby):
+    """
+    Return distribution table as a Pandas DataFrame with DIST_TABLE_COLUMNS
+    and groupby rows given the row sums returned by distribution_table_sums.
+    """
+    dist_table = sums.copy()
     # compute sum row
     sum_row = get_sums(dist_table)[dist_table.columns]
     # handle placement of sum_row in table
@@ -352,15 +545,12 @@ def create_distribution_table(vdf, groupby, income_measure):
         assert len(dist_table.index) == len(rownames)
         dist_table.index = rownames
         del rownames
-    # delete intermediate Pandas DataFrame objects
-    del gpdf
-    del pdf
     # return table as Pandas DataFrame
-    vdf.sort_index(inplace=True)
     return dist_table
 
 
-def create_difference_table(vdf1, vdf2, groupby, tax_to_diff):
+def create_difference_table(vdf1, vdf2, groupby, tax_to_diff,
+                            table_rows=None):
     """
     Get results from two different vdf, construct tax difference results,
     and return the difference statistics as a table.
@@ -384,6 +574,11 @@ def create_difference_table(vdf1, vdf2, groupby, tax_to_diff):
         options for input: 'iitax', 'payrolltax', 'combined'
         specifies which tax to difference
 
+    table_rows: TableRows object or None
+        when not None, contains the table rows of the filing units in vdf1
+        and vdf2 (which must be defined by the expanded_income in vdf1), so
+        the rows are not computed again for this table
+
     Returns
     -------
     difference table as a Pandas DataFrame with DIFF_TABLE_COLUMNS and
@@ -399,26 +594,23 @@ def create_difference_table(vdf1, vdf2, groupby, tax_to_diff):
           positive (denoted by a 0-10p row label) values of the
           specified income_measure.
     """
-    # pylint: disable=too-many-statements,too-many-locals
-    # nested function that creates dataframe containing additive statistics
-    def additive_stats_dataframe(gpdf):
-        """
-        Nested function that returns additive stats DataFrame derived from gpdf
-        """
-        sdf = pd.DataFrame()
-        sdf['count'] = gpdf.apply(weighted_count)
-        sdf['tax_cut'] = gpdf.apply(weighted_count_lt_zero, 'tax_diff')
-        sdf['tax_inc'] = gpdf.apply(weighted_count_gt_zero, 'tax_diff')
-        sdf['tot_change'] = gpdf.apply(weighted_sum, 'tax_diff')
-        sdf['ubi'] = gpdf.apply(weighted_sum, 'ubi')
-        sdf['benefit_cost_total'] = gpdf.apply(weighted_sum,
-                                               'benefit_cost_total')
-        sdf['benefit_value_total'] = gpdf.apply(weighted_sum,
-                                                'benefit_value_total')
-        sdf['atinc1'] = gpdf.apply(weighted_sum, 'atinc1')
-        sdf['atinc2'] = gpdf.apply(weighted_sum, 'atinc2')
-        return sdf
-    # main logic of create_difference_table
+    sums = difference_table_sums(vdf1, vdf2, groupby, tax_to_diff,
+                                 table_rows=table_rows)
+    return finish_difference_table(sums, groupby)
+
+
+def difference_table_sums(vdf1, vdf2, groupby, tax_to_diff,
+                          table_rows=None):
+    """
+    Return Pandas DataFrame containing the additive statistics for the
+    groupby rows (not including the sum rows) of the difference table
+    returned by create_difference_table(vdf1, vdf2, groupby, tax_to_diff).
+    These sums can be added together for several sets of filing units
+    before calling finish_difference_table when groupby specifies fixed
+    income bins.  All the sums are computed in one pass over the
+    table_row_codes using np.bincount, and vdf1 and vdf2 are unchanged.
+    The table_row_codes are taken from table_rows when it is not None.
+    """
     assert isinstance(vdf1, pd.DataFrame)
     assert isinstance(vdf2, pd.DataFrame)
     assert np.allclose(vdf1['s006'], vdf2['s006'])  # check rows in same order
@@ -431,26 +623,38 @@ def create_difference_table(vdf1, vdf2, groupby, tax_to_diff):
             tax_to_diff == 'combined')
     assert 'table_row' not in list(vdf1.columns.values)
     assert 'table_row' not in list(vdf2.columns.values)
-    baseline_expanded_income = 'expanded_income_baseline'
-    vdf2[baseline_expanded_income] = vdf1['expanded_income']
-    vdf2['tax_diff'] = vdf2[tax_to_diff] - vdf1[tax_to_diff]
-    vdf2['atinc1'] = vdf1['aftertax_income']
-    vdf2['atinc2'] = vdf2['aftertax_income']
-    # add table_row column to vdf2 given specified groupby and income_measure
-    if groupby == 'weighted_deciles':
-        pdf = add_quantile_table_row_variable(vdf2, baseline_expanded_income,
-                                              10, decile_details=True)
-    elif groupby == 'standard_income_bins':
-        pdf = add_income_table_row_variable(vdf2, baseline_expanded_income,
-                                            STANDARD_INCOME_BINS)
-    elif groupby == 'soi_agi_bins':
-        pdf = add_income_table_row_variable(vdf2, baseline_expanded_income,
-                                            SOI_AGI_BINS)
-    # create grouped Pandas DataFrame
-    gpdf = pdf.groupby('table_row', as_index=False)
-    del pdf['table_row']
-    # create additive difference table statistics from gpdf
-    diff_table = additive_stats_dataframe(gpdf)
+    # table rows are defined by baseline expanded_income and reform weights
+    if table_rows is None:
+        codes = _income_row_codes(vdf1['expanded_income'].values,
+                                  vdf2['s006'].values, groupby)
+    else:
+        assert len(table_rows) == len(vdf1.index)
+        codes = table_rows.codes(groupby)
+    num_rows = _num_table_rows(groupby)
+    weight = vdf2['s006'].values
+    tax_diff = vdf2[tax_to_diff].values - vdf1[tax_to_diff].values
+    sums = collections.OrderedDict()
+    sums['count'] = _row_sums(codes, num_rows, weight)
+    sums['tax_cut'] = _row_sums(codes, num_rows,
+                                np.where(tax_diff < -0.001, weight, 0.))
+    sums['tax_inc'] = _row_sums(codes, num_rows,
+                                np.where(tax_diff > 0.001, weight, 0.))
+    sums['tot_change'] = _row_sums(codes, num_rows, tax_diff * weight)
+    for col in ['ubi', 'benefit_cost_total', 'benefit_value_total']:
+        sums[col] = _row_sums(codes, num_rows, vdf2[col].values * weight)
+    sums['atinc1'] = _row_sums(codes, num_rows,
+                               vdf1['aftertax_income'].values * weight)
+    sums['atinc2'] = _row_sums(codes, num_rows,
+                               vdf2['aftertax_income'].values * weight)
+    return pd.DataFrame(sums, columns=list(sums.keys()))
+
+
+def finish_difference_table(sums, groupby):
+    """
+    Return difference table as a Pandas DataFrame with DIFF_TABLE_COLUMNS
+    and groupby rows given the row sums returned by difference_table_sums.
+    """
+    diff_table = sums.copy()
     # calculate additive statistics on sums row
     sum_row = get_sums(diff_table)[diff_table.columns]
     # handle placement of sum_row in table
@@ -470,9 +674,6 @@ def create_difference_table(vdf1, vdf2, groupby, tax_to_diff):
         del topdec_row
     else:
         diff_table = diff_table.append(sum_row)
-    # delete intermediate Pandas DataFrame objects
-    del gpdf
-    del pdf
     # compute non-additive stats in each table cell
     count = diff_table['count']
     diff_table['perc_cut'] = np.where(count > 0.,
@@ -514,8 +715,6 @@ def create_difference_table(vdf1, vdf2, groupby, tax_to_diff):
         diff_table.index = rownames
         del rownames
     # return table as Pandas DataFrame
-    vdf1.sort_index(inplace=True)
-    vdf2.sort_index(inplace=True)
     return diff_table
 
 
@@ -1368,25 +1567,62 @@ def delete_file(filename):
         os.remove(filename)
 
 
-def bootstrap_se_ci(data, seed, num_samples, statistic, alpha):
+# Maximum number of data elements in each block of bootstrap resamples.
+BOOTSTRAP_BLOCK_ELEMENTS = 2 ** 22
+
+
+def bootstrap_se_ci(data, seed, num_samples, statistic, alpha,
+                    weights=None, block_size=None, n_jobs=1):
     """
     Return bootstrap estimate of standard error of statistic and
     bootstrap estimate of 100*(1-2*alpha)% confidence interval for statistic
     in a dictionary along with specified seed and nun_samples (B) and alpha.
+
+    The B resamples are drawn and reduced to statistic values in blocks of
+    block_size resamples, so the memory used does not grow with B.  When
+    block_size is None, each block contains about BOOTSTRAP_BLOCK_ELEMENTS
+    data elements.  When the optional weights array is specified, the
+    statistic is a weighted statistic, like np.average, that is called as
+    statistic(samples, axis=1, weights=sample_weights); otherwise, it is
+    called as statistic(samples, axis=1).
+
+    When n_jobs is one, all the blocks are drawn from one random number
+    stream seeded by seed, so the results are the same as when all the
+    resamples are drawn at once.  When n_jobs is greater than one, the
+    blocks are drawn in a pool of n_jobs processes, each block from its
+    own stream seeded by seed and the block number, so the results do not
+    depend on n_jobs but differ from the n_jobs equal to one results, and
+    statistic must be a function that can be pickled (for example, np.mean).
     """
+    # pylint: disable=too-many-arguments
     assert isinstance(data, np.ndarray)
     assert isinstance(seed, int)
     assert isinstance(num_samples, int)
     assert callable(statistic)  # function that computes statistic from data
     assert isinstance(alpha, float)
+    if weights is not None and weights.shape != data.shape:
+        msg = 'weights shape {} differs from data shape {}'
+        raise ValueError(msg.format(weights.shape, data.shape))
+    if n_jobs < 1:
+        msg = 'n_jobs={} is less than one'
+        raise ValueError(msg.format(n_jobs))
     bsest = dict()
     bsest['seed'] = seed
-    np.random.seed(seed)  # pylint: disable=no-member
-    dlen = len(data)
-    idx = np.random.randint(low=0, high=dlen,   # pylint: disable=no-member
-                            size=(num_samples, dlen))
-    samples = data[idx]
-    stat = statistic(samples, axis=1)
+    if block_size is None:
+        block_size = max(1, BOOTSTRAP_BLOCK_ELEMENTS // max(1, len(data)))
+    block_sizes = [min(block_size, num_samples - start)
+                   for start in range(0, num_samples, block_size)]
+    if n_jobs == 1:
+        prng = np.random.RandomState(seed)
+        stat = np.concatenate([
+            _bootstrap_block_statistics(data, weights, statistic, prng, size)
+            for size in block_sizes
+        ])
+    else:
+        blocks = [(data, weights, statistic, [seed, num], size)
+                  for num, size in enumerate(block_sizes)]
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            stat = np.concatenate(list(pool.map(_bootstrap_block, blocks)))
     bsest['B'] = num_samples
     bsest['se'] = np.std(stat, ddof=1)
     stat = np.sort(stat)
@@ -1396,6 +1632,29 @@ def bootstrap_se_ci(data, seed, num_samples, statistic, alpha):
     return bsest
 
 
+def _bootstrap_block_statistics(data, weights, statistic, prng, size):
+    """
+    Return numpy array containing statistic value for each of size
+    bootstrap resamples of data drawn using the prng RandomState object.
+    """
+    dlen = len(data)
+    idx = prng.randint(low=0, high=dlen, size=(size, dlen))
+    if weights is None:
+        return statistic(data[idx], axis=1)
+    return statistic(data[idx], axis=1, weights=weights[idx])
+
+
+def _bootstrap_block(block):
+    """
+    Return _bootstrap_block_statistics for the block of bootstrap resamples
+    described by the (data, weights, statistic, seed, size) block tuple.
+    This function is called in a separate process by bootstrap_se_ci.
+    """
+    data, weights, statistic, seed, size = block
+    prng = np.random.RandomState(seed)
+    return _bootstrap_block_statistics(data, weights, statistic, prng, size)
+
+
 def dec_graph_data(dist_table1, dist_table2, year,
                    include_zero_incomes, include_negative_incomes):
     """